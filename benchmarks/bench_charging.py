@@ -0,0 +1,218 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Benchmarks of the charging control routines.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+from datafev.algorithms.cluster import rescheduling_heuristic, rescheduling_milp
+from datafev.routines.arrival import arrival_routine
+from datafev.routines.departure import departure_routine
+from datafev.routines.charging_control import (
+    centralized_milp,
+    decentralized_fcfs,
+    decentralized_llf,
+    decentralized_milp,
+)
+from datafev.routines.smart_reservation import arrival as smart_arrival
+from datafev.routines.smart_reservation import reservation as smart_reservation
+
+from .scenarios import Scenario, open_source_solver
+
+TRAFFIC_FORECAST = {"soc_dec": 0.0, "arr_del": timedelta(0), "dep_del": timedelta(0)}
+
+
+def traffic_forecast(system):
+    """
+    This function returns a traffic forecast without deviations for the 
+    clusters of a system.
+    """
+    return dict(
+        (key, dict((cc_id, value) for cc_id in system.clusters))
+        for key, value in TRAFFIC_FORECAST.items()
+    )
+
+
+class HeuristicCharging(object):
+    """
+    One step of the rule-based charging control of a cluster at the time of
+    its maximum occupation.
+    """
+
+    params = [["fcfs", "llf"], [10, 100, 1000]]
+    param_names = ["routine", "n_chargers"]
+    number = 1
+    repeat = 5
+
+    def setup(self, routine, n_chargers):
+        scenario = Scenario(1, n_chargers)
+        ts = scenario.busiest_step()
+        scenario.replay(
+            ts,
+            lambda t: departure_routine(t, scenario.fleet),
+            lambda t: arrival_routine(t, scenario.sim_step, scenario.fleet, scenario.system),
+            lambda t: scenario.system.uncontrolled_supply(t, scenario.sim_step),
+        )
+        self.system = scenario.system
+        self.ts = ts
+        self.step = scenario.sim_step
+        self.routine = {
+            "fcfs": decentralized_fcfs.charging_routine,
+            "llf": decentralized_llf.charging_routine,
+        }[routine]
+
+    def time_charging_routine(self, routine, n_chargers):
+        self.routine(self.ts, self.step, self.system)
+
+
+class MILPCharging(object):
+    """
+    One step of the MILP-based charging control at the time of maximum 
+    occupation of the clusters. The EVs are admitted by smart reservations.
+    """
+
+    params = [[5, 20], [2, 3], [30, 60, 120]]
+    param_names = ["n_chargers", "n_clusters", "horizon_min"]
+    number = 1
+    repeat = 3
+    timeout = 600
+
+    def setup(self, n_chargers, n_clusters, horizon_min):
+        self.solver = open_source_solver()
+        scenario = Scenario(n_clusters, n_chargers, n_evs=n_clusters * n_chargers)
+        forecast = traffic_forecast(scenario.system)
+        ts = scenario.busiest_step()
+        scenario.replay(
+            ts,
+            lambda t: departure_routine(t, scenario.fleet),
+            lambda t: smart_reservation.reservation_routine(
+                t, scenario.sim_step, scenario.system, scenario.fleet, self.solver, forecast
+            ),
+            lambda t: smart_arrival.arrival_routine(t, scenario.sim_step, scenario.fleet),
+            lambda t: scenario.system.uncontrolled_supply(t, scenario.sim_step),
+        )
+        self.system = scenario.system
+        self.ts = ts
+        self.step = scenario.sim_step
+        self.horizon = timedelta(minutes=horizon_min)
+        self.penalty_parameters = {
+            "rho_y": dict((cc_id, 1) for cc_id in self.system.clusters),
+            "rho_eps": dict((cc_id, 1) for cc_id in self.system.clusters),
+        }
+
+    def time_decentralized_milp(self, n_chargers, n_clusters, horizon_min):
+        decentralized_milp.charging_routine(
+            self.ts,
+            self.step,
+            self.horizon,
+            self.system,
+            self.solver,
+            self.penalty_parameters,
+        )
+
+    def time_centralized_milp(self, n_chargers, n_clusters, horizon_min):
+        centralized_milp.charging_routine(
+            self.ts,
+            self.step,
+            self.horizon,
+            self.system,
+            self.solver,
+            self.penalty_parameters,
+        )
+
+
+def cluster_problem(n_evs, n_steps=24, p_max=11.0, load_factor=0.5, seed=0):
+    """
+    This function returns the inputs of the rescheduling problem of a cluster
+    whose EVs have random initial and target SOCs. Every second EV can
+    discharge.
+    """
+    rng = np.random.RandomState(seed)
+    ev_ids = ["EV%d" % (n + 1) for n in range(n_evs)]
+    limit = load_factor * n_evs * p_max
+    inisoc = dict(zip(ev_ids, rng.uniform(0.2, 0.8, n_evs)))
+    return (
+        300,
+        list(range(n_steps + 1)),
+        dict(enumerate(np.full(n_steps, limit))),
+        dict(enumerate(np.zeros(n_steps))),
+        0.1 * limit,
+        dict.fromkeys(ev_ids, 55 * 3600),
+        inisoc,
+        dict((v, min(1.0, inisoc[v] + rng.uniform(0.0, 0.4))) for v in ev_ids),
+        dict.fromkeys(ev_ids, 0.2),
+        dict.fromkeys(ev_ids, 1.0),
+        dict.fromkeys(ev_ids, 1.0),
+        dict.fromkeys(ev_ids, 1.0),
+        dict.fromkeys(ev_ids, p_max),
+        dict((v, p_max if n % 2 == 1 else 0.0) for n, v in enumerate(ev_ids)),
+        dict(zip(ev_ids, rng.randint(n_steps // 2, n_steps * 3 // 2, n_evs))),
+        1,
+        1,
+    )
+
+
+class ClusterRescheduling(object):
+    """
+    Rescheduling problem of a single cluster solved by the MILP and by the
+    solver-free heuristic. The objective of the MILP is tracked for both
+    solutions to compare their quality.
+    """
+
+    params = [["milp", "heuristic"], [5, 10, 20, 40]]
+    param_names = ["method", "n_evs"]
+    number = 1
+    repeat = 3
+
+    def setup(self, method, n_evs):
+        self.solver = open_source_solver()
+        self.problem = cluster_problem(n_evs)
+        self.reschedule = {
+            "milp": rescheduling_milp.reschedule,
+            "heuristic": rescheduling_heuristic.reschedule,
+        }[method]
+
+    def time_reschedule(self, method, n_evs):
+        self.reschedule(self.solver, *self.problem)
+
+    def track_objective(self, method, n_evs):
+        p_ref, s_ref = self.reschedule(self.solver, *self.problem)
+        opt_step, opt_horizon, upperlimit, lowerlimit, tolerance, bcap = self.problem[:6]
+        tarsoc, ch_eff, ds_eff = self.problem[7], self.problem[10], self.problem[11]
+        rho_y, rho_eps = self.problem[15:]
+        return rescheduling_heuristic.objective(
+            np.array([[p_ref[v][t] for t in opt_horizon[:-1]] for v in bcap]),
+            np.array([[s_ref[v][t] for t in opt_horizon] for v in bcap]),
+            np.array(list(upperlimit.values())),
+            np.array(list(lowerlimit.values())),
+            np.array(list(bcap.values())),
+            np.array([tarsoc[v] for v in bcap]),
+            np.array([ch_eff[v] for v in bcap]),
+            np.array([ds_eff[v] for v in bcap]),
+            rho_y,
+            rho_eps,
+        )
+
+    track_objective.unit = "objective"
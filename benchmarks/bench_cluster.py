@@ -0,0 +1,90 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Benchmarks of the charger cluster operations: availability queries and 
+uncontrolled charging.
+"""
+
+from datetime import timedelta
+
+from datafev.routines.arrival import arrival_routine
+from datafev.routines.departure import departure_routine
+
+from .scenarios import Scenario
+
+
+class Availability(object):
+    """
+    Availability queries of a cluster whose chargers are partially reserved.
+    """
+
+    params = [[10, 100, 1000], [1, 3]]
+    param_names = ["n_chargers", "n_clusters"]
+
+    def setup(self, n_chargers, n_clusters):
+        scenario = Scenario(n_clusters, n_chargers)
+        ts = scenario.busiest_step()
+        scenario.replay(
+            ts,
+            lambda t: departure_routine(t, scenario.fleet),
+            lambda t: arrival_routine(t, scenario.sim_step, scenario.fleet, scenario.system),
+        )
+        self.system = scenario.system
+        self.cluster = scenario.system.clusters["cluster1"]
+        self.start = ts
+        self.end = ts + timedelta(hours=4)
+        self.step = scenario.sim_step
+        self.deviations = {
+            "arr_del": dict((cc_id, timedelta(0)) for cc_id in self.system.clusters),
+            "dep_del": dict((cc_id, timedelta(0)) for cc_id in self.system.clusters),
+        }
+
+    def time_cluster_query_availability(self, n_chargers, n_clusters):
+        self.cluster.query_availability(self.start, self.end, self.step)
+
+    def time_system_query_availability(self, n_chargers, n_clusters):
+        self.system.query_availability(self.start, self.end, self.step, self.deviations)
+
+
+class UncontrolledSupply(object):
+    """
+    Uncontrolled charging of the EVs connected to the clusters.
+    """
+
+    params = [[10, 100, 1000], [1, 12]]
+    param_names = ["n_chargers", "n_steps"]
+
+    def setup(self, n_chargers, n_steps):
+        scenario = Scenario(1, n_chargers)
+        ts = scenario.busiest_step()
+        scenario.replay(
+            ts,
+            lambda t: departure_routine(t, scenario.fleet),
+            lambda t: arrival_routine(t, scenario.sim_step, scenario.fleet, scenario.system),
+            lambda t: scenario.system.uncontrolled_supply(t, scenario.sim_step),
+        )
+        self.system = scenario.system
+        self.ts = ts
+        self.step = scenario.sim_step
+
+    def time_uncontrolled_supply(self, n_chargers, n_steps):
+        self.system.uncontrolled_supply(self.ts, self.step, n_steps)
@@ -0,0 +1,65 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Benchmarks of scenario generation and fleet construction.
+"""
+
+from datafev.data_handling.fleet import EVFleet
+
+from .scenarios import Scenario, behavior_table, generate_fleet_data, generator_inputs
+
+
+class ScenarioGeneration(object):
+    """
+    Generation of EV fleet behavior from statistical data.
+    """
+
+    params = [100, 1000, 10000]
+    param_names = ["n_evs"]
+
+    def setup(self, n_evs):
+        # Reading the xlsx inputs is not measured
+        generator_inputs("simple")
+        generator_inputs("conditional")
+
+    def time_simple_pdfs(self, n_evs):
+        generate_fleet_data(n_evs, "simple")
+
+    def time_conditional_pdfs(self, n_evs):
+        generate_fleet_data(n_evs, "conditional")
+
+
+class FleetConstruction(object):
+    """
+    Construction of an EV fleet from its behavior table.
+    """
+
+    params = [100, 1000, 10000]
+    param_names = ["n_evs"]
+
+    def setup(self, n_evs):
+        scenario = Scenario(1, 1, n_evs=1)
+        self.sim_horizon = scenario.sim_horizon
+        self.behavior = behavior_table(generate_fleet_data(n_evs), ["cluster1"])
+
+    def time_fleet_construction(self, n_evs):
+        EVFleet("benchmark", self.behavior, self.sim_horizon)
@@ -0,0 +1,107 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Benchmarks of the reservation routines.
+"""
+
+from datafev.routines.departure import departure_routine
+from datafev.routines.simple_reservation import arrival as simple_arrival
+from datafev.routines.simple_reservation import reservation as simple_reservation
+from datafev.routines.smart_reservation import arrival as smart_arrival
+from datafev.routines.smart_reservation import reservation as smart_reservation
+
+from .bench_charging import traffic_forecast
+from .scenarios import Scenario, open_source_solver
+
+
+class SimpleReservation(object):
+    """
+    Simple reservations placed at the busiest reservation step.
+    """
+
+    params = [[10, 100], [1, 3]]
+    param_names = ["n_chargers", "n_clusters"]
+    number = 1
+    repeat = 5
+
+    def setup(self, n_chargers, n_clusters):
+        scenario = Scenario(n_clusters, n_chargers)
+        self.forecast = traffic_forecast(scenario.system)
+        ts = scenario.busiest_reservation_step()
+        scenario.replay(
+            ts,
+            lambda t: departure_routine(t, scenario.fleet),
+            lambda t: simple_reservation.reservation_routine(
+                t, scenario.sim_step, scenario.system, scenario.fleet, self.forecast
+            ),
+            lambda t: simple_arrival.arrival_routine(t, scenario.sim_step, scenario.fleet),
+        )
+        self.scenario = scenario
+        self.ts = ts
+
+    def time_reservation_routine(self, n_chargers, n_clusters):
+        simple_reservation.reservation_routine(
+            self.ts,
+            self.scenario.sim_step,
+            self.scenario.system,
+            self.scenario.fleet,
+            self.forecast,
+        )
+
+
+class SmartReservation(object):
+    """
+    Smart reservations (dynamic pricing and smart routing) placed at the 
+    busiest reservation step.
+    """
+
+    params = [[5, 20], [1, 3, 5]]
+    param_names = ["n_chargers", "n_clusters"]
+    number = 1
+    repeat = 3
+    timeout = 600
+
+    def setup(self, n_chargers, n_clusters):
+        self.solver = open_source_solver()
+        scenario = Scenario(n_clusters, n_chargers, n_evs=n_clusters * n_chargers)
+        self.forecast = traffic_forecast(scenario.system)
+        ts = scenario.busiest_reservation_step()
+        scenario.replay(
+            ts,
+            lambda t: departure_routine(t, scenario.fleet),
+            lambda t: smart_reservation.reservation_routine(
+                t, scenario.sim_step, scenario.system, scenario.fleet, self.solver, self.forecast
+            ),
+            lambda t: smart_arrival.arrival_routine(t, scenario.sim_step, scenario.fleet),
+        )
+        self.scenario = scenario
+        self.ts = ts
+
+    def time_reservation_routine(self, n_chargers, n_clusters):
+        smart_reservation.reservation_routine(
+            self.ts,
+            self.scenario.sim_step,
+            self.scenario.system,
+            self.scenario.fleet,
+            self.solver,
+            self.forecast,
+        )
@@ -0,0 +1,129 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Benchmarks of complete simulations and of the analysis and export of their 
+results.
+"""
+
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from datafev.routines.arrival import arrival_routine
+from datafev.routines.departure import departure_routine
+from datafev.routines.charging_control import decentralized_fcfs
+from datafev.simulation import Simulation, Stage
+
+from .scenarios import SIM_END, SIM_START, Scenario
+
+
+def simulation(scenario, charging="uncontrolled"):
+    """
+    This function returns the simulation of a scenario without reservations.
+
+    Parameters
+    ----------
+    scenario : Scenario
+        The simulated scenario.
+    charging : str, optional
+        'uncontrolled' or 'fcfs'. The default is 'uncontrolled'.
+
+    Returns
+    -------
+    datafev.simulation.Simulation
+        The simulation.
+
+    """
+    system = scenario.system
+    fleet = scenario.fleet
+    step = scenario.sim_step
+    if charging == "uncontrolled":
+        charging_stage = Stage("charging", system.uncontrolled_supply, step, multi_step=True)
+    else:
+        charging_stage = Stage("charging", decentralized_fcfs.charging_routine, step, system)
+    return Simulation(
+        system,
+        fleet,
+        scenario.sim_horizon,
+        step,
+        stages=[
+            Stage("departure", departure_routine, fleet, events_only=True),
+            Stage("arrival", arrival_routine, step, fleet, system, events_only=True),
+            charging_stage,
+        ],
+    )
+
+
+class SimulationRun(object):
+    """
+    Simulation of the whole scenario. The number of time steps is varied by
+    the resolution of the simulation.
+    """
+
+    params = [[10, 100], [15, 5, 1], [False, True]]
+    param_names = ["n_chargers", "step_min", "event_driven"]
+    number = 1
+    repeat = 3
+
+    def setup(self, n_chargers, step_min, event_driven):
+        self.scenario = Scenario(1, n_chargers, step=timedelta(minutes=step_min))
+        self.simulation = simulation(self.scenario)
+
+    def time_uncontrolled(self, n_chargers, step_min, event_driven):
+        self.simulation.run(event_driven=event_driven)
+
+
+class ResultExport(object):
+    """
+    Analysis and export of the results of a simulated scenario.
+    """
+
+    params = [10, 100]
+    param_names = ["n_chargers"]
+    timeout = 600
+
+    def setup(self, n_chargers):
+        self.scenario = Scenario(1, n_chargers)
+        simulation(self.scenario, "fcfs").run(event_driven=True)
+        self.cluster = self.scenario.system.clusters["cluster1"]
+        self.step = self.scenario.sim_step
+        self.directory = tempfile.mkdtemp()
+
+    def teardown(self, n_chargers):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_analyze_consumption_profile(self, n_chargers):
+        self.cluster.analyze_consumption_profile(SIM_START, SIM_END, self.step)
+
+    def time_analyze_occupation_profile(self, n_chargers):
+        self.cluster.analyze_occupation_profile(SIM_START, SIM_END, self.step)
+
+    def time_system_export_to_excel(self, n_chargers):
+        self.scenario.system.export_results_to_excel(
+            SIM_START, SIM_END, self.step, os.path.join(self.directory, "system.xlsx")
+        )
+
+    def time_fleet_export_to_excel(self, n_chargers):
+        self.scenario.fleet.export_results_to_excel(
+            SIM_START, SIM_END, self.step, os.path.join(self.directory, "fleet.xlsx")
+        )
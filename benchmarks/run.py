@@ -0,0 +1,201 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Runner of the benchmarks for the environments without asv.
+
+Usage (from the root folder of the repository):
+
+    python -m benchmarks.run [-k PATTERN] [--quick] [--save FILE] 
+                             [--compare FILE] [--threshold RATIO]
+
+Each benchmark is executed as in asv: setup() is called before each repeat,
+the time_*() method is timed 'number' times and teardown() is called after 
+the repeat. The median of the repeats is reported. The track_*() methods 
+return the reported values (e.g. objective values) instead of being timed. With --compare, the 
+results are compared to the results saved by a previous run, and the runner 
+exits with status 1 if a benchmark became slower than the threshold ratio.
+"""
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import re
+import sys
+from time import perf_counter
+import numpy as np
+
+
+def discover(pattern=None):
+    """
+    This function collects the benchmarks of the package.
+
+    Parameters
+    ----------
+    pattern : str, optional
+        Regular expression that the names of the benchmarks must contain. The
+        default is None.
+
+    Returns
+    -------
+    list of tuple
+        (name, class, method name) of the benchmarks.
+
+    """
+    package = os.path.dirname(os.path.abspath(__file__))
+    benchmarks = []
+    for module_info in sorted(pkgutil.iter_modules([package]), key=lambda m: m.name):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(__package__ + "." + module_info.name)
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method in sorted(
+                m for m in dir(cls) if m.startswith(("time_", "track_"))
+            ):
+                name = "%s.%s.%s" % (module_info.name, cls_name, method)
+                if pattern is None or re.search(pattern, name):
+                    benchmarks.append((name, cls, method))
+    return benchmarks
+
+
+def parameter_sets(cls):
+    """
+    This function returns the combinations of the parameters of a benchmark.
+    """
+    params = getattr(cls, "params", [])
+    if len(params) == 0:
+        return [()]
+    if not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return list(itertools.product(*params))
+
+
+def measure(cls, method, params, repeat):
+    """
+    This function times a benchmark (or evaluates a tracked value) for a 
+    combination of parameters.
+
+    Parameters
+    ----------
+    cls : class
+        The benchmark class.
+    method : str
+        Name of the timed (or tracking) method.
+    params : tuple
+        Parameters of the benchmark.
+    repeat : int
+        Number of repeats.
+
+    Returns
+    -------
+    float or None
+        Median time (s) of one call or median of the tracked values, None if 
+        the benchmark is skipped (i.e., setup raises NotImplementedError).
+
+    """
+    number = getattr(cls, "number", 1) or 1
+    samples = []
+    for _ in range(repeat):
+        benchmark = cls()
+        try:
+            if hasattr(benchmark, "setup"):
+                benchmark.setup(*params)
+        except NotImplementedError:
+            return None
+        try:
+            timed = getattr(benchmark, method)
+            if method.startswith("track_"):
+                samples.append(timed(*params))
+                continue
+            start = perf_counter()
+            for _ in range(number):
+                timed(*params)
+            samples.append((perf_counter() - start) / number)
+        finally:
+            if hasattr(benchmark, "teardown"):
+                benchmark.teardown(*params)
+    return float(np.median(samples))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="pattern", help="run the benchmarks matching PATTERN")
+    parser.add_argument("--quick", action="store_true", help="one repeat per benchmark")
+    parser.add_argument("--save", help="save the results to a json file")
+    parser.add_argument("--compare", help="compare to the results in a json file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="slowdown ratio reported as regression (default: 1.2)",
+    )
+    args = parser.parse_args(argv)
+
+    results = {}
+    failed = False
+    for name, cls, method in discover(args.pattern):
+        repeat = 1 if args.quick else getattr(cls, "repeat", 5)
+        for params in parameter_sets(cls):
+            key = "%s(%s)" % (name, ", ".join(repr(p) for p in params))
+            try:
+                elapsed = measure(cls, method, params, repeat)
+            except Exception as error:
+                print("%-90s failed (%s: %s)" % (key, type(error).__name__, error))
+                failed = True
+                continue
+            if elapsed is None:
+                print("%-90s skipped" % key)
+            else:
+                results[key] = elapsed
+                unit = getattr(getattr(cls, method), "unit", "s")
+                print("%-90s %10.4f %s" % (key, elapsed, unit))
+            sys.stdout.flush()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = [
+            (key, baseline[key], elapsed)
+            for key, elapsed in results.items()
+            if key in baseline and elapsed > args.threshold * baseline[key]
+        ]
+        print()
+        print("%d regression(s) beyond x%.2f" % (len(regressions), args.threshold))
+        for key, before, after in regressions:
+            print("%-90s %10.4f s -> %10.4f s (x%.2f)" % (key, before, after, after / before))
+        if regressions:
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Synthetic scenarios of parameterized size for the benchmarks.
+
+The EV fleets are generated with the statistical scenario generators of 
+datafev from the inputs of the scenario generation tutorials. The charger 
+clusters are built with identical chargers and with consumption limits 
+proportional to their number of chargers.
+"""
+
+import os
+import random
+from datetime import datetime, timedelta
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from pyomo.environ import SolverFactory
+
+from datafev.data_handling.fleet import EVFleet
+from datafev.data_handling.cluster import ChargerCluster
+from datafev.data_handling.multi_cluster import MultiClusterSystem
+from datafev.routines.scenario_generation import sceneration, utils
+
+GENERATOR_INPUTS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    os.pardir,
+    "src",
+    "tutorials",
+    "scenario_generation",
+)
+
+# The conditional generator input describes the arrivals and departures on
+# 1 June 2021 until 19:00
+SIM_START = datetime(2021, 6, 1, 7)
+SIM_END = datetime(2021, 6, 1, 20)
+SIM_STEP = timedelta(minutes=5)
+
+# Open-source solvers in the order of preference
+OPEN_SOURCE_SOLVERS = ("appsi_highs", "cbc", "glpk")
+
+
+@lru_cache(maxsize=None)
+def generator_inputs(kind):
+    """
+    This function reads the inputs of the scenario generators from the xlsx 
+    files of the tutorials.
+
+    Parameters
+    ----------
+    kind : str
+        'simple' or 'conditional'.
+
+    Returns
+    -------
+    dict
+        Keyword arguments of the scenario generator.
+
+    """
+    if kind == "simple":
+        path = os.path.join(GENERATOR_INPUTS, "input_generator_simple_pdfs.xlsx")
+        (
+            arr_times_dict,
+            dep_times_dict,
+            arr_soc_dict,
+            dep_soc_dict,
+            ev_dict,
+        ) = utils.excel_to_sceneration_input_simple_pdfs(file_path=path)
+        return dict(
+            arr_times_dict=arr_times_dict,
+            dep_times_dict=dep_times_dict,
+            arr_soc_dict=arr_soc_dict,
+            dep_soc_dict=dep_soc_dict,
+            ev_dict=ev_dict,
+        )
+    else:
+        path = os.path.join(GENERATOR_INPUTS, "input_generator_conditional_pdfs.xlsx")
+        (
+            end_time,
+            times_dict,
+            times_prob_dict,
+            soc_dict,
+            soc_prob_dict,
+            ev_dict,
+        ) = utils.excel_to_sceneration_input_conditional_pdfs(file_path=path)
+        return dict(
+            times_dict=times_dict,
+            times_prob_dict=times_prob_dict,
+            soc_dict=soc_dict,
+            soc_prob_dict=soc_prob_dict,
+            ev_dict=ev_dict,
+            endtime=end_time,
+        )
+
+
+def generate_fleet_data(n_evs, kind="conditional", seed=0):
+    """
+    This function generates the behavior of an EV fleet from statistical data.
+
+    Parameters
+    ----------
+    n_evs : int
+        Number of EVs.
+    kind : str, optional
+        'simple' for generate_fleet_from_simple_pdfs (n_evs EVs per day on 
+        1 June 2021), 'conditional' for generate_fleet_from_conditional_pdfs.
+        The default is 'conditional'.
+    seed : int, optional
+        Seed of the random number generator. The default is 0.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Output of the scenario generator.
+
+    """
+    np.random.seed(seed)
+    if kind == "simple":
+        return sceneration.generate_fleet_from_simple_pdfs(
+            number_of_evs_per_day=n_evs,
+            startdate=SIM_START.date(),
+            enddate=SIM_START.date(),
+            timedelta_in_min=15,
+            **generator_inputs("simple")
+        )
+    else:
+        return sceneration.generate_fleet_from_conditional_pdfs(
+            number_of_evs=n_evs, timedelta_in_min=15, **generator_inputs("conditional")
+        )
+
+
+def behavior_table(fleet_data, clusters, reservation_lead=timedelta(minutes=5)):
+    """
+    This function converts the output of the scenario generators to the 
+    behavior table of an EV fleet. The EVs are assigned to the clusters in 
+    turn and place their reservations before arrival.
+
+    Parameters
+    ----------
+    fleet_data : pandas.DataFrame
+        Output of the scenario generator.
+    clusters : list
+        Identifiers of the clusters.
+    reservation_lead : datetime.timedelta, optional
+        Time between reservation and arrival. The reservations are not placed
+        before SIM_START. The default is five minutes.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Behavior table to initialize an EVFleet.
+
+    """
+    n_evs = len(fleet_data)
+    arrival = pd.to_datetime(fleet_data["ArrivalTime"].values).tz_localize(None)
+    departure = pd.to_datetime(fleet_data["DepartureTime"].values).tz_localize(None)
+    reservation = (arrival - reservation_lead).where(
+        arrival - reservation_lead > SIM_START, SIM_START
+    )
+
+    return pd.DataFrame(
+        {
+            "ev_id": ["v%05d" % n for n in range(n_evs)],
+            "Battery Capacity (kWh)": fleet_data["BatteryCapacity(kWh)"].values,
+            "p_max_ch (kW)": fleet_data["MaxChargingPower(kW)"].values,
+            "p_max_ds (kW)": fleet_data["MaxChargingPower(kW)"].values,
+            "Reservation Time": reservation,
+            "Estimated Arrival Time": arrival,
+            "Estimated Departure Time": departure,
+            "Estimated Arrival SOC": fleet_data["ArrivalSoC"].values,
+            "Target SOC @ Estimated Departure Time": fleet_data["DepartureSoC"].values,
+            "V2G Allowance (kWh)": 10.0,
+            "Real Arrival Time": arrival,
+            "Real Arrival SOC": fleet_data["ArrivalSoC"].values,
+            "Real Departure Time": departure,
+            "Target Cluster": [clusters[n % len(clusters)] for n in range(n_evs)],
+        }
+    )
+
+
+def build_system(n_clusters, n_chargers, step=SIM_STEP, p_max=11.0, load_factor=0.6):
+    """
+    This function builds a multi-cluster system of identical clusters.
+
+    Parameters
+    ----------
+    n_clusters : int
+        Number of clusters.
+    n_chargers : int
+        Number of chargers per cluster.
+    step : datetime.timedelta, optional
+        Time resolution of the limits and prices. The default is SIM_STEP.
+    p_max : float, optional
+        Charge/discharge power rating of the chargers (kW). The default is 11.
+    load_factor : float, optional
+        Ratio of the consumption limits of the clusters to their installed 
+        capacity. The default is 0.6.
+
+    Returns
+    -------
+    system : data_handling.multi_cluster.MultiClusterSystem
+        The multi-cluster system.
+
+    """
+    hours = pd.date_range(SIM_START, SIM_END, freq="H")
+    system = MultiClusterSystem("benchmark")
+
+    for c in range(n_clusters):
+        cc_id = "cluster%d" % (c + 1)
+        topology = pd.DataFrame(
+            {
+                "cu_id": ["CC%02d_%04d" % (c + 1, n + 1) for n in range(n_chargers)],
+                "cu_p_ch_max (kW)": p_max,
+                "cu_p_ds_max (kW)": p_max,
+                "cu_eff": 1.0,
+            }
+        )
+        cluster = ChargerCluster(cc_id, topology)
+        limit = load_factor * n_chargers * p_max
+        capacity = pd.DataFrame(
+            {"TimeStep": hours, "LB (kW)": -limit, "UB (kW)": limit}
+        )
+        cluster.enter_power_limits(SIM_START, SIM_END, step, capacity)
+        system.add_cc(cluster)
+
+    limit = load_factor * n_clusters * n_chargers * p_max
+    capacity = pd.DataFrame({"TimeStep": hours, "LB": -limit, "UB": limit})
+    system.enter_power_limits(SIM_START, SIM_END, step, capacity)
+
+    # Time-of-use tariff with an evening peak
+    price = pd.Series(
+        [0.4 if 17 <= t.hour < 20 else 0.3 for t in hours], index=hours
+    )
+    system.enter_tou_price(price, step)
+
+    return system
+
+
+def open_source_solver():
+    """
+    This function returns the first available open-source solver. The solver 
+    can be specified with the environment variable DATAFEV_BENCHMARK_SOLVER.
+
+    Raises
+    ------
+    NotImplementedError
+        If none of the solvers is available (benchmarks raising it in setup()
+        are skipped).
+
+    Returns
+    -------
+    pyomo SolverFactory object
+        The solver.
+
+    """
+    names = os.environ.get("DATAFEV_BENCHMARK_SOLVER")
+    names = names.split(",") if names else OPEN_SOURCE_SOLVERS
+    for name in names:
+        solver = SolverFactory(name)
+        if solver.available(exception_flag=False):
+            return solver
+    raise NotImplementedError("No open-source solver available: %s" % ", ".join(names))
+
+
+class Scenario(object):
+    """
+    A simulation scenario: a multi-cluster system and an EV fleet generated 
+    for it.
+    """
+
+    def __init__(self, n_clusters, n_chargers, n_evs=None, step=SIM_STEP, seed=0):
+        """
+        Scenarios are generated at initialization.
+
+        Parameters
+        ----------
+        n_clusters : int
+            Number of clusters.
+        n_chargers : int
+            Number of chargers per cluster.
+        n_evs : int, optional
+            Number of EVs. The default is None, in which case there are two 
+            EVs per charger.
+        step : datetime.timedelta, optional
+            Time resolution of the simulation. The default is SIM_STEP.
+        seed : int, optional
+            Seed of the random number generators. The default is 0.
+
+        Returns
+        -------
+        None.
+
+        """
+        if n_evs is None:
+            n_evs = 2 * n_clusters * n_chargers
+
+        self.sim_step = step
+        self.sim_horizon = [
+            SIM_START + t * step for t in range(int((SIM_END - SIM_START) / step))
+        ]
+        self.system = build_system(n_clusters, n_chargers, step)
+        self.behavior = behavior_table(
+            generate_fleet_data(n_evs, seed=seed), list(self.system.clusters.keys())
+        )
+        self.fleet = EVFleet("benchmark", self.behavior, self.sim_horizon)
+
+        # The routines of datafev draw random numbers
+        np.random.seed(seed)
+        random.seed(seed)
+
+    def busiest_step(self):
+        """
+        This method returns the time step with the largest number of EVs in
+        the clusters.
+        """
+        presence = self.fleet.presence_distribution
+        return max(self.sim_horizon, key=lambda t: presence[t])
+
+    def busiest_reservation_step(self):
+        """
+        This method returns the time step with the largest number of
+        reservation requests.
+        """
+        return max(
+            self.sim_horizon, key=lambda t: len(self.fleet.reserving_at.get(t, []))
+        )
+
+    def replay(self, until, *routines):
+        """
+        This method executes the routines at the time steps before a given 
+        time.
+
+        Parameters
+        ----------
+        until : datetime.datetime
+            The first time step that is not simulated.
+        *routines : 
+            Functions called with the time step as argument.
+
+        Returns
+        -------
+        None.
+
+        """
+        for ts in self.sim_horizon:
+            if ts >= until:
+                break
+            for routine in routines:
+                routine(ts)
@@ -21,6 +21,7 @@
 
 from pyomo.core import *
 import pyomo.kernel as pmo
+from datafev import profiling
 
 
 def calculate_G2V_potential(
@@ -89,6 +90,10 @@ def calculate_G2V_potential(
         
     """
 
+    prof = profiling.start(
+        "cluster.potentialEstimationG2V_milp.calculate_G2V_potential"
+    )
+
     ###########################################################################
     ####################Constructing the optimization model####################
     model = ConcreteModel()
@@ -193,7 +198,9 @@ def calculate_G2V_potential(
 
     ###########################################################################
     ######################Solving the optimization model ######################
+    prof.lap("build", model=model)
     result = solver.solve(model)
+    prof.lap("solve", result=result)
     ###########################################################################
 
     ###########################################################################
@@ -211,6 +218,8 @@ def calculate_G2V_potential(
             
     for t in opt_horizon[:-1]:
         c_schedule[t]=model.p_cc[t]()
+    prof.lap("extract")
+    prof.stop()
     ###########################################################################
 
     return p_schedule, s_schedule, c_schedule
@@ -19,6 +19,7 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 
+import numpy as np
 import pandas as pd
 
 
@@ -32,6 +33,9 @@ def idp(schedule, upper_bound, lower_bound, tou_tariff, f_discount, f_markup):
         - increase the charging price for time steps where the schedule exceeds the upper bound of the desired range,
         - and decrease the charging price for time steps where the schedule is below the lower bound of the desired range.
     
+    The dictionaries are converted to arrays in the order of the time steps 
+    of tou_tariff and the prices are calculated by idp_array.
+    
     Parameters
     ----------
     schedule : dict of float
@@ -61,23 +65,79 @@ def idp(schedule, upper_bound, lower_bound, tou_tariff, f_discount, f_markup):
             
     """
 
-    sc = pd.Series(schedule)
-    ub = pd.Series(upper_bound)
-    lb = pd.Series(lower_bound)
-    kappa = pd.Series(tou_tariff)
-    kappa_L = kappa.min()
-    kappa_U = kappa.max()
+    steps = list(tou_tariff.keys())
 
-    overloadedsteps = sc[sc >= ub].index
-    underloadedsteps = sc[sc < lb].index
+    sc = np.array([schedule[t] for t in steps], dtype=float)
+    ub = np.array([upper_bound[t] for t in steps], dtype=float)
+    lb = np.array([lower_bound[t] for t in steps], dtype=float)
+    kappa = np.array([tou_tariff[t] for t in steps], dtype=float)
 
-    ome = kappa.copy()
-    ome[underloadedsteps] = kappa_L - f_discount * (
-        lb[underloadedsteps] - sc[underloadedsteps]
-    )
-    ome[overloadedsteps] = kappa_U + f_markup * (sc - ub)[overloadedsteps]
+    ome = idp_array(sc, ub, lb, kappa, f_discount, f_markup)
+
+    omega = dict(zip(steps, ome.tolist()))
+
+    return omega
+
+
+def idp_array(schedule, upper_bound, lower_bound, tou_tariff, f_discount, f_markup):
+    """
+    This is the array-based implementation of idp. The inputs are given as 
+    2-D arrays (clusters x time steps) so that the price signals of several 
+    clusters are calculated in one call. 1-D arrays are treated as the inputs
+    of a single cluster.
+    
+    The price range of each cluster (i.e., the minimum and maximum of its TOU
+    tariff) is evaluated along its row. Missing values in the tariff are 
+    skipped in the evaluation of the price range.
+
+    Parameters
+    ----------
+    schedule : numpy.ndarray
+        Aggregate schedules of the clusters (kW).
+    upper_bound : numpy.ndarray
+        Upper bounds of the desired consumption ranges (kW).
+    lower_bound : numpy.ndarray
+        Lower bounds of the desired consumption ranges (kW).
+    tou_tariff : numpy.ndarray
+        Standard TOU tariffs of the cluster operators (Eur/kWh).
+    f_discount : float or numpy.ndarray
+        Discount factor to compensate each kW of deficit consumption (Eur/kW).
+        An array gives one factor per cluster.
+    f_markup : float or numpy.ndarray
+        Markup factor to compensate each kW of excessive consumption (Eur/kW).
+        An array gives one factor per cluster.
+
+    Returns
+    -------
+    omega : numpy.ndarray
+        Dynamic price signals (Eur/kWh) with the shape of tou_tariff.
+
+    """
+
+    sc = np.asarray(schedule, dtype=float)
+    ub = np.asarray(upper_bound, dtype=float)
+    lb = np.asarray(lower_bound, dtype=float)
+    kappa = np.asarray(tou_tariff, dtype=float)
 
-    omega = ome.to_dict()
+    if kappa.shape[-1] == 0:
+        return kappa.copy()
+
+    # Factors of the clusters are broadcast along the time steps
+    f_discount = np.asarray(f_discount, dtype=float)
+    f_markup = np.asarray(f_markup, dtype=float)
+    if f_discount.ndim == 1:
+        f_discount = f_discount[:, None]
+    if f_markup.ndim == 1:
+        f_markup = f_markup[:, None]
+
+    kappa_L = np.nanmin(kappa, axis=-1, keepdims=True)
+    kappa_U = np.nanmax(kappa, axis=-1, keepdims=True)
+
+    overloaded = sc >= ub
+    underloaded = sc < lb
+
+    omega = np.where(underloaded, kappa_L - f_discount * (lb - sc), kappa)
+    omega = np.where(overloaded, kappa_U + f_markup * (sc - ub), omega)
 
     return omega
 
@@ -148,3 +208,13 @@ if __name__ == "__main__":
     results["sTOU"] = pd.Series(tou)
     results["DP signal"] = pd.Series(omega)
     print(results)
+    print()
+
+    print("Execution of the array-based algorithm for three clusters in one call...")
+    schedules = np.random.uniform(low=44, high=88, size=(3, 12))
+    upper_bs = np.ones((3, 12)) * 70
+    lower_bs = np.ones((3, 12)) * 50
+    tous = np.tile(list(tou.values()), (3, 1))
+    omegas = idp_array(schedules, upper_bs, lower_bs, tous, f_disc, f_mark)
+    print("Dynamic price signals of the clusters (rows) in the time steps (columns):")
+    print(pd.DataFrame(omegas).round(3))
@@ -0,0 +1,104 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import numpy as np
+
+
+def firstcomefirstserve(p_re, efficiency, contime, upperlimit):
+    """
+    This is a control algorithm that manages the real-time charging rates of
+    the EV chargers in a cluster under given power limits. The control is 
+    based on the first-come-first-serve rule: the EVs that have been connected
+    longer are served first.
+
+    Parameters
+    ----------
+    p_re : numpy.ndarray
+        Power requested by EVs (kW).
+    efficiency : numpy.ndarray
+        Power conversion efficiencies of chargers.
+    contime : numpy.ndarray
+        How long EVs have been connected (seconds).
+    upperlimit : float
+        Upper limit of cluster power consumption (kW). As in the sequential
+        allocation of the margin, a negative limit is assigned to the EV 
+        that has been connected longest (i.e., it is discharged) and the
+        other EVs get no power.
+
+    Returns
+    -------
+    p_charge : numpy.ndarray
+        Charge power (kW) to each EV connected in the cluster.
+
+    """
+
+    p_re = np.asarray(p_re, dtype=float)
+    efficiency = np.asarray(efficiency, dtype=float)
+    contime = np.asarray(contime, dtype=float)
+
+    # The power that chargers want to withdraw from grid to meet EVs' requests
+    p_max_to_cu = p_re / efficiency
+
+    # The requests are served in the order of arrival until the cluster limit is reached
+    order = np.argsort(-contime, kind="stable")
+    r = p_max_to_cu[order]
+    served = np.zeros(len(r))
+    served[order] = np.clip(upperlimit - (np.cumsum(r) - r), 0.0, r)
+    if upperlimit < 0 and len(r) > 0:
+        # The negative margin is given to the first EV, which closes the margin
+        served[order[0]] = upperlimit
+
+    return served * efficiency
+
+
+if __name__ == "__main__":
+
+    import pandas as pd
+
+    ###########################################################################
+    # Input parameters
+
+    PEV = 22  # Maximum charge power that the chargers can supply
+    N = 8  # Number of connected EVs in the system
+    upperlimit = 0.5 * N * PEV  # Aggregate power consumption constraint of the cluster
+
+    np.random.seed(0)
+    p_re = np.random.uniform(low=0.5 * PEV, high=PEV, size=N)
+    efficiency = np.full(N, 0.95)
+    contime = np.random.randint(low=0, high=7200, size=N)
+
+    ###########################################################################
+
+    print("The cluster with total installed capacity of:", N * PEV, "kW")
+    print("...has a power limit of:", upperlimit, "kW")
+    print()
+
+    p_charge = firstcomefirstserve(p_re, efficiency, contime, upperlimit)
+
+    result = pd.DataFrame(
+        {
+            "Connection Time (s)": contime,
+            "Requested Power": p_re,
+            "Controlled Consumption": p_charge,
+        },
+        index=["EV" + str(n) for n in range(1, N + 1)],
+    )
+    print(result.sort_values("Connection Time (s)", ascending=False))
@@ -19,7 +19,168 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 
+import numpy as np
 import pandas as pd
+from datafev.data_handling.power_soc import PowerSOCTable, to_power_soc_table
+
+# Table of the EVs whose power capability does not depend on the SOC
+_NO_SOC_DEPENDENCY = PowerSOCTable([0.0], [1.0], [np.inf])
+
+
+def stack_power_soc_tables(tables):
+    """
+    This function stacks the SOC dependencies of the power capabilities of
+    multiple EV batteries into the padded arrays consumed by
+    leastlaxityfirst_array.
+
+    Parameters
+    ----------
+    tables : list
+        SOC dependency tables of EV batteries. An item is either None (no SOC
+        dependency), a compiled PowerSOCTable, a dataframe with columns 
+        'SOC_LB', 'SOC_UB' and 'P_UB' or a dictionary of SOC ranges as in 
+        leastlaxityfirst.
+
+    Returns
+    -------
+    soc_breaks : numpy.ndarray
+        Breakpoints of the SOC ranges (EVs x ranges+1). Rows with fewer ranges
+        are padded by repeating their last breakpoint.
+    p_limits : numpy.ndarray
+        Power limits (kW) in the SOC ranges (EVs x ranges). Padded ranges and
+        EVs without SOC dependency have infinite limits.
+
+    """
+
+    compiled = []
+    for table in tables:
+        table = to_power_soc_table(table)
+        compiled.append(_NO_SOC_DEPENDENCY if table is None else table)
+
+    n_ranges = max((len(table) for table in compiled), default=1)
+    soc_breaks = np.zeros((len(compiled), n_ranges + 1))
+    p_limits = np.full((len(compiled), n_ranges), np.inf)
+
+    for n, table in enumerate(compiled):
+        k = len(table)
+        soc_breaks[n, : k + 1] = table.soc_breaks
+        soc_breaks[n, k + 1 :] = table.soc_breaks[-1]
+        p_limits[n, :k] = table.p_limits
+
+    return soc_breaks, p_limits
+
+
+def leastlaxityfirst_array(
+    inisoc,
+    tarsoc,
+    bcap,
+    efficiency,
+    p_chmax,
+    p_re,
+    leadtime,
+    upperlimit,
+    soc_breaks=None,
+    p_limits=None,
+):
+    """
+    This is the array-based implementation of leastlaxityfirst. All EV
+    parameters are given as arrays with one entry per EV in the cluster.
+
+    The minimum charging time of an EV is evaluated from the cumulative time
+    spent in the SOC ranges of its power-SOC table: the SOC ranges holding the
+    current and target SOCs are located by searchsorted. The cluster capacity
+    is then allocated in the order of increasing laxity.
+
+    Parameters
+    ----------
+    inisoc : numpy.ndarray
+        Initial SOCs of EV batteries.
+    tarsoc : numpy.ndarray
+        Target SOCs of EVs.
+    bcap : numpy.ndarray
+        Battery capactiy of EVs (kWs).
+    efficiency : numpy.ndarray
+        Power conversion efficiencies of chargers.
+    p_chmax : numpy.ndarray
+        Maximum charge power capabilities of EVs (kW).
+    p_re : numpy.ndarray
+        Power requested by EVs (kW).
+    leadtime : numpy.ndarray
+        How long EVs are expected to stay connected (seconds).
+    upperlimit : float
+        Upper limit of cluster power consumption (kW). As in the sequential
+        allocation of the margin, a negative limit is assigned to the EV 
+        with the least laxity (i.e., it is discharged) and the other EVs get
+        no power.
+    soc_breaks : numpy.ndarray, optional
+        Breakpoints of the SOC ranges (EVs x ranges+1) as returned by
+        stack_power_soc_tables. The default is None (no SOC dependency).
+    p_limits : numpy.ndarray, optional
+        Power limits (kW) in the SOC ranges (EVs x ranges) as returned by
+        stack_power_soc_tables. The default is None (no SOC dependency).
+
+    Returns
+    -------
+    p_charge : numpy.ndarray
+        Charge power (kW) to each EV connected in the cluster.
+
+    """
+
+    inisoc = np.asarray(inisoc, dtype=float)
+    tarsoc = np.asarray(tarsoc, dtype=float)
+    bcap = np.asarray(bcap, dtype=float)
+    efficiency = np.asarray(efficiency, dtype=float)
+    p_chmax = np.asarray(p_chmax, dtype=float)
+    p_re = np.asarray(p_re, dtype=float)
+    leadtime = np.asarray(leadtime, dtype=float)
+    n_ev = len(inisoc)
+
+    if soc_breaks is None:
+        soc_breaks = np.tile([0.0, 1.0], (n_ev, 1))
+        p_limits = np.full((n_ev, 1), np.inf)
+
+    # Minimum time (per unit of battery capacity) to charge a unit of SOC in each range
+    with np.errstate(divide="ignore"):
+        rate = 1.0 / np.minimum(p_limits, p_chmax[:, None])
+
+    # Minimum time (per unit of battery capacity) to charge from the first breakpoint to the others
+    widths = np.diff(soc_breaks, axis=1)
+    cumtime = np.zeros_like(rate)
+    cumtime[:, 1:] = np.cumsum(widths[:, :-1] * rate[:, :-1], axis=1)
+
+    # Rows are shifted apart so that all ranges can be located by a single searchsorted
+    span = soc_breaks.max() - soc_breaks.min() + 1.0
+    shift = np.arange(n_ev)[:, None] * span
+    flat = (soc_breaks[:, :-1] + shift).ravel()
+
+    def time_to(soc):
+        i = np.searchsorted(flat, soc + shift[:, 0], side="right") - 1
+        r = np.clip(i - np.arange(n_ev) * rate.shape[1], 0, rate.shape[1] - 1)
+        n = np.arange(n_ev)
+        return cumtime[n, r] + (soc - soc_breaks[n, r]) * rate[n, r]
+
+    # Laxity is defined with the formula LAX=1-T_MIN/T_LEAD
+    # T_MIN  : Minimum time required to achieve target SOC (T_MIN>=0)
+    # T_LEAD : Time until estimated departure (T_LEAD>0)
+    with np.errstate(invalid="ignore"):
+        t_min = np.where(
+            inisoc >= tarsoc, 0.0, (time_to(tarsoc) - time_to(inisoc)) * bcap
+        )
+    laxity = 1 - t_min / leadtime
+
+    # The power that chargers want to withdraw from grid to meet EVs' requests
+    p_max_to_cu = p_re / efficiency
+
+    # The requests are served in the order of least laxity until the cluster limit is reached
+    order = np.argsort(laxity, kind="stable")
+    r = p_max_to_cu[order]
+    served = np.zeros(n_ev)
+    served[order] = np.clip(upperlimit - (np.cumsum(r) - r), 0.0, r)
+    if upperlimit < 0 and len(r) > 0:
+        # The negative margin is given to the first EV, which closes the margin
+        served[order[0]] = upperlimit
+
+    return served * efficiency
 
 
 def leastlaxityfirst(
@@ -64,146 +225,23 @@ def leastlaxityfirst(
 
     """
 
-    # This will contain the laxity of EVs
-    laxity = {}
-
-    # Laxity is defined with the formula LAX=1-T_MIN/T_LEAD
-    # T_MIN  : Minimum time required to achieve target SOC (T_MIN>=0)
-    # T_LEAD : Time until estimated departure (T_LEAD>0)
-
-    for ev_id in inisoc.keys():
-
-        # Lead time until estimated departure
-        T_LEAD = leadtime[ev_id]
-
-        if inisoc[ev_id] >= tarsoc[ev_id]:
-
-            # Minimum time required to acheive taget SOC is 0 if target SOC is already achieved
-            T_MIN = 0
-
-        else:
-
-            # Target SOC has not been achieved yet: T_MIN will have a postive value
-
-            if p_socdep[ev_id] == None:
-
-                # The EV battery does not have a specific charger power-SOC dependency limiting the power transfer
-                # T_MIN is determined by p_chmax (max power that charger-EV pair can handle for whole SOC range
-                T_MIN = (tarsoc[ev_id] - inisoc[ev_id]) * bcap[ev_id] / p_chmax[ev_id]
-
-            else:
-
-                # The EV battery has a specific charger power-SOC dependency limiting the power transfer
-                table = pd.DataFrame(p_socdep[ev_id]).T
-
-                # Current SOC range of the EV
-                I = (
-                    table[
-                        (table["SOC_LB"] <= inisoc[ev_id])
-                        & (inisoc[ev_id] < table["SOC_UB"])
-                    ]
-                ).index[0]
-
-                # Target SOC range of the EV
-                F = (
-                    table[
-                        (table["SOC_LB"] <= tarsoc[ev_id])
-                        & (tarsoc[ev_id] < table["SOC_UB"])
-                    ]
-                ).index[0]
-
-                if I == F:
-
-                    # The current SOC is in the same range as the target SOC
-                    # The EV can be charged with a constant power until target SOC is reached
-                    p_max_in_range = table.loc[I, "P_UB"]
-
-                    # Maximum feasible power input to EV can be smaller though (taking into account the charger rating)
-                    p_max_feassible = min(p_max_in_range, p_chmax[ev_id])
-
-                    # T_MIN is determined by considering only p_max_feasible
-                    T_MIN = (
-                        (tarsoc[ev_id] - inisoc[ev_id]) * bcap[ev_id] / p_max_feassible
-                    )
-
-                else:
-
-                    # T_MIN is determined by taking into account the variations in charge power capability with SOC change
-                    # T_MIN will be summation of the minimum time spent in each SOC range
-                    time_in_range = (
-                        {}
-                    )  # Will contain the minimum time spent within a particular SOC range
-
-                    # Loop through all SOC ranges to calculate the minimum time spent in each SOC range
-                    for r in range(I, F + 1):
-
-                        # Parameters for the specific SOC range
-                        soc_ub_in_range = table.loc[r, "SOC_UB"]
-                        soc_lb_in_range = table.loc[r, "SOC_LB"]
-                        p_max_in_range = table.loc[r, "P_UB"]
-
-                        # Maximum feasible power input to EV in this SOC range (taking into account the charger rating)
-                        p_max_feassible = min(p_max_in_range, p_chmax[ev_id])
-
-                        # Calculation of minimum time spent in specific SOC range through charging
-                        if r == I:
-                            # From initial SOC to upper bound of this particular range
-                            time_in_range[r] = (
-                                (soc_ub_in_range - inisoc[ev_id])
-                                * bcap[ev_id]
-                                / p_max_feassible
-                            )
-                        elif r < F:
-                            # From lower to upper bound of this particular range
-                            time_in_range[r] = (
-                                (soc_ub_in_range - soc_lb_in_range)
-                                * bcap[ev_id]
-                                / p_max_feassible
-                            )
-                        else:  # r==F
-                            # From lower bound of this particular range to target SOC
-                            time_in_range[r] = (
-                                (tarsoc[ev_id] - soc_lb_in_range)
-                                * bcap[ev_id]
-                                / p_max_feassible
-                            )
-
-                    T_MIN = sum(time_in_range[r] for r in range(I, F + 1))
-
-        # Laxity of this EV's charging demand
-        LAX = 1 - T_MIN / T_LEAD
-
-        # Store in the laxity dictionary
-        laxity[ev_id] = LAX
-
-    # Sorting EVs according to their laxity (least laxity first)
-    vehicles_sorted = (pd.Series(laxity).sort_values(ascending=True)).index
-
-    p_charge = {}  # Will contain the charge power consumed by the EVs
-    free_margin = upperlimit  # Cluster level constraint
-
-    for ev in vehicles_sorted:
-
-        # The power that charger wants to withdraw from grid to meet EV's request
-        p_max_to_cu = p_re[ev] / efficiency[ev]
-
-        if p_max_to_cu <= free_margin:
-
-            # The grid has enough margin to suppy the requested amount
-            p_to_ev = p_max_to_cu * efficiency[ev]
-
-        else:
-
-            # The grid does not have enough margin to supply the requested amount
-            p_to_ev = free_margin * efficiency[ev]
-
-        # This EV will get p_to_ev amount of power in this control horizon
-        p_charge[ev] = p_to_ev
-
-        # Available margin is closed after dedicating certain capacity to the EVs
-        free_margin -= p_to_ev / efficiency[ev]
+    ev_ids = list(inisoc.keys())
+    soc_breaks, p_limits = stack_power_soc_tables([p_socdep[ev] for ev in ev_ids])
+
+    p_charge = leastlaxityfirst_array(
+        [inisoc[ev] for ev in ev_ids],
+        [tarsoc[ev] for ev in ev_ids],
+        [bcap[ev] for ev in ev_ids],
+        [efficiency[ev] for ev in ev_ids],
+        [p_chmax[ev] for ev in ev_ids],
+        [p_re[ev] for ev in ev_ids],
+        [leadtime[ev] for ev in ev_ids],
+        upperlimit,
+        soc_breaks,
+        p_limits,
+    )
 
-    return p_charge
+    return dict(zip(ev_ids, p_charge))
 
 
 if __name__ == "__main__":
@@ -268,11 +306,8 @@ if __name__ == "__main__":
         p_socdep[evid] = pow_soc_dep_table
 
         # EVs want to consume the maximum feasible power in their SOC range
-        table = pd.DataFrame(pow_soc_dep_table).T
-        inisoc_range = (
-            table[(table["SOC_LB"] <= inisoc[evid]) & (inisoc[evid] < table["SOC_UB"])]
-        ).index[0]
-        p_re[evid] = min(PEV, table.loc[inisoc_range, "P_UB"])
+        table = PowerSOCTable.from_frame(pd.DataFrame(pow_soc_dep_table).T)
+        p_re[evid] = min(PEV, table.p_max(inisoc[evid]))
 
     ###########################################################################
 
@@ -0,0 +1,378 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import numpy as np
+from datafev.algorithms.cluster.rescheduling_milp import reschedule as reschedule_milp
+
+
+def reschedule(
+    solver,
+    opt_step,
+    opt_horizon,
+    upperlimit,
+    lowerlimit,
+    tolerance,
+    bcap,
+    inisoc,
+    tarsoc,
+    minsoc,
+    maxsoc,
+    ch_eff,
+    ds_eff,
+    pmax_pos,
+    pmax_neg,
+    deptime,
+    rho_y,
+    rho_eps,
+    incumbent=None,
+    relaxation=False,
+    n_eps=5,
+):
+    """
+    This function reschedules the charging operations of a cluster with a
+    heuristic instead of solving the MILP in rescheduling_milp. It has the
+    same inputs and outputs as rescheduling_milp.reschedule so that it can
+    replace it for large clusters where solving the MILP in every control
+    step is too slow.
+
+    The horizon is traversed step by step. In each step, every connected EV
+    requests the power that brings it closest to its target SOC. The requests
+    are served in the order of increasing laxity (number of steps the EV can
+    stay idle and still reach its target before departure) until the upper
+    limit of the cluster is reached. Discharging EVs increase the room for
+    charging under the upper limit. If the net consumption is below the lower
+    limit, discharging is reduced first and then the EVs with SOC headroom
+    are charged beyond their targets. Likewise, if the net consumption is 
+    above the upper limit, the EVs with SOC above their minimum are 
+    discharged beyond their targets.
+
+    The allowed violation of the limits is chosen among n_eps values between
+    0 and tolerance by evaluating the objective of the MILP for each. The
+    allocations that violate the limits by more than tolerance are 
+    discarded. If there is no other allocation, the MILP is solved instead.
+
+    Parameters
+    ----------
+    solver : pyomo SolverFactory object
+        Optimization solver. Used only if the heuristic cannot keep the 
+        violation of the limits within tolerance.
+    opt_step : int
+        Size of one time step in the optimization (seconds).
+    opt_horizon : list of integers
+        Time step identifiers in the optimization horizon.
+    upperlimit : dict of float
+        Soft upper limit of cluster power consumption (kW).
+    lowerlimit : dict of float
+        Soft lower limit of cluster power consumption (kW).
+    tolerance : float
+        Maximum allowed violation of upper-lower limits (kW).
+    bcap : dict of float
+        Battery capactiy of EVs (kWs).
+    inisoc : dict of float
+        Initial SOCs of EV batteries (0<inisoc[key]<1).
+    tarsoc : dict of float
+        Target SOCs of EVs (0<inisoc[key]<1).
+    minsoc : dict of float
+        Minimum allowed SOCs.
+    maxsoc : dict of float
+        Maximum allowed SOCs.
+    ch_eff : dict of float
+        Charging efficiency of chargers.
+    ds_eff : dict of float
+        Discharging efficiency of chargers.
+    pmax_pos : dict of float
+        Maximum charge power that EV battery can withdraw (kW).
+    pmax_neg : dict of float
+        Maximum discharge power that EV battery can supply (kW).
+    deptime : dict of int
+        Number of time steps until departures of EVs.
+    rho_y : float
+        Penalty factor for deviation of reference schedules (unitless).
+    rho_eps : float
+        Penalty factor for violation of upper-lower soft limits (unitless).
+    incumbent : tuple of dict, optional
+        Passed to rescheduling_milp.reschedule if the MILP is solved. The 
+        default is None.
+    relaxation : bool, optional
+        Passed to rescheduling_milp.reschedule if the MILP is solved. The
+        default is False.
+    n_eps : int, optional
+        Number of candidate violations of the limits. The default is 5.
+
+    Returns
+    -------
+    p_schedule : dict
+        Power schedule.
+        It contains a dictionary for each EV. Each item in the EV dictionary
+        indicates the power to be supplied to the EV(kW) during a particular
+        time step.
+    s_schedule : dict
+        SOC schedule.
+        It contains a dictionary for each EV. Each item in the EV dictionary
+        indicates the SOC to be achieved by the EV by a particular time step.
+
+    Raises
+    ------
+    RuntimeError
+        If the heuristic cannot keep the violation within tolerance and no
+        solver is given.
+
+    """
+
+    ev_ids = list(bcap.keys())
+    steps = opt_horizon[:-1]
+
+    E = np.array([bcap[v] for v in ev_ids], dtype=float)
+    s_ini = np.array([inisoc[v] for v in ev_ids], dtype=float)
+    s_tar = np.array([tarsoc[v] for v in ev_ids], dtype=float)
+    s_min = np.array([minsoc[v] for v in ev_ids], dtype=float)
+    s_max = np.array([maxsoc[v] for v in ev_ids], dtype=float)
+    eff_ch = np.array([ch_eff[v] for v in ev_ids], dtype=float)
+    eff_ds = np.array([ds_eff[v] for v in ev_ids], dtype=float)
+    p_pos = np.array([pmax_pos[v] for v in ev_ids], dtype=float)
+    p_neg = np.array([pmax_neg[v] for v in ev_ids], dtype=float)
+    t_dep = np.array([deptime[v] for v in ev_ids], dtype=float)
+    p_up = np.array([upperlimit[t] for t in steps], dtype=float)
+    p_low = np.array([lowerlimit[t] for t in steps], dtype=float)
+
+    best = None
+    for eps in np.unique(np.linspace(0.0, tolerance, n_eps)):
+        p, s = _allocate(
+            opt_step,
+            p_up + eps,
+            p_low - eps,
+            E,
+            s_ini,
+            s_tar,
+            s_min,
+            s_max,
+            eff_ch,
+            eff_ds,
+            p_pos,
+            p_neg,
+            t_dep,
+        )
+        if violation(p, p_up, p_low, eff_ch, eff_ds) > tolerance + 1e-6:
+            continue
+        obj = objective(p, s, p_up, p_low, E, s_tar, eff_ch, eff_ds, rho_y, rho_eps)
+        if best is None or obj < best[0] - 1e-9:
+            best = (obj, p, s)
+
+    if best is None:
+        if solver is None:
+            raise RuntimeError("The limits cannot be kept within tolerance")
+        return reschedule_milp(
+            solver,
+            opt_step,
+            opt_horizon,
+            upperlimit,
+            lowerlimit,
+            tolerance,
+            bcap,
+            inisoc,
+            tarsoc,
+            minsoc,
+            maxsoc,
+            ch_eff,
+            ds_eff,
+            pmax_pos,
+            pmax_neg,
+            deptime,
+            rho_y,
+            rho_eps,
+            incumbent=incumbent,
+            relaxation=relaxation,
+        )
+    obj, p, s = best
+
+    p_schedule = {}
+    s_schedule = {}
+    for n, v in enumerate(ev_ids):
+        p_schedule[v] = dict(zip(steps, p[n].tolist()))
+        s_schedule[v] = dict(zip(opt_horizon, s[n].tolist()))
+
+    return p_schedule, s_schedule
+
+
+def objective(p, s, p_up, p_low, E, s_tar, eff_ch, eff_ds, rho_y, rho_eps):
+    """
+    This function evaluates the objective function of the rescheduling MILP
+    for given power and SOC schedules.
+
+    Parameters
+    ----------
+    p : numpy.ndarray
+        Net charge power of EVs (EVs x time steps, kW).
+    s : numpy.ndarray
+        SOC of EVs (EVs x time steps+1).
+    p_up : numpy.ndarray
+        Upper limit of cluster power consumption (kW).
+    p_low : numpy.ndarray
+        Lower limit of cluster power consumption (kW).
+    E : numpy.ndarray
+        Battery capacities of EVs (kWs).
+    s_tar : numpy.ndarray
+        Target SOCs of EVs.
+    eff_ch : numpy.ndarray
+        Charging efficiencies.
+    eff_ds : numpy.ndarray
+        Discharging efficiencies.
+    rho_y : float
+        Penalty factor for deviation of reference schedules.
+    rho_eps : float
+        Penalty factor for violation of upper-lower soft limits.
+
+    Returns
+    -------
+    float
+        Objective value.
+
+    """
+
+    eps = violation(p, p_up, p_low, eff_ch, eff_ds)
+    y = np.abs(s_tar - s[:, -1])
+    return rho_y * float((y * E / 3600).sum()) + rho_eps * eps
+
+
+def violation(p, p_up, p_low, eff_ch, eff_ds):
+    """
+    This function calculates the largest violation of the upper-lower limits
+    of cluster power consumption (kW) for a given power schedule.
+
+    Parameters
+    ----------
+    p : numpy.ndarray
+        Net charge power of EVs (EVs x time steps, kW).
+    p_up : numpy.ndarray
+        Upper limit of cluster power consumption (kW).
+    p_low : numpy.ndarray
+        Lower limit of cluster power consumption (kW).
+    eff_ch : numpy.ndarray
+        Charging efficiencies.
+    eff_ds : numpy.ndarray
+        Discharging efficiencies.
+
+    Returns
+    -------
+    float
+        Violation of the limits (kW).
+
+    """
+
+    p_cc = _cluster_power(p, eff_ch, eff_ds)
+    return max(0.0, (p_cc - p_up).max(initial=0.0), (p_low - p_cc).max(initial=0.0))
+
+
+def _cluster_power(p, eff_ch, eff_ds):
+    """
+    This function maps the net charge powers of EVs to the consumption of the
+    cluster (kW).
+    """
+
+    p_ch = np.clip(p, 0.0, None) / eff_ch[:, None]
+    p_ds = np.clip(-p, 0.0, None) * eff_ds[:, None]
+    return (p_ch - p_ds).sum(axis=0)
+
+
+def _serve(request, order, capacity):
+    """
+    This function serves the requests in the given order until the capacity
+    is exhausted. The last served request may be served partially.
+    """
+
+    served = np.zeros_like(request)
+    r = request[order]
+    before = np.cumsum(r) - r
+    served[order] = np.clip(capacity - before, 0.0, r)
+    return served
+
+
+def _allocate(
+    dt, p_up, p_low, E, s_ini, s_tar, s_min, s_max, eff_ch, eff_ds, p_pos, p_neg, t_dep
+):
+    """
+    This function allocates the EV powers step by step by serving the EV
+    requests in the order of increasing laxity within the given limits of
+    cluster consumption. It returns the net charge powers (EVs x time steps)
+    and the SOCs (EVs x time steps+1).
+    """
+
+    n_ev, n_t = len(E), len(p_up)
+    p = np.zeros((n_ev, n_t))
+    s = np.zeros((n_ev, n_t + 1))
+    s[:, 0] = s_ini
+
+    for t in range(n_t):
+
+        soc = s[:, t]
+        connected = t < t_dep
+
+        # Number of steps the EVs remain connected within the horizon
+        steps_left = np.clip(np.ceil(t_dep) - t, 1, n_t - t)
+
+        # Energy to be charged (positive) or discharged (negative) to reach the target (kWs)
+        gap = (s_tar - soc) * E
+
+        # Power that brings the EVs closest to their targets within their SOC limits (kW)
+        ch_req = np.minimum(p_pos, np.clip(gap, 0.0, None) / dt)
+        ch_req = np.minimum(ch_req, np.clip(s_max - soc, 0.0, None) * E / dt)
+        ds_req = np.minimum(p_neg, np.clip(-gap, 0.0, None) / dt)
+        ds_req = np.minimum(ds_req, np.clip(soc - s_min, 0.0, None) * E / dt)
+        ch_req = np.where(connected, ch_req, 0.0)
+        ds_req = np.where(connected, ds_req, 0.0)
+
+        # Laxity: steps that can be spent idle without missing the target
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lax_ch = steps_left - np.where(p_pos > 0, gap / (p_pos * dt), np.inf)
+            lax_ds = steps_left - np.where(p_neg > 0, -gap / (p_neg * dt), np.inf)
+        order_ch = np.argsort(lax_ch, kind="stable")
+        order_ds = np.argsort(lax_ds, kind="stable")
+
+        # Grid-side requests (kW)
+        ch_grid = ch_req / eff_ch
+        ds_grid = ds_req * eff_ds
+
+        # Discharging EVs make room for charging under the upper limit
+        ch_grid = _serve(ch_grid, order_ch, p_up[t] + ds_grid.sum())
+
+        # Discharging is reduced if it pushes the net consumption below the lower limit
+        ds_grid = _serve(ds_grid, order_ds, max(0.0, ch_grid.sum() - p_low[t]))
+
+        # The EVs with SOC headroom are charged further if consumption is still below the lower limit
+        deficit = p_low[t] - (ch_grid.sum() - ds_grid.sum())
+        if deficit > 0:
+            headroom = np.minimum(p_pos, np.clip(s_max - soc, 0.0, None) * E / dt)
+            extra_req = np.where(connected, headroom / eff_ch - ch_grid, 0.0)
+            extra_req = np.where(ds_grid > 0, 0.0, np.clip(extra_req, 0.0, None))
+            ch_grid = ch_grid + _serve(extra_req, np.argsort(soc, kind="stable"), deficit)
+
+        # The EVs with SOC above the minimum are discharged further if consumption is still above the upper limit
+        excess = (ch_grid.sum() - ds_grid.sum()) - p_up[t]
+        if excess > 0:
+            room = np.minimum(p_neg, np.clip(soc - s_min, 0.0, None) * E / dt)
+            extra_req = np.where(connected, room * eff_ds - ds_grid, 0.0)
+            extra_req = np.where(ch_grid > 0, 0.0, np.clip(extra_req, 0.0, None))
+            ds_grid = ds_grid + _serve(extra_req, np.argsort(-soc, kind="stable"), excess)
+
+        p[:, t] = ch_grid * eff_ch - ds_grid / eff_ds
+        s[:, t + 1] = soc + p[:, t] * dt / E
+
+    return p, s
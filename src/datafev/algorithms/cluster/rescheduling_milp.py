@@ -20,7 +20,10 @@
 
 
 from pyomo.core import *
+from pyomo.opt import SolverFactory, TerminationCondition
+from pyomo.solvers.plugins.solvers.persistent_solver import PersistentSolver
 import pyomo.kernel as pmo
+from datafev import profiling
 
 
 def reschedule(
@@ -42,6 +45,8 @@ def reschedule(
     deptime,
     rho_y,
     rho_eps,
+    incumbent=None,
+    relaxation=False,
 ):
     """
     This function reschedules the charging operations of a cluster by considering:
@@ -51,6 +56,11 @@ def reschedule(
     This is run typically when some events require deviations from previously
     determined schedules.
 
+    Binary charge/discharge decisions are only created for the EVs that can
+    both charge and discharge. If there is no such EV, the model is an LP.
+    The decisions of the time steps where only one direction is possible
+    (see fixed_decisions) are fixed, which does not change the optimum.
+
     Parameters
     ----------
     solver : pyomo SolverFactory object
@@ -89,6 +99,14 @@ def reschedule(
         Penalty factor for deviation of reference schedules (unitless).
     rho_eps : float
         Penalty factor for violation of upper-lower soft limits (unitless).
+    incumbent : tuple of dict, optional
+        Power and SOC schedules to start the solver from (see shift_incumbent).
+        If given, they are passed to the solver as a MIP start. The default is
+        None.
+    relaxation : bool, optional
+        If True, the LP relaxation is solved and its charge/discharge decisions
+        are rounded and fixed before solving the model again as LP (see
+        solve). The default is False.
 
     Returns
     -------
@@ -104,10 +122,15 @@ def reschedule(
         
     """
 
+    prof = profiling.start("cluster.rescheduling_milp.reschedule")
+
     ###########################################################################
     ####################Constructing the optimization model####################
     model = ConcreteModel()
     model.V = Set(initialize=list(bcap.keys()))  # Index set for the EVs
+    model.Vx = Set(
+        initialize=[v for v in bcap.keys() if pmax_pos[v] > 0 and pmax_neg[v] > 0]
+    )  # Index set for the EVs that can both charge and discharge
 
     # Time parameters
     model.deltaSec = opt_step  # Time discretization (Size of one time step in seconds)
@@ -153,7 +176,7 @@ def reschedule(
     model.p_ev_neg = Var(
         model.V, model.T, within=NonNegativeReals
     )  # Disharging power of EV
-    model.x_ev = Var(model.V, model.T, within=pmo.Binary)  # Whether EV is charging
+    model.x_ev = Var(model.Vx, model.T, within=pmo.Binary)  # Whether EV is charging
     model.s = Var(model.V, model.Tp, within=NonNegativeReals)  # EV SOC variable
 
     # System variables
@@ -207,8 +230,10 @@ def reschedule(
     ):  # EV indexed by v can charge only when x[v,t]==1 at t
         if t >= model.t_dep[v]:
             return model.p_ev_pos[v, t] == 0
-        else:
+        elif v in model.Vx:
             return model.p_ev_pos[v, t] <= model.x_ev[v, t] * model.P_EV_pos[v]
+        else:
+            return model.p_ev_pos[v, t] <= model.P_EV_pos[v]
 
     model.combconst1 = Constraint(model.V, model.T, rule=combinatorics_ch)
 
@@ -217,8 +242,10 @@ def reschedule(
     ):  # EV indexed by v can discharge only when x[v,t]==0 at t
         if t >= model.t_dep[v]:
             return model.p_ev_neg[v, t] == 0
-        else:
+        elif v in model.Vx:
             return model.p_ev_neg[v, t] <= (1 - model.x_ev[v, t]) * model.P_EV_neg[v]
+        else:
+            return model.p_ev_neg[v, t] <= model.P_EV_neg[v]
 
     model.combconst2 = Constraint(model.V, model.T, rule=combinatorics_ds)
 
@@ -265,11 +292,32 @@ def reschedule(
 
     model.obj = Objective(rule=obj_rule, sense=minimize)
 
+    decisions = fixed_decisions(
+        opt_step,
+        opt_horizon,
+        {v: bcap[v] for v in model.Vx},
+        inisoc,
+        minsoc,
+        maxsoc,
+        pmax_pos,
+        pmax_neg,
+        deptime,
+    )
+    for (v, t), x in decisions.items():
+        model.x_ev[v, t].fix(x)
+
     ###########################################################################
 
     ###########################################################################
+    prof.lap("build", model=model)
+
     ######################Solving the optimization model ######################
-    result = solver.solve(model)
+    if incumbent is not None:
+        load_incumbent(model, incumbent)
+    result = solve(
+        solver, model, warmstart=incumbent is not None, relaxation=relaxation
+    )
+    prof.lap("solve", result=result)
     ###########################################################################
 
     ###########################################################################
@@ -283,11 +331,632 @@ def reschedule(
             if t < max(opt_horizon):
                 p_schedule[v][t] = model.p_ev[v, t]()
             s_schedule[v][t] = model.s[v, t]()
+    prof.lap("extract")
+    prof.stop()
     ###########################################################################
 
     return p_schedule, s_schedule
 
 
+def fixed_decisions(
+    opt_step, opt_horizon, bcap, inisoc, minsoc, maxsoc, pmax_pos, pmax_neg, deptime
+):
+    """
+    This function detects the time steps where the charge/discharge decision
+    of an EV is determined without solving the model. In these steps either
+    both power directions are idle or only one of them is possible, so the 
+    binary decision can be fixed without changing the optimum:
+        - after the departure of the EV, no power is exchanged (x=1),
+        - as long as the SOC cannot have risen above the minimum SOC, the EV
+          cannot discharge (x=1),
+        - as long as the SOC cannot have fallen below the maximum SOC, the 
+          EV cannot charge (x=0).
+    The SOC limits bind the SOCs reached within the horizon, therefore the 
+    last time step is only fixed after departure.
+
+    EVs whose V2G allowance is exhausted have no separate parameter in the 
+    model; they are represented by pmax_neg=0 and have no binary decisions.
+
+    Parameters
+    ----------
+    opt_step : int
+        Size of one time step in the optimization (seconds).
+    opt_horizon : list of integers
+        Time step identifiers in the optimization horizon.
+    bcap : dict of float
+        Battery capactiy of the EVs with binary decisions (kWs).
+    inisoc : dict of float
+        Initial SOCs of EV batteries.
+    minsoc : dict of float
+        Minimum allowed SOCs.
+    maxsoc : dict of float
+        Maximum allowed SOCs.
+    pmax_pos : dict of float
+        Maximum charge power that EV battery can withdraw (kW).
+    pmax_neg : dict of float
+        Maximum discharge power that EV battery can supply (kW).
+    deptime : dict of int
+        Number of time steps until departures of EVs.
+
+    Returns
+    -------
+    decisions : dict of int
+        Fixed decisions (1: charge, 0: discharge).
+        Key: (EV identifier, time step identifier).
+
+    """
+
+    steps = opt_horizon[:-1]
+    decisions = {}
+    for v in bcap.keys():
+        rise = pmax_pos[v] * opt_step / bcap[v]
+        fall = pmax_neg[v] * opt_step / bcap[v]
+        for k, t in enumerate(steps):
+            if t >= deptime[v]:
+                decisions[v, t] = 1
+            elif k == len(steps) - 1:
+                continue
+            elif inisoc[v] + k * rise <= minsoc[v]:
+                decisions[v, t] = 1
+            elif inisoc[v] - k * fall >= maxsoc[v]:
+                decisions[v, t] = 0
+    return decisions
+
+
+_solvers = {}
+
+
+def get_solver(solver):
+    """
+    This function returns the solver object of a solver given by name. The
+    object is created once in each process and reused in the following 
+    calls, so that the worker processes of an executor build their own 
+    solvers (solver objects such as appsi_highs cannot be pickled). Solver
+    objects are returned as they are.
+
+    Parameters
+    ----------
+    solver : str or pyomo SolverFactory object
+        Solver name (e.g. "appsi_highs") or optimization solver.
+
+    Returns
+    -------
+    pyomo SolverFactory object
+        Optimization solver.
+
+    """
+
+    if not isinstance(solver, str):
+        return solver
+    if solver not in _solvers:
+        _solvers[solver] = SolverFactory(solver)
+    return _solvers[solver]
+
+
+def shift_incumbent(p_schedule, s_schedule):
+    """
+    This function shifts the schedules of a rescheduling solution one time
+    step forward so that they can be used as the incumbent of the problem
+    solved in the next control step. The last power step of the shifted
+    schedule is idle and the last SOC is kept.
+
+    Parameters
+    ----------
+    p_schedule : dict
+        Power schedule returned by a rescheduling function.
+    s_schedule : dict
+        SOC schedule returned by a rescheduling function.
+
+    Returns
+    -------
+    incumbent : tuple of dict
+        Shifted power and SOC schedules.
+
+    """
+
+    p_shifted = {}
+    s_shifted = {}
+    for v in p_schedule.keys():
+        steps = sorted(p_schedule[v].keys())
+        p_shifted[v] = dict(zip(steps[:-1], [p_schedule[v][t] for t in steps[1:]]))
+        p_shifted[v][steps[-1]] = 0.0
+        steps = sorted(s_schedule[v].keys())
+        s_shifted[v] = dict(zip(steps[:-1], [s_schedule[v][t] for t in steps[1:]]))
+        s_shifted[v][steps[-1]] = s_schedule[v][steps[-1]]
+
+    return p_shifted, s_shifted
+
+
+def load_incumbent(model, incumbent, ev_ids=None):
+    """
+    This function initializes the EV variables of a rescheduling model with
+    the values of an incumbent solution. Binary variables are set according
+    to the sign of the power unless they are fixed or not created for the
+    EV. The variables of the EVs (or time steps) that are not in the 
+    incumbent (e.g. new arrivals) are cleared, which leaves a partial start
+    instead of the values of a previous solution. The other variables of 
+    the model (e.g. p_cc, eps, y) are cleared as well.
+
+    Parameters
+    ----------
+    model : pyomo ConcreteModel
+        Rescheduling model with the variables p_ev, p_ev_pos, p_ev_neg, x_ev
+        and s.
+    incumbent : tuple of dict
+        Power and SOC schedules (see shift_incumbent).
+    ev_ids : dict, optional
+        EV identifiers of the model indices if these are not the EV
+        identifiers themselves. The default is None.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    # Values of a previous solution must not leak into the start
+    for var in model.component_objects(Var):
+        for x in var.values():
+            if not x.fixed:
+                x.set_value(None, skip_validation=True)
+
+    p_incumbent, s_incumbent = incumbent
+    for v in model.V:
+        ev_id = v if ev_ids is None else ev_ids.get(v)
+        if ev_id not in p_incumbent:
+            continue
+        for t in model.T:
+            if t in p_incumbent[ev_id]:
+                p = p_incumbent[ev_id][t]
+                model.p_ev[v, t].set_value(p, skip_validation=True)
+                model.p_ev_pos[v, t].set_value(max(p, 0.0), skip_validation=True)
+                model.p_ev_neg[v, t].set_value(max(-p, 0.0), skip_validation=True)
+                if (v, t) in model.x_ev and not model.x_ev[v, t].fixed:
+                    model.x_ev[v, t].set_value(1 if p >= 0 else 0)
+        for t in model.Tp:
+            if t in s_incumbent[ev_id]:
+                model.s[v, t].set_value(
+                    max(s_incumbent[ev_id][t], 0.0), skip_validation=True
+                )
+
+
+def solve(solver, model, warmstart=False, relaxation=False):
+    """
+    This function solves a rescheduling model and passes the initial values
+    of the variables as MIP start if requested and supported by the solver.
+
+    With relaxation, the binary variables x_ev are relaxed to [0,1] and the
+    LP is solved. Each relaxed decision is then rounded to the direction of
+    the larger of the charge and discharge powers and fixed, and the model
+    is solved again as LP. If the rounded model has no optimal solution, the
+    MILP is solved instead.
+
+    Parameters
+    ----------
+    solver : pyomo SolverFactory object
+        Optimization solver.
+    model : pyomo ConcreteModel
+        Optimization model.
+    warmstart : bool, optional
+        Whether the current variable values should be used as MIP start. The
+        default is False.
+    relaxation : bool, optional
+        Whether the LP relaxation should be solved and rounded. The default
+        is False.
+
+    Returns
+    -------
+    result : pyomo SolverResults object
+        Results returned by the solver.
+
+    Raises
+    ------
+    RuntimeError
+        If the solver does not terminate with an optimal or feasible 
+        solution, since the variables may still hold the values of a 
+        previous solution.
+
+    """
+
+    result = _solve(solver, model, warmstart, relaxation)
+    condition = result.solver.termination_condition
+    if condition not in _SOLVED:
+        raise RuntimeError(
+            "Rescheduling problem could not be solved (termination condition: %s)"
+            % condition
+        )
+    return result
+
+
+_SOLVED = (
+    TerminationCondition.optimal,
+    TerminationCondition.globallyOptimal,
+    TerminationCondition.locallyOptimal,
+    TerminationCondition.feasible,
+)
+
+
+def _solve(solver, model, warmstart, relaxation):
+    """
+    This function implements solve without checking the termination
+    condition of the final solution.
+    """
+
+    binaries = [x for x in model.x_ev.values() if not x.fixed]
+
+    if relaxation and len(binaries) > 0:
+
+        for x in binaries:
+            x.domain = UnitInterval
+        solver.solve(model)
+
+        for (v, t), x in model.x_ev.items():
+            if not x.fixed:
+                x.fix(1 if model.p_ev_pos[v, t].value >= model.p_ev_neg[v, t].value else 0)
+        for x in binaries:
+            x.domain = pmo.Binary
+
+        try:
+            result = solver.solve(model)
+            repaired = (
+                result.solver.termination_condition == TerminationCondition.optimal
+            )
+        except RuntimeError:
+            # Some interfaces raise if no solution can be loaded
+            repaired = False
+
+        for x in binaries:
+            x.unfix()
+
+        if repaired:
+            return result
+
+    if warmstart and getattr(solver, "warm_start_capable", lambda: False)():
+        return solver.solve(model, warmstart=True)
+    else:
+        return solver.solve(model)
+
+
+class Rescheduler(object):
+    """
+    Reusable form of the rescheduling problem solved by reschedule().
+
+    The optimization model is constructed once for a given number of EV slots
+    and a given optimization horizon. All demand, limit and penalty parameters
+    are declared as mutable Pyomo parameters so that subsequent calls only
+    update their values. The automatic persistent interfaces of Pyomo (e.g.
+    appsi_highs) detect the changes and keep their internal model between
+    the calls. Classic persistent interfaces (e.g. gurobi_persistent) are not
+    supported since they do not track mutable parameters in constraints.
+
+    Slots that are not occupied by an EV in a call are deactivated by zero
+    power limits and equal initial and target SOCs. The binary variables of
+    the slots whose EVs cannot both charge and discharge are fixed, so that
+    the solver receives an LP if no EV needs them.
+    """
+
+    def __init__(self, solver, n_slots=0, relaxation=False):
+        """
+        This method initializes the rescheduler object.
+
+        Parameters
+        ----------
+        solver : pyomo SolverFactory object
+            Optimization solver. Classic persistent interfaces are not
+            supported.
+        n_slots : int, optional
+            Number of EVs that the model is built for (e.g. number of chargers
+            in the cluster). If more EVs are given in a call, the model is
+            rebuilt with more slots. The default is 0.
+        relaxation : bool, optional
+            Whether the LP relaxation should be solved and rounded instead of
+            the MILP (see solve). The default is False.
+
+        Returns
+        -------
+        None.
+
+        Raises
+        ------
+        ValueError
+            If the solver is a classic persistent interface.
+
+        """
+        if isinstance(solver, PersistentSolver):
+            raise ValueError(
+                "Classic persistent solver interfaces are not supported, use an "
+                "automatic persistent interface (e.g. appsi_highs) instead"
+            )
+        self.solver = solver
+        self.n_slots = n_slots
+        self.relaxation = relaxation
+        self.model = None
+        self.shape = None
+
+    def build_model(self, n_slots, opt_horizon):
+        """
+        This method constructs the optimization model with mutable parameters.
+
+        Parameters
+        ----------
+        n_slots : int
+            Number of EVs that the model can host.
+        opt_horizon : list of integers
+            Time step identifiers in the optimization horizon.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        model = ConcreteModel()
+        model.V = Set(initialize=range(n_slots), ordered=True)  # Index set for the EV slots
+
+        # Time parameters
+        model.deltaSec = Param(mutable=True, initialize=0)
+        model.T = Set(initialize=opt_horizon[:-1], ordered=True)
+        model.Tp = Set(initialize=opt_horizon, ordered=True)
+
+        # Power capability parameters
+        model.P_EV_pos = Param(model.V, mutable=True, initialize=0)
+        model.P_EV_neg = Param(model.V, mutable=True, initialize=0)
+        model.P_CC_up = Param(model.T, mutable=True, initialize=0)
+        model.P_CC_low = Param(model.T, mutable=True, initialize=0)
+        model.P_CC_vio = Param(mutable=True, initialize=0)
+
+        # Battery and charger parameters
+        model.eff_ch = Param(model.V, mutable=True, initialize=1)
+        model.eff_ds = Param(model.V, mutable=True, initialize=1)
+        model.E = Param(model.V, mutable=True, initialize=1)
+
+        # Demand parameters
+        model.s_ini = Param(model.V, mutable=True, initialize=0)
+        model.s_tar = Param(model.V, mutable=True, initialize=0)
+        model.s_min = Param(model.V, mutable=True, initialize=0)
+        model.s_max = Param(model.V, mutable=True, initialize=1)
+        model.a_ev = Param(
+            model.V, model.T, mutable=True, initialize=0
+        )  # Whether EV is still connected at t (replaces the departure time)
+
+        # Penalty parameters
+        model.rho_y = Param(mutable=True, initialize=0)
+        model.rho_eps = Param(mutable=True, initialize=0)
+
+        # EV Variables
+        model.p_ev = Var(model.V, model.T, within=Reals)
+        model.p_ev_pos = Var(model.V, model.T, within=NonNegativeReals)
+        model.p_ev_neg = Var(model.V, model.T, within=NonNegativeReals)
+        model.x_ev = Var(model.V, model.T, within=pmo.Binary)
+        model.s = Var(model.V, model.Tp, within=NonNegativeReals)
+
+        # System variables
+        model.p_cc = Var(model.T, within=Reals)
+
+        # Deviation
+        model.eps = Var(within=NonNegativeReals)
+        model.y = Var(model.V, within=NonNegativeReals)
+
+        # CONSTRAINTS
+        def initialsoc(model, v):
+            return model.s[v, 0] == model.s_ini[v]
+
+        model.inisoc = Constraint(model.V, rule=initialsoc)
+
+        def minimumsoc(model, v, t):
+            return model.s_min[v] <= model.s[v, t]
+
+        model.minsoc_con = Constraint(model.V, model.T, rule=minimumsoc)
+
+        def maximumsoc(model, v, t):
+            return model.s_max[v] >= model.s[v, t]
+
+        model.maxsoc_con = Constraint(model.V, model.T, rule=maximumsoc)
+
+        def storageConservation(model, v, t):
+            return model.s[v, t + 1] == (
+                model.s[v, t]
+                + (model.p_ev_pos[v, t] - model.p_ev_neg[v, t])
+                / model.E[v]
+                * model.deltaSec
+            )
+
+        model.socconst = Constraint(model.V, model.T, rule=storageConservation)
+
+        def chargepowerlimit(model, v, t):
+            return model.p_ev[v, t] == model.p_ev_pos[v, t] - model.p_ev_neg[v, t]
+
+        model.chrpowconst = Constraint(model.V, model.T, rule=chargepowerlimit)
+
+        def combinatorics_ch(model, v, t):
+            return (
+                model.p_ev_pos[v, t]
+                <= model.x_ev[v, t] * model.P_EV_pos[v] * model.a_ev[v, t]
+            )
+
+        model.combconst1 = Constraint(model.V, model.T, rule=combinatorics_ch)
+
+        def combinatorics_ds(model, v, t):
+            return (
+                model.p_ev_neg[v, t]
+                <= (1 - model.x_ev[v, t]) * model.P_EV_neg[v] * model.a_ev[v, t]
+            )
+
+        model.combconst2 = Constraint(model.V, model.T, rule=combinatorics_ds)
+
+        def ccpower(model, t):
+            return model.p_cc[t] == sum(
+                model.p_ev_pos[v, t] / model.eff_ch[v]
+                - model.p_ev_neg[v, t] * model.eff_ds[v]
+                for v in model.V
+            )
+
+        model.ccpowtotal = Constraint(model.T, rule=ccpower)
+
+        def cluster_limit_violation(model):
+            return model.eps <= model.P_CC_vio
+
+        model.viol_clust = Constraint(rule=cluster_limit_violation)
+
+        def cluster_upper_limit(model, t):
+            return model.p_cc[t] <= model.eps + model.P_CC_up[t]
+
+        model.ccpowcap_pos = Constraint(model.T, rule=cluster_upper_limit)
+
+        def cluster_lower_limit(model, t):
+            return -model.eps + model.P_CC_low[t] <= model.p_cc[t]
+
+        model.ccpowcap_neg = Constraint(model.T, rule=cluster_lower_limit)
+
+        def individual_pos_deviation(model, v):
+            return model.s_tar[v] - model.s[v, max(opt_horizon)] <= model.y[v]
+
+        model.indev_pos = Constraint(model.V, rule=individual_pos_deviation)
+
+        def individual_neg_deviation(model, v):
+            return -model.y[v] <= model.s_tar[v] - model.s[v, max(opt_horizon)]
+
+        model.indev_neg = Constraint(model.V, rule=individual_neg_deviation)
+
+        # OBJECTIVE FUNCTION
+        def obj_rule(model):
+            return (
+                model.rho_y * (sum(model.y[v] * model.E[v] / 3600 for v in model.V))
+                + model.rho_eps * model.eps
+            )
+
+        model.obj = Objective(rule=obj_rule, sense=minimize)
+
+        self.model = model
+        self.shape = (n_slots, tuple(opt_horizon))
+
+    def reschedule(
+        self,
+        opt_step,
+        opt_horizon,
+        upperlimit,
+        lowerlimit,
+        tolerance,
+        bcap,
+        inisoc,
+        tarsoc,
+        minsoc,
+        maxsoc,
+        ch_eff,
+        ds_eff,
+        pmax_pos,
+        pmax_neg,
+        deptime,
+        rho_y,
+        rho_eps,
+        incumbent=None,
+    ):
+        """
+        This method solves the same problem as reschedule() by updating the
+        parameters of the stored model. The model is rebuilt only if the
+        optimization horizon changes or if there are more EVs than slots.
+
+        Parameters and returns are the same as in reschedule() except that
+        the solver is given at initialization.
+
+        """
+
+        prof = profiling.start("cluster.rescheduling_milp.Rescheduler.reschedule")
+
+        ev_ids = list(bcap.keys())
+        rebuilt = (
+            self.shape is None
+            or self.shape[1] != tuple(opt_horizon)
+            or self.shape[0] < len(ev_ids)
+        )
+        if rebuilt:
+            self.build_model(max(self.n_slots, len(ev_ids)), opt_horizon)
+        model = self.model
+
+        model.deltaSec = opt_step
+        model.P_CC_vio = tolerance
+        model.rho_y = rho_y
+        model.rho_eps = rho_eps
+        for t in model.T:
+            model.P_CC_up[t] = upperlimit[t]
+            model.P_CC_low[t] = lowerlimit[t]
+
+        decisions = fixed_decisions(
+            opt_step,
+            opt_horizon,
+            {v: bcap[v] for v in ev_ids if pmax_pos[v] > 0 and pmax_neg[v] > 0},
+            inisoc,
+            minsoc,
+            maxsoc,
+            pmax_pos,
+            pmax_neg,
+            deptime,
+        )
+        for v in model.V:
+            if v < len(ev_ids):
+                ev_id = ev_ids[v]
+                model.P_EV_pos[v] = pmax_pos[ev_id]
+                model.P_EV_neg[v] = pmax_neg[ev_id]
+                model.eff_ch[v] = ch_eff[ev_id]
+                model.eff_ds[v] = ds_eff[ev_id]
+                model.E[v] = bcap[ev_id]
+                model.s_ini[v] = inisoc[ev_id]
+                model.s_tar[v] = tarsoc[ev_id]
+                model.s_min[v] = minsoc[ev_id]
+                model.s_max[v] = maxsoc[ev_id]
+                for t in model.T:
+                    model.a_ev[v, t] = 0 if t >= deptime[ev_id] else 1
+                    if pmax_pos[ev_id] > 0 and pmax_neg[ev_id] > 0:
+                        x = decisions.get((ev_id, t))
+                        if x is None:
+                            model.x_ev[v, t].unfix()
+                        else:
+                            model.x_ev[v, t].fix(x)
+                    else:
+                        model.x_ev[v, t].fix(1 if pmax_pos[ev_id] > 0 else 0)
+            else:
+                # Idle slot: no power exchange and no deviation
+                model.P_EV_pos[v] = 0
+                model.P_EV_neg[v] = 0
+                model.eff_ch[v] = 1
+                model.eff_ds[v] = 1
+                model.E[v] = 1
+                model.s_ini[v] = 0
+                model.s_tar[v] = 0
+                model.s_min[v] = 0
+                model.s_max[v] = 1
+                for t in model.T:
+                    model.a_ev[v, t] = 0
+                    model.x_ev[v, t].fix(1)
+
+        if incumbent is not None:
+            load_incumbent(model, incumbent, dict(enumerate(ev_ids)))
+
+        prof.lap("build", model=model, rebuilt=rebuilt)
+        result = solve(
+            self.solver,
+            model,
+            warmstart=incumbent is not None,
+            relaxation=self.relaxation,
+        )
+        prof.lap("solve", result=result)
+
+        p_schedule = {}
+        s_schedule = {}
+        for v in range(len(ev_ids)):
+            ev_id = ev_ids[v]
+            p_schedule[ev_id] = {}
+            s_schedule[ev_id] = {}
+            for t in opt_horizon:
+                if t < max(opt_horizon):
+                    p_schedule[ev_id][t] = model.p_ev[v, t]()
+                s_schedule[ev_id][t] = model.s[v, t]()
+        prof.lap("extract")
+        prof.stop()
+
+        return p_schedule, s_schedule
+
+
 if __name__ == "__main__":
 
     import pandas as pd
@@ -25,6 +25,12 @@ import numpy as np
 import pandas as pd
 import pyomo.kernel as pmo
 from itertools import product
+from datafev.algorithms.cluster.rescheduling_milp import (
+    fixed_decisions,
+    load_incumbent,
+    solve,
+)
+from datafev import profiling
 
 
 def reschedule(
@@ -51,6 +57,8 @@ def reschedule(
     rho_y,
     rho_eps,
     unbalance_limits=None,
+    incumbent=None,
+    relaxation=False,
 ):
     """
     This function reschedules the charging operations of all clusters in 
@@ -61,6 +69,11 @@ def reschedule(
         - pre-defined reference schedules of the individual EVs in the system.
     This is run typically when some events require deviations from previously 
     determined schedules.
+
+    Binary charge/discharge decisions are only created for the EVs that can
+    both charge and discharge. If there is no such EV, the model is an LP.
+    The decisions of the time steps where only one direction is possible
+    (see algorithms.cluster.rescheduling_milp.fixed_decisions) are fixed.
     
     Parameters
     ----------
@@ -109,6 +122,16 @@ def reschedule(
         Penalty factors for deviation of reference schedules (unitless).
     rho_eps : dict of float
         Penalty factors for violation of upper-lower soft limits (unitless).
+    unbalance_limits : dict of dict, optional
+        Maximum inter-cluster unbalances (kW). The default is None.
+    incumbent : tuple of dict, optional
+        Power and SOC schedules to start the solver from (see
+        algorithms.cluster.rescheduling_milp.shift_incumbent). If given, they
+        are passed to the solver as a MIP start. The default is None.
+    relaxation : bool, optional
+        If True, the LP relaxation is solved and its charge/discharge decisions
+        are rounded and fixed before solving the model again as LP (see
+        algorithms.cluster.rescheduling_milp.solve). The default is False.
 
     Returns
     -------
@@ -124,6 +147,8 @@ def reschedule(
 
     """
 
+    prof = profiling.start("multi_cluster.rescheduling_milp.reschedule")
+
     P_CC_up_lim = cluster_upperlimits
     P_CC_low_lim = cluster_lowerlimits
     P_CC_vio_lim = cluster_violationlimits
@@ -148,6 +173,9 @@ def reschedule(
 
     model.C = Set(initialize=clusters)  # Index set for the clusters
     model.V = Set(initialize=list(bcap.keys()))  # Index set for the EVs
+    model.Vx = Set(
+        initialize=[v for v in bcap.keys() if pmax_pos[v] > 0 and pmax_neg[v] > 0]
+    )  # Index set for the EVs that can both charge and discharge
 
     # Time parameters
     model.deltaSec = opt_step  # Time discretization (one time step in seconds)
@@ -193,7 +221,7 @@ def reschedule(
     model.p_ev_neg = Var(
         model.V, model.T, within=NonNegativeReals
     )  # Disharging power of EV
-    model.x_ev = Var(model.V, model.T, within=pmo.Binary)  # Whether EV is charging
+    model.x_ev = Var(model.Vx, model.T, within=pmo.Binary)  # Whether EV is charging
     model.s = Var(model.V, model.Tp, within=NonNegativeReals)  # EV SOC variable
 
     # System variables
@@ -251,8 +279,10 @@ def reschedule(
     ):  # EV indexed by v can charge only when x[v,t]==1 at t
         if t >= deptime[v]:
             return model.p_ev_pos[v, t] == 0
-        else:
+        elif v in model.Vx:
             return model.p_ev_pos[v, t] <= model.x_ev[v, t] * model.P_EV_pos[v]
+        else:
+            return model.p_ev_pos[v, t] <= model.P_EV_pos[v]
 
     model.combconst1 = Constraint(model.V, model.T, rule=combinatorics_ch)
 
@@ -261,8 +291,10 @@ def reschedule(
     ):  # EV indexed by v can discharge only when x[v,t]==0 at t
         if t >= deptime[v]:
             return model.p_ev_neg[v, t] == 0
-        else:
+        elif v in model.Vx:
             return model.p_ev_neg[v, t] <= (1 - model.x_ev[v, t]) * model.P_EV_neg[v]
+        else:
+            return model.p_ev_neg[v, t] <= model.P_EV_neg[v]
 
     model.combconst2 = Constraint(model.V, model.T, rule=combinatorics_ds)
 
@@ -336,11 +368,32 @@ def reschedule(
 
     model.obj = Objective(rule=obj_rule, sense=minimize)
 
+    decisions = fixed_decisions(
+        opt_step,
+        opt_horizon,
+        {v: bcap[v] for v in model.Vx},
+        inisoc,
+        minsoc,
+        maxsoc,
+        pmax_pos,
+        pmax_neg,
+        deptime,
+    )
+    for (v, t), x in decisions.items():
+        model.x_ev[v, t].fix(x)
+
     ###########################################################################
 
     ###########################################################################
+    prof.lap("build", model=model)
+
     ######################Solving the optimization model ######################
-    result = solver.solve(model)
+    if incumbent is not None:
+        load_incumbent(model, incumbent)
+    result = solve(
+        solver, model, warmstart=incumbent is not None, relaxation=relaxation
+    )
+    prof.lap("solve", result=result)
     # print(result)
     ###########################################################################
 
@@ -355,6 +408,8 @@ def reschedule(
             if t < max(opt_horizon):
                 p_schedule[v][t] = model.p_ev[v, t]()
             s_schedule[v][t] = model.s[v, t]()
+    prof.lap("extract")
+    prof.stop()
     ###########################################################################
 
     return p_schedule, s_schedule
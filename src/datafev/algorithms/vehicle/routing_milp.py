@@ -21,6 +21,7 @@
 
 from pyomo.core import *
 import pyomo.kernel as pmo
+from datafev import profiling
 
 
 def smart_routing(
@@ -97,6 +98,8 @@ def smart_routing(
     
     """
 
+    prof = profiling.start("vehicle.routing_milp.smart_routing")
+
     conf_period = {}
     for t in opt_horizon:
         if t < crttime:
@@ -247,9 +250,12 @@ def smart_routing(
 
     model.obj = Objective(rule=obj_rule, sense=minimize)
 
+    prof.lap("build", model=model)
+
     # model.pprint()
     result = solver.solve(model)  # ,tee=True)
     # print(result)
+    prof.lap("solve", result=result)
 
     p_schedule = {}
     s_schedule = {}
@@ -260,6 +266,8 @@ def smart_routing(
     for c in model.C:
         if abs(model.xc[c]() - 1) <= 0.01:
             target_cc = c
+    prof.lap("extract")
+    prof.stop()
 
     return p_schedule, s_schedule, target_cc
 
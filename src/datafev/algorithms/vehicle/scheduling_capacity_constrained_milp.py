@@ -21,6 +21,7 @@
 
 from pyomo.core import *
 import pyomo.kernel as pmo
+from datafev import profiling
 
 
 def maximum_final_soc(
@@ -88,6 +89,10 @@ def maximum_final_soc(
 
     """
 
+    prof = profiling.start(
+        "vehicle.scheduling_capacity_constrained_milp.maximum_final_soc"
+    )
+
     ####################Constructing the optimization model####################
     model = ConcreteModel()
 
@@ -157,7 +162,9 @@ def maximum_final_soc(
     model.obj = Objective(rule=obj_rule, sense=minimize)
 
     #print(model.pprint())
+    prof.lap("build", model=model)
     res=solver.solve(model)
+    prof.lap("solve", result=res)
     #print(res)
 
     p_schedule = {}
@@ -169,6 +176,8 @@ def maximum_final_soc(
     s_schedule[max(model.Tp)]=model.SoC[max(model.Tp)]()    
         
     #soc_final=model.SoC[max(model.T)]()
+    prof.lap("extract")
+    prof.stop()
 
     return p_schedule, s_schedule#,soc_final
 
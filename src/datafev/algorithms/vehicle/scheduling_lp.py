@@ -20,6 +20,7 @@
 
 
 from pyomo.core import *
+from datafev import profiling
 
 
 def minimize_cost(
@@ -82,6 +83,8 @@ def minimize_cost(
         EV by a particular time step.
     """
 
+    prof = profiling.start("vehicle.scheduling_lp.minimize_cost")
+
     conf_period = {}
     for t in opt_horizon:
         if t < crttime:
@@ -140,7 +143,9 @@ def minimize_cost(
 
     model.obj = Objective(rule=obj_rule, sense=minimize)
 
-    solver.solve(model)
+    prof.lap("build", model=model)
+    result = solver.solve(model)
+    prof.lap("solve", result=result)
 
     p_schedule = {}
     s_schedule = {}
@@ -148,6 +153,8 @@ def minimize_cost(
     for t in model.T:
         p_schedule[t] = model.p[t]()
         s_schedule[t] = model.SoC[t]()
+    prof.lap("extract")
+    prof.stop()
 
     return p_schedule, s_schedule
 
@@ -21,6 +21,7 @@
 
 from pyomo.core import *
 import pyomo.kernel as pmo
+from datafev import profiling
 
 
 def minimize_cost(
@@ -89,6 +90,8 @@ def minimize_cost(
         
     """
 
+    prof = profiling.start("vehicle.scheduling_milp.minimize_cost")
+
     conf_period = {}
     for t in opt_horizon:
         if t < crttime:
@@ -182,7 +185,9 @@ def minimize_cost(
 
     model.obj = Objective(rule=obj_rule, sense=minimize)
 
-    solver.solve(model)
+    prof.lap("build", model=model)
+    result = solver.solve(model)
+    prof.lap("solve", result=result)
 
     p_schedule = {}
     s_schedule = {}
@@ -190,6 +195,8 @@ def minimize_cost(
     for t in model.T:
         p_schedule[t] = model.p[t]()
         s_schedule[t] = model.SoC[t]()
+    prof.lap("extract")
+    prof.stop()
 
     return p_schedule, s_schedule
 
@@ -19,13 +19,40 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import pandas as pd
+from datafev.data_handling.event_log import EventLog
+from datafev.data_handling.timeseries import (
+    TimeSeriesStore,
+    TimeSeriesView,
+    interval_occupation,
+)
 
 
 class ChargingUnit(object):
     """
     Simulation model of EV chargers.
+
+    The attributes of the charger objects are declared in __slots__, so that 
+    the objects carry no instance dictionary. Use ExtendableChargingUnit to 
+    attach further attributes.
     """
 
+    __slots__ = (
+        "type",
+        "id",
+        "cluster",
+        "p_max_ch",
+        "p_max_ds",
+        "eff",
+        "connected_ev",
+        "reserved_ev",
+        "connection_log",
+        "power_store",
+        "power_column",
+        "schedule_pow",
+        "schedule_soc",
+        "active_schedule_instance",
+    )
+
     def __init__(self, cu_id, p_max_ch, p_max_ds, efficiency):
         """
         EV chargers are defined by power capability parameters.
@@ -54,17 +81,98 @@ class ChargingUnit(object):
         self.p_max_ch = p_max_ch
         self.p_max_ds = p_max_ds
         self.eff = efficiency
+        self.cluster = None  # The cluster that the charger is added to
 
         self.connected_ev = None
-        self.connection_dataset = pd.DataFrame(
-            columns=["EV ID", "Connection", "Disconnection"]
-        )
-        self.supplied_power = pd.Series(dtype=float)
-        self.consumed_power = pd.Series(dtype=float)
+        self.connection_log = EventLog(["EV ID", "Connection", "Disconnection"])
+
+        # Supplied power is stored in power_column, consumed power in the next
+        # column of power_store
+        self.power_store = TimeSeriesStore(n_columns=2)
+        self.power_column = 0
 
         self.schedule_pow = {}
         self.schedule_soc = {}
 
+    @property
+    def connection_dataset(self):
+        """
+        Table of the connections to the charger.
+
+        The table is read-only: the connections are edited through the 
+        connection log.
+
+        Returns
+        -------
+        EventTable
+            Table built on demand from the connection log of the charger.
+
+        """
+        return self.connection_log.to_frame()
+
+    @property
+    def supplied_power(self):
+        """
+        Time indexed power supplied to the connected EVs (kW).
+
+        The records are accessed through a dictionary-like view of the power
+        store: cu.supplied_power[ts] = p writes to the store. The records in
+        the form of pandas.Series are returned by 
+        cu.supplied_power.to_series().
+
+        Returns
+        -------
+        TimeSeriesView
+            View of the supplied power records of the charger.
+
+        """
+        return TimeSeriesView(self.power_store, self.power_column)
+
+    @property
+    def consumed_power(self):
+        """
+        Time indexed power consumed (p>0) or injected (p<0) from/to grid (kW).
+
+        The records are accessed through a dictionary-like view of the power
+        store (see supplied_power).
+
+        Returns
+        -------
+        TimeSeriesView
+            View of the consumed power records of the charger.
+
+        """
+        return TimeSeriesView(self.power_store, self.power_column + 1)
+
+    def bind_power_store(self, store):
+        """
+        This method moves the power records of the charger to another store.
+        It is called when the charger is added to a cluster so that the 
+        records of all chargers of the cluster are kept in a single array.
+
+        Parameters
+        ----------
+        store : TimeSeriesStore
+            The store to keep the power records.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        column = store.add_column()
+        store.add_column()
+
+        for n in range(2):
+            for ts, value in self.power_store.series(self.power_column + n).items():
+                if store.start is None:
+                    store.anchor(ts, self.power_store.step)
+                store.set(ts, column + n, value)
+
+        self.power_store = store
+        self.power_column = column
+
     def connect(self, ts, ev):
         """
         This method connects an EV to the charger. It is called in 
@@ -84,10 +192,10 @@ class ChargingUnit(object):
         """
         self.connected_ev = ev
         ev.connected_cu = self
+        if self.cluster is not None:
+            self.cluster.register_connection(self)
 
-        dataset_ind = len(self.connection_dataset) + 1
-        self.connection_dataset.loc[dataset_ind, "EV ID"] = ev.vehicle_id
-        self.connection_dataset.loc[dataset_ind, "Connection"] = ts
+        self.connection_log.append({"EV ID": ev.vehicle_id, "Connection": ts})
 
     def disconnect(self, ts):
         """
@@ -106,8 +214,9 @@ class ChargingUnit(object):
         """
         self.connected_ev.connected_cu = None
         self.connected_ev = None
-        dataset_ind = max(self.connection_dataset.index)
-        self.connection_dataset.loc[dataset_ind, "Disconnection"] = ts
+        if self.cluster is not None:
+            self.cluster.register_disconnection(self)
+        self.connection_log.set(self.connection_log.last_id, "Disconnection", ts)
 
     def supply(self, ts, tdelta, p):
         """
@@ -132,8 +241,12 @@ class ChargingUnit(object):
 
         """
         self.connected_ev.charge(ts, tdelta, p)
-        self.supplied_power[ts] = p
-        self.consumed_power[ts] = p / self.eff if p > 0 else p * self.eff
+
+        store = self.power_store
+        if store.start is None:
+            store.anchor(ts, tdelta)
+        store.set(ts, self.power_column, p)
+        store.set(ts, self.power_column + 1, p / self.eff if p > 0 else p * self.eff)
 
     def set_schedule(self, ts, schedule_pow, schedule_soc):
         """
@@ -183,6 +296,8 @@ class ChargingUnit(object):
 
         """
         self.active_schedule_instance = ts
+        if self.cluster is not None:
+            self.cluster.refresh_schedule_contribution(self)
 
     def uncontrolled_supply(self, ts, step):
         """
@@ -217,17 +332,13 @@ class ChargingUnit(object):
             # Limit due to the charger power capability
             lim_ch_pow = self.p_max_ch * step.seconds
 
-            if type(self.connected_ev.pow_soc_table) != type(None):
+            if self.connected_ev.pow_soc_table is not None:
 
                 # The EV battery has a specific charger power-SOC dependency
                 # limiting the power transfer
-                table = self.connected_ev.pow_soc_table
-                soc_range = (
-                    table[(table["SOC_LB"] <= ev_soc) & (ev_soc < table["SOC_UB"])]
-                ).index[0]
+                p_max = self.connected_ev.pow_soc_table.p_max(ev_soc)
 
                 # Limit due to the SOC dependency of charge power
-                p_max = table.loc[soc_range, "P_UB"]
                 lim_ev_socdep = p_max * step.seconds
                 e_max = min(lim_ev_batcap, lim_ch_pow, lim_ev_socdep)
 
@@ -271,11 +382,20 @@ class ChargingUnit(object):
 
         """
         period = pd.date_range(start=start, end=end, freq=step)
-        connections = pd.DataFrame(index=period)
-        connections.loc[:, :] = 0
-        for _id, con in self.connection_dataset.iterrows():
-            con_start = con["Connection"]
-            con_end = con["Disconnection"]
-            connections.loc[con_start:con_end, _id] = 1
-        record = connections.sum(axis=1)
+        connections = self.connection_log.records
+        occupation = interval_occupation(
+            period,
+            [con.get("Connection") for con in connections],
+            [con.get("Disconnection") for con in connections],
+            [0] * len(connections),
+            1,
+        )
+        record = pd.Series(occupation[:, 0], index=period)
         return record
+
+
+class ExtendableChargingUnit(ChargingUnit):
+    """
+    Charger model with an instance dictionary so that user extensions can 
+    attach attributes that are not declared in ChargingUnit.__slots__.
+    """
@@ -22,7 +22,13 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from datafev import profiling
 from datafev.data_handling.charger import ChargingUnit
+from datafev.data_handling.power_soc import p_max_array
+from datafev.data_handling.vehicle import charge_vehicles, soc_of_vehicles
+from datafev.data_handling.event_log import EventLog
+from datafev.data_handling.reservation_index import ReservationIndex
+from datafev.data_handling.timeseries import TimeSeriesStore, interval_occupation
 
 
 class ChargerCluster(object):
@@ -33,7 +39,7 @@ class ChargerCluster(object):
     responsible for management of a cluster. 
     """
 
-    def __init__(self, cluster_id, topology_data):
+    def __init__(self, cluster_id, topology_data, charger_class=ChargingUnit):
         """
         Clusters are defined by the EV chargers that they consist of.
 
@@ -48,6 +54,10 @@ class ChargerCluster(object):
                 - maximum discharge powers,
                 - power conversion efficiencies of
             charging units in the cluster.
+        charger_class : type, optional
+            Class of the charging unit objects. ExtendableChargingUnit allows
+            attaching user-defined attributes to the chargers. The default is
+            ChargingUnit.
 
         Returns
         -------
@@ -60,8 +70,8 @@ class ChargerCluster(object):
 
         self.power_installed = 0  # Total installed power of the CUs
 
-        self.cc_dataset = pd.DataFrame(
-            columns=[
+        self.cc_log = EventLog(
+            [
                 "EV ID",
                 "EV Battery [kWh]",
                 "Arrival Time",
@@ -76,8 +86,8 @@ class ChargerCluster(object):
             ]
         )
 
-        self.re_dataset = pd.DataFrame(
-            columns=[
+        self.re_log = EventLog(
+            [
                 "Active",
                 "EV ID",
                 "CU ID",
@@ -92,6 +102,22 @@ class ChargerCluster(object):
         )
 
         self.chargers = {}
+        self.reservation_index = {}  # Active reservations of each charger
+        self.charger_position = {}  # Order in which the chargers were added
+
+        # Chargers with connected EVs (kept up to date by the chargers)
+        self.occupied = {}
+        self._connected_chargers = None
+
+        # Aggregate grid-side schedule of the connected chargers and the
+        # contributions of individual chargers to it
+        self.schedule_store = TimeSeriesStore(n_columns=1)
+        self.schedule_contributions = {}
+        # Incremented with every change of the schedules and reservations
+        self.schedule_version = 0
+
+        # Supplied/consumed power records of all chargers in the cluster
+        self.power_store = TimeSeriesStore(n_columns=0)
 
         for _, i in topology_data.iterrows():
 
@@ -99,9 +125,41 @@ class ChargerCluster(object):
             pch = i["cu_p_ch_max (kW)"]
             pds = i["cu_p_ds_max (kW)"]
             eff = i["cu_eff"]
-            cu = ChargingUnit(cuID, pch, pds, eff)
+            cu = charger_class(cuID, pch, pds, eff)
             self.add_cu(cu)
 
+    @property
+    def cc_dataset(self):
+        """
+        Table of the charging sessions in the cluster.
+
+        The table is read-only: the sessions are edited through the session
+        log (e.g., cc.cc_log.set(session_id, column, value)).
+
+        Returns
+        -------
+        EventTable
+            Table built on demand from the session log of the cluster.
+
+        """
+        return self.cc_log.to_frame()
+
+    @property
+    def re_dataset(self):
+        """
+        Table of the reservations in the cluster.
+
+        The table is read-only: the reservations are edited through the 
+        reservation log (e.g., cc.re_log.set(reservation_id, column, value)).
+
+        Returns
+        -------
+        EventTable
+            Table built on demand from the reservation log of the cluster.
+
+        """
+        return self.re_log.to_frame()
+
     def add_cu(self, charging_unit):
         """
         This method is run at initialization of the cluster object.
@@ -119,7 +177,164 @@ class ChargerCluster(object):
         """
 
         self.power_installed += charging_unit.p_max_ch
+        self.charger_position[charging_unit.id] = len(self.chargers)
         self.chargers[charging_unit.id] = charging_unit
+        self.reservation_index[charging_unit.id] = ReservationIndex()
+        charging_unit.cluster = self
+        if charging_unit.connected_ev is not None:
+            self.register_connection(charging_unit)
+        charging_unit.bind_power_store(self.power_store)
+
+    def register_connection(self, charging_unit):
+        """
+        This method marks a charging unit as occupied. It is called by the
+        charging unit when an EV is connected to it.
+
+        Parameters
+        ----------
+        charging_unit : ChargingUnit
+            The charging unit that an EV is connected to.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        self.occupied[charging_unit.id] = charging_unit
+        self._connected_chargers = None
+        self.refresh_schedule_contribution(charging_unit)
+
+    def register_disconnection(self, charging_unit):
+        """
+        This method marks a charging unit as free. It is called by the 
+        charging unit when the connected EV is disconnected.
+
+        Parameters
+        ----------
+        charging_unit : ChargingUnit
+            The charging unit that the EV is disconnected from.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        self.occupied.pop(charging_unit.id, None)
+        self._connected_chargers = None
+        self.refresh_schedule_contribution(charging_unit)
+
+    def refresh_schedule_contribution(self, charging_unit):
+        """
+        This method updates the aggregate schedule of the cluster after the 
+        connection status or the active schedule of a charging unit has 
+        changed. The previous contribution of the unit is subtracted and the
+        new one is added.
+
+        Parameters
+        ----------
+        charging_unit : ChargingUnit
+            The charging unit whose schedule contribution has changed.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        store = self.schedule_store
+
+        old = self.schedule_contributions.pop(charging_unit.id, None)
+        if old is not None and old["regular"]:
+            store.accumulate(old["start"], 0, -old["values"])
+
+        new = self._schedule_contribution(charging_unit)
+        if new is not None:
+            if new["regular"]:
+                store.accumulate(new["start"], 0, new["values"])
+            self.schedule_contributions[charging_unit.id] = new
+
+        if len(self.schedule_contributions) == 0 and store.n_rows > 0:
+            # Clearing avoids accumulating rounding errors
+            store.values[:] = np.nan
+
+        self.schedule_version += 1
+
+    def _schedule_contribution(self, cu):
+        """
+        This method converts the active schedule of a charging unit to its
+        contribution to the aggregate schedule of the cluster.
+
+        Parameters
+        ----------
+        cu : ChargingUnit
+            Charging unit object.
+
+        Returns
+        -------
+        contribution : dict or None
+            None if the unit has no connected EV. Otherwise, a dictionary with:
+                - regular --> False if the schedule does not fit the grid of 
+                  the aggregate schedule (then queries are computed from the 
+                  schedules of the chargers),
+                - start --> time stamp of the first schedule step,
+                - values --> grid-side power in the schedule steps (kW),
+                - last --> time stamp of the last schedule step,
+                - tail --> grid-side power after the last schedule step until 
+                  the estimated departure (kW),
+                - tail_end --> time stamp of the last step of the tail.
+
+        """
+
+        ev = cu.connected_ev
+        if ev is None:
+            return None
+
+        irregular = {"regular": False}
+        instance = getattr(cu, "active_schedule_instance", None)
+        if instance not in cu.schedule_pow or pd.isna(ev.t_dep_est):
+            return irregular
+
+        schedule = cu.schedule_pow[instance]
+        try:
+            index = pd.DatetimeIndex(schedule.index)
+            values = schedule.to_numpy(dtype=float, copy=True)
+        except (TypeError, ValueError):
+            return irregular
+        if len(index) == 0 or np.isnan(values).any() or not index.is_monotonic_increasing:
+            return irregular
+
+        store = self.schedule_store
+        if store.step is None:
+            if len(index) < 2:
+                return irregular
+            store.anchor(index[0], index[1] - index[0])
+        step_ns = pd.Timedelta(store.step).value
+        if store.offset(index[0]) is None or (np.diff(index.asi8) != step_ns).any():
+            return irregular
+
+        # The schedule is cut at the estimated departure of the connected EV
+        t_dep = pd.Timestamp(ev.t_dep_est)
+        values[index > t_dep] = 0
+        values = np.where(values > 0, values / cu.eff, values * cu.eff)
+
+        last = index[-1]
+        if last < t_dep:
+            tail = values[-1]
+            tail_end = last + ((t_dep - last) // store.step) * store.step
+        else:
+            tail = 0.0
+            tail_end = last
+
+        return {
+            "regular": True,
+            "start": index[0],
+            "values": values,
+            "last": last,
+            "tail": tail,
+            "tail_end": tail_end,
+        }
 
     def enter_power_limits(self, start, end, step, limits, tolerance=0):
         """
@@ -202,19 +417,24 @@ class ChargerCluster(object):
 
         """
 
-        reservation_id = len(self.re_dataset) + 1
+        reservation_id = self.re_log.append(
+            {
+                "Active": True,
+                "EV ID": ev.vehicle_id,
+                "CU ID": cu.id,
+                "Reserved At": ts,
+                "From": res_from,
+                "Until": res_until,
+            }
+        )
         ev.reservation_id = reservation_id
         ev.reserved_cluster = self
         ev.reserved_charger = cu
         cu.reserved_ev=ev
 
         # TODO: Add check for overlap
-        self.re_dataset.loc[reservation_id, "Active"] = True
-        self.re_dataset.loc[reservation_id, "EV ID"] = ev.vehicle_id
-        self.re_dataset.loc[reservation_id, "CU ID"] = cu.id
-        self.re_dataset.loc[reservation_id, "Reserved At"] = ts
-        self.re_dataset.loc[reservation_id, "From"] = res_from
-        self.re_dataset.loc[reservation_id, "Until"] = res_until
+        self.reservation_index[cu.id].add(reservation_id, res_from, res_until)
+        self.schedule_version += 1
 
         if contract != None:
 
@@ -229,8 +449,8 @@ class ChargerCluster(object):
                 scheduled_g2v = p_ref.sum() * tdelta / 3600
                 scheduled_v2g = -(p_ref[p_ref < 0].sum()) * tdelta / 3600
 
-                self.re_dataset.loc[reservation_id, "Scheduled G2V"] = scheduled_g2v
-                self.re_dataset.loc[reservation_id, "Scheduled V2G"] = scheduled_v2g
+                self.re_log.set(reservation_id, "Scheduled G2V", scheduled_g2v)
+                self.re_log.set(reservation_id, "Scheduled V2G", scheduled_v2g)
 
                 if contract["Payment"]:
 
@@ -243,8 +463,8 @@ class ChargerCluster(object):
                         ((p_ref[p_ref < 0] * pr_v2g[p_ref < 0]).sum()) * tdelta / 3600
                     )
 
-                    self.re_dataset.loc[reservation_id, "Price"] = (
-                        payment_for_g2v + payment_for_v2g
+                    self.re_log.set(
+                        reservation_id, "Price", payment_for_g2v + payment_for_v2g
                     )
 
     def unreserve(self, ts, reservation_id):
@@ -264,10 +484,13 @@ class ChargerCluster(object):
         None.
 
         """
-        self.re_dataset.loc[reservation_id, "Cancelled At"] = ts
-        self.re_dataset.loc[reservation_id, "Active"] = False
+        self.re_log.set(reservation_id, "Cancelled At", ts)
+        self.re_log.set(reservation_id, "Active", False)
+        cu_id = self.re_log.get(reservation_id, "CU ID")
+        self.reservation_index[cu_id].remove(reservation_id)
+        self.schedule_version += 1
 
-    def uncontrolled_supply(self, ts, step):
+    def uncontrolled_supply(self, ts, step, n_steps=1):
         """
         This method is run to execute the uncontrolled charging behavior.
 
@@ -277,15 +500,130 @@ class ChargerCluster(object):
             Current time.
         step : datetime.timedelta
             Length of time step.
+        n_steps : int, optional
+            Number of consecutive time steps to be simulated starting from ts.
+            No EV is expected to connect or disconnect in this period. The 
+            default is 1.
 
         Returns
         -------
         None.
         """
 
-        for cu_id, cu in self.chargers.items():
-            if cu.connected_ev != None:
-                cu.uncontrolled_supply(ts, step)
+        # Chargers with customized uncontrolled behavior are handled one by one
+        chargers = []
+        for cu_id, cu in self.query_connected_chargers(ts).items():
+            if type(cu).uncontrolled_supply is ChargingUnit.uncontrolled_supply:
+                chargers.append(cu)
+            else:
+                for k in range(n_steps):
+                    cu.uncontrolled_supply(ts + k * step, step)
+
+        if len(chargers) == 0:
+            return
+
+        evs = [cu.connected_ev for cu in chargers]
+        soc = soc_of_vehicles(ts, evs)  # Current SOCs of the EVs
+        bcap = np.array([ev.bCapacity for ev in evs], dtype=float)
+        p_cu = np.array([cu.p_max_ch for cu in chargers], dtype=float)
+        tables = [ev.pow_soc_table for ev in evs]
+
+        if n_steps == 1:
+
+            # The EVs charge with the maximum feasible power until their SOCs reach 1
+            lim_ev_batcap = (1 - soc) * bcap  # Limit due to the battery capacity of EV
+            lim_ch_pow = p_cu * step.seconds  # Limit due to the charger power capability
+            lim_ev_socdep = (
+                p_max_array(tables, soc) * step.seconds
+            )  # Limit due to the SOC dependency of charge power
+            e_max = np.minimum(np.minimum(lim_ev_batcap, lim_ch_pow), lim_ev_socdep)
+            p_avr = np.where(soc < 1, e_max / step.seconds, 0.0)
+
+        else:
+
+            # The power trajectories of the EVs are built in closed form
+            p_avr = np.array(
+                [
+                    _uncontrolled_trajectory(
+                        soc[n], bcap[n], p_cu[n], tables[n], step.seconds, n_steps
+                    )
+                    for n in range(len(evs))
+                ]
+            )
+
+        # Execution of the uncontrolled behavior in the simulation
+        self._supply_chargers(ts, step, chargers, p_avr)
+
+    def supply_batch(self, ts, step, powers):
+        """
+        This method is equivalent to calling the 'supply' method of all 
+        chargers with connected EVs. The power records of the chargers and the
+        trajectories of the EVs are written in array operations.
+
+        Parameters
+        ----------
+        ts : datetime.datetime
+            Current time.
+        step : datetime.timedelta
+            Length of time step.
+        powers : dict or numpy.ndarray
+            Charge powers (kW) indexed by the charger identifiers or given in 
+            the order of query_connected_chargers.
+            p>0 indicates EV charging and power consumption from the grid.
+            p<0 indicates EV discharging and power injection to the grid.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        chargers = list(self.query_connected_chargers(ts).values())
+        if isinstance(powers, dict):
+            p = np.array([powers[cu.id] for cu in chargers], dtype=float)
+        else:
+            p = np.asarray(powers, dtype=float)
+
+        self._supply_chargers(ts, step, chargers, p)
+
+    def _supply_chargers(self, ts, step, chargers, p):
+        """
+        This method supplies the given powers (kW) to the EVs connected to the
+        given chargers of the cluster. Two-dimensional powers (chargers x time
+        steps) are supplied during consecutive time steps starting from ts.
+        """
+
+        p = np.asarray(p, dtype=float)
+        if p.ndim == 1:
+            p = p[:, None]
+
+        # Chargers with customized supply behavior are handled one by one
+        batch = []
+        for n, cu in enumerate(chargers):
+            if (
+                type(cu).supply is ChargingUnit.supply
+                and cu.power_store is self.power_store
+            ):
+                batch.append(n)
+            else:
+                for k in range(p.shape[1]):
+                    cu.supply(ts + k * step, step, p[n, k])
+
+        if len(batch) == 0:
+            return
+
+        chargers = [chargers[n] for n in batch]
+        p = p[batch]
+        eff = np.array([cu.eff for cu in chargers], dtype=float)[:, None]
+        columns = np.array([cu.power_column for cu in chargers])
+
+        charge_vehicles(ts, step, [cu.connected_ev for cu in chargers], p)
+
+        if self.power_store.start is None:
+            self.power_store.anchor(ts, step)
+        consumption = np.where(p > 0, p / eff, p * eff)
+        self.power_store.set_block(ts, columns, p.T, step)
+        self.power_store.set_block(ts, columns + 1, consumption.T, step)
 
     def enter_data_of_incoming_vehicle(self, ts, ev, cu):
         """
@@ -307,29 +645,24 @@ class ChargerCluster(object):
 
         """
 
-        cc_dataset_id = len(self.cc_dataset) + 1
+        scheduled_g2v = self.re_log.get(ev.reservation_id, "Scheduled G2V")
+        scheduled_v2g = self.re_log.get(ev.reservation_id, "Scheduled V2G")
+
+        cc_dataset_id = self.cc_log.append(
+            {
+                "EV ID": ev.vehicle_id,
+                "EV Battery [kWh]": ev.bCapacity / 3600,
+                "Arrival Time": ts,
+                "Arrival SOC": ev.soc[ts],
+                "Connected CU": cu.id,
+                "Reservation ID": ev.reservation_id,
+                "Scheduled G2V [kWh]": scheduled_g2v if pd.notna(scheduled_g2v) else 0,
+                "Scheduled V2G [kWh]": scheduled_v2g if pd.notna(scheduled_v2g) else 0,
+            }
+        )
         ev.cc_dataset_id = cc_dataset_id
         ev.connected_cc = self
 
-        self.cc_dataset.loc[cc_dataset_id, "EV ID"] = ev.vehicle_id
-        self.cc_dataset.loc[cc_dataset_id, "EV Battery [kWh]"] = ev.bCapacity / 3600
-        self.cc_dataset.loc[cc_dataset_id, "Arrival Time"] = ts
-        self.cc_dataset.loc[cc_dataset_id, "Arrival SOC"] = ev.soc[ts]
-        self.cc_dataset.loc[cc_dataset_id, "Connected CU"] = cu.id
-        self.cc_dataset.loc[cc_dataset_id, "Reservation ID"] = ev.reservation_id
-
-        reservation = self.re_dataset.loc[ev.reservation_id]
-        self.cc_dataset.loc[cc_dataset_id, "Scheduled G2V [kWh]"] = (
-            reservation["Scheduled G2V"]
-            if pd.notna(reservation["Scheduled G2V"])
-            else 0
-        )
-        self.cc_dataset.loc[cc_dataset_id, "Scheduled V2G [kWh]"] = (
-            reservation["Scheduled V2G"]
-            if pd.notna(reservation["Scheduled V2G"])
-            else 0
-        )
-
     def enter_data_of_outgoing_vehicle(self, ts, ev):
         """
         This method enters the data about the charging event to the cc_dataset 
@@ -349,17 +682,21 @@ class ChargerCluster(object):
 
         """
 
-        self.cc_dataset.loc[ev.cc_dataset_id, "Leave Time"] = ts
-        self.cc_dataset.loc[ev.cc_dataset_id, "Leave SOC"] = ev.soc[ts]
-        self.cc_dataset.loc[ev.cc_dataset_id, "Net G2V [kWh]"] = (
-            (ev.soc[ts] - ev.soc_arr_real) * ev.bCapacity / 3600
+        self.cc_log.set(ev.cc_dataset_id, "Leave Time", ts)
+        self.cc_log.set(ev.cc_dataset_id, "Leave SOC", ev.soc[ts])
+        self.cc_log.set(
+            ev.cc_dataset_id,
+            "Net G2V [kWh]",
+            (ev.soc[ts] - ev.soc_arr_real) * ev.bCapacity / 3600,
         )
 
         ev_v2x_ = pd.Series(ev.v2g)
         resolution = ev_v2x_.index[1] - ev_v2x_.index[0]
         ev_v2x = ev_v2x_[ev.t_arr_real : ev.t_dep_real - resolution]
-        self.cc_dataset.loc[ev.cc_dataset_id, "Total V2G [kWh]"] = (
-            ev_v2x.sum() * resolution.seconds / 3600
+        self.cc_log.set(
+            ev.cc_dataset_id,
+            "Total V2G [kWh]",
+            ev_v2x.sum() * resolution.seconds / 3600,
         )
 
         ev.cc_dataset_id = None
@@ -391,6 +728,42 @@ class ChargerCluster(object):
 
         """
 
+        time_index = pd.date_range(start=start, end=end, freq=step)
+        store = self.schedule_store
+        contributions = self.schedule_contributions.values()
+
+        if len(contributions) == 0:
+            return pd.Series(0.0, index=time_index)
+
+        if (
+            step != store.step
+            or store.offset(start) is None
+            or not all(c["regular"] for c in contributions)
+        ):
+            return self._compute_actual_schedule(start, end, step)
+
+        values = np.nan_to_num(store.take(time_index, [0])[:, 0])
+
+        # The last scheduled power of a unit is held until the departure of
+        # the EV if the queried period contains the last schedule step
+        for c in contributions:
+            if c["tail"] != 0 and start <= c["last"] <= end:
+                first = store.offset(c["last"]) - store.offset(start) + 1
+                last = store.offset(min(c["tail_end"], time_index[-1])) - store.offset(start)
+                values[first : last + 1] += c["tail"]
+
+        cc_sch = pd.Series(values, index=time_index)
+
+        return cc_sch
+
+    def _compute_actual_schedule(self, start, end, step):
+        """
+        This method computes the aggregate schedule of the cluster from the
+        schedules of the individual charging units. It is used by 
+        query_actual_schedule when the queried period does not fit the grid
+        of the aggregate schedule.
+        """
+
         time_index = pd.date_range(start=start, end=end, freq=step)
         cu_sch_df = pd.DataFrame(index=time_index,columns=self.chargers.keys())
 
@@ -436,12 +809,35 @@ class ChargerCluster(object):
 
         """
 
-        nb_of_connected_cu = 0
-        for cu_id, cu in self.chargers.items():
-            if cu.connected_ev != None:
-                nb_of_connected_cu += 1
+        nb_of_connected_cu = len(self.occupied)
         return nb_of_connected_cu
 
+    def query_connected_chargers(self, ts):
+        """
+        This function identifies the chargers with connected EVs. It is 
+        usually called in execution of charging routines.
+
+        Parameters
+        ----------
+        ts : datetime.datetime
+            Current time.
+
+        Returns
+        -------
+        connected_chargers : dict
+            Charging units with connected EVs indexed by their identifiers.
+            The chargers are listed in the order they were added to the 
+            cluster.
+
+        """
+
+        if self._connected_chargers is None:
+            self._connected_chargers = dict(
+                (cu_id, self.occupied[cu_id])
+                for cu_id in sorted(self.occupied, key=self.charger_position.get)
+            )
+        return self._connected_chargers
+
     def query_availability(self, start, end, step):
         """
         This function creates a dataframe containing the data of the 
@@ -468,52 +864,20 @@ class ChargerCluster(object):
             eff --> power conversion efficiency of the charger.
 
         """
+
+        prof = profiling.start("ChargerCluster.query_availability")
+        available = [
+            cu
+            for cu in self.chargers.values()
+            if self.reservation_index[cu.id].is_free(start, end, step)
+        ]
         available_chargers = pd.DataFrame(
-            columns=["max p_ch", "max p_ds", "eff"], dtype=np.float16
+            [[cu.p_max_ch, cu.p_max_ds, cu.eff] for cu in available],
+            index=[cu.id for cu in available],
+            columns=["max p_ch", "max p_ds", "eff"],
+            dtype=np.float64,
         )
-        all_active_reservations = self.re_dataset[
-            self.re_dataset["Active"] == True
-        ]  # Reservations that are not cancelled
-
-        for cu in self.chargers.values():
-
-            active_reservations = all_active_reservations[
-                all_active_reservations["CU ID"] == cu.id
-            ]
-            period = pd.date_range(start=start, end=end, freq=step)
-
-            if len(active_reservations) == 0:
-                cu_availability_series = pd.Series(True, index=period)
-            else:
-
-                start_of_first_reservation = active_reservations["From"].min()
-                end_of_last_reservation = active_reservations["Until"].max()
-
-                index_set = pd.date_range(
-                    start=min(start, start_of_first_reservation),
-                    end=max(end, end_of_last_reservation),
-                    freq=step,
-                )
-
-                test_per_reservation = pd.DataFrame(index=index_set)
-                test_per_reservation.loc[:, :] = True
-
-                for res in active_reservations.index:
-                    res_start = self.re_dataset.loc[res, "From"]
-                    res_until = self.re_dataset.loc[res, "Until"]
-                    test_per_reservation.loc[res_start : res_until - step, step] = False
-
-                cu_availability_series = (test_per_reservation.all(axis="columns")).loc[
-                    period
-                ]
-
-            is_cu_available = cu_availability_series.all()
-            if is_cu_available == True:
-                available_chargers.loc[cu.id] = {
-                    "max p_ch": cu.p_max_ch,
-                    "max p_ds": cu.p_max_ds,
-                    "eff": cu.eff,
-                }
+        prof.stop(cluster=self.id, available=len(available))
 
         return available_chargers
 
@@ -543,9 +907,15 @@ class ChargerCluster(object):
 
         """
 
-        df = pd.DataFrame(index=pd.date_range(start=start, end=end, freq=step),columns=list(self.chargers.keys()))
-        for cu_id, cu in self.chargers.items():
-            df[cu_id] = (cu.consumed_power.reindex(df.index)).fillna(0)
+        period = pd.date_range(start=start, end=end, freq=step)
+        consumption = self.power_store.take(
+            period, [cu.power_column + 1 for cu in self.chargers.values()]
+        )
+        df = pd.DataFrame(
+            np.nan_to_num(consumption, nan=0.0),
+            index=period,
+            columns=list(self.chargers.keys()),
+        )
         return df
 
     def analyze_occupation_profile(self, start, end, step):
@@ -574,11 +944,20 @@ class ChargerCluster(object):
 
         """
 
-        df = pd.DataFrame(index=pd.date_range(start=start, end=end, freq=step),columns=list(self.chargers.keys()))
-        for cu_id, cu in self.chargers.items():
-            df[cu_id] = (
-                cu.occupation_record(start, end, step).reindex(df.index)
-            ).fillna(0)
+        period = pd.date_range(start=start, end=end, freq=step)
+
+        # Connections of all chargers with the column of the charger
+        starts, ends, columns = [], [], []
+        for n, cu in enumerate(self.chargers.values()):
+            for con in cu.connection_log.records:
+                starts.append(con.get("Connection"))
+                ends.append(con.get("Disconnection"))
+                columns.append(n)
+
+        occupation = interval_occupation(
+            period, starts, ends, columns, len(self.chargers)
+        )
+        df = pd.DataFrame(occupation, index=period, columns=list(self.chargers.keys()))
         return df
 
     def export_results_to_excel(self, start, end, step, xlfile):
@@ -628,3 +1007,40 @@ class ChargerCluster(object):
             ).sum()
             overall["Net Consumption"] = p_cu["Total"].sum() * step.seconds / 3600
             overall.to_excel(writer, sheet_name="Overall")
+
+
+def _uncontrolled_trajectory(soc, bcap, p_cu, table, dt, n_steps):
+    """
+    This function returns the uncontrolled charge powers (kW) of an EV during
+    consecutive time steps of dt seconds. The power remains constant as long 
+    as the limiting factor (charger, SOC range or battery capacity) does not 
+    change; therefore, the trajectory is built segment by segment. The SOCs 
+    are accumulated in the same order as in the step-wise simulation.
+    """
+
+    p = np.zeros(n_steps)
+    j = 0
+
+    while j < n_steps and soc < 1:
+
+        # Power at the current SOC
+        e_max = min((1 - soc) * bcap, p_cu * dt)
+        if table is not None:
+            e_max = min(e_max, table.p_max(soc) * dt)
+        p_j = e_max / dt
+
+        # SOCs that would be reached if the EV kept charging with p_j
+        inc = p_j * dt / bcap
+        traj = np.cumsum(np.concatenate(([soc], np.full(n_steps - j - 1, inc))))
+        lim = np.minimum((1 - traj) * bcap, p_cu * dt)
+        if table is not None:
+            lim = np.minimum(lim, table.p_max(traj) * dt)
+        keep = (lim / dt == p_j) & (traj < 1)
+
+        # The segment ends at the first step with a different power
+        m = len(keep) if keep.all() else int(np.argmin(keep))
+        p[j : j + m] = p_j
+        soc = traj[m - 1] + inc
+        j += m
+
+    return p
@@ -0,0 +1,237 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import numpy as np
+import pandas as pd
+
+
+class EventLog(object):
+    """
+    Append-optimized log of simulation events (e.g., reservations, 
+    connections, charging sessions).
+
+    Each event is kept as a record (dictionary) in a list, so that entering 
+    the data of a new event does not copy the data of the previous ones. The 
+    log is converted to a pandas.DataFrame only when the table is read.
+    Records are identified by consecutive integers starting from 1.
+    """
+
+    def __init__(self, columns):
+        """
+        Logs are defined by the columns of the table that they produce.
+
+        Parameters
+        ----------
+        columns : list of str
+            Names of the columns of the table.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        self.columns = list(columns)
+        self.n_declared = len(self.columns)  # Columns declared at initialization
+        self.records = []
+        self.version = 0  # Incremented with every write
+        self._frame = None
+        self._frame_version = -1
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def last_id(self):
+        """
+        Identifier of the latest record (None if the log is empty).
+        """
+        return len(self.records) if self.records else None
+
+    def append(self, values=None):
+        """
+        This method adds a new record to the log.
+
+        Parameters
+        ----------
+        values : dict, optional
+            Column values of the new record. The default is None.
+
+        Returns
+        -------
+        record_id : int
+            Identifier of the new record.
+
+        """
+
+        self.records.append({})
+        record_id = len(self.records)
+        if values is not None:
+            for column, value in values.items():
+                self.set(record_id, column, value)
+        self.version += 1
+        return record_id
+
+    def set(self, record_id, column, value):
+        """
+        This method sets the value of a column of an existing record. Columns 
+        that are not in the table yet are added to its end.
+
+        Parameters
+        ----------
+        record_id : int
+            Identifier of the record.
+        column : str
+            Name of the column.
+        value : object
+            New value.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        if not 1 <= record_id <= len(self.records):
+            raise KeyError(record_id)
+        if column not in self.columns:
+            self.columns.append(column)
+        self.records[record_id - 1][column] = value
+        self.version += 1
+
+    def get(self, record_id, column, default=np.nan):
+        """
+        This method returns the value of a column of a record.
+
+        Parameters
+        ----------
+        record_id : int
+            Identifier of the record.
+        column : str
+            Name of the column.
+        default : object, optional
+            Value returned if the column has not been set for the record. The 
+            default is numpy.nan.
+
+        Returns
+        -------
+        object
+            Value of the column.
+
+        """
+
+        if not 1 <= record_id <= len(self.records):
+            raise KeyError(record_id)
+        return self.records[record_id - 1].get(column, default)
+
+    def to_frame(self):
+        """
+        This method converts the log to a table. The table is cached until 
+        the next write to the log.
+
+        Returns
+        -------
+        EventTable
+            Read-only table with a row for each record. Missing values are 
+            NaN.
+
+        """
+
+        if self._frame_version != self.version:
+
+            index = pd.Index(range(1, len(self.records) + 1))
+            data = {}
+            for n, column in enumerate(self.columns):
+                values = [r.get(column, np.nan) for r in self.records]
+                if n < self.n_declared:
+                    data[column] = pd.Series(values, index=index, dtype=object)
+                else:
+                    data[column] = pd.Series(values, index=index)
+
+            if len(self.records) == 0:
+                self._frame = EventTable(columns=self.columns)
+            else:
+                self._frame = EventTable(data, index=index, columns=self.columns)
+            self._frame_version = self.version
+
+        return self._frame
+
+
+class EventTable(pd.DataFrame):
+    """
+    Read-only table of an event log.
+
+    The tables are built from the logs and reused until the next write to 
+    the log, so that changes made to a table would be lost. Assignments 
+    through [], loc, iloc, at and iat raise TypeError. The tables derived 
+    from an event table (e.g., copies and selections) are ordinary 
+    DataFrames.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def __setitem__(self, key, value):
+        raise TypeError(_READ_ONLY)
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(pd.DataFrame.loc.fget(self))
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(pd.DataFrame.iloc.fget(self))
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(pd.DataFrame.at.fget(self))
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(pd.DataFrame.iat.fget(self))
+
+
+_READ_ONLY = (
+    "Tables of event logs are read-only; edit the records with the 'set' "
+    "method of the log or modify a copy of the table"
+)
+
+
+class _ReadOnlyIndexer(object):
+    """
+    Indexer of an EventTable that supports only reading.
+    """
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __setitem__(self, key, value):
+        raise TypeError(_READ_ONLY)
+
+    def __call__(self, *args, **kwargs):
+        return _ReadOnlyIndexer(self._indexer(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._indexer, name)
@@ -19,7 +19,11 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 
+from collections.abc import Mapping
 from datafev.data_handling.vehicle import ElectricVehicle
+from datafev.data_handling.power_soc import compile_power_soc_tables
+from datafev.data_handling.timeseries import TrajectoryStore
+import numpy as np
 import pandas as pd
 
 
@@ -28,7 +32,15 @@ class EVFleet(object):
     Class to define charging demand of an EV fleet.
     """
 
-    def __init__(self, fleet_id, behavior, sim_horizon):
+    def __init__(
+        self,
+        fleet_id,
+        behavior,
+        sim_horizon,
+        dtype=np.float64,
+        lazy=False,
+        vehicle_class=ElectricVehicle,
+    ):
         """
         EVFleet objects are initialized by three data
         
@@ -42,6 +54,20 @@ class EVFleet(object):
             It contains all necessary information defining the charging demand.
         sim_horizon : list or pd.date_range
             Iterable object that contains time steps in the simulation horizon.
+        dtype : numpy.dtype, optional
+            Data type of the stored SOC/G2V/V2G trajectories. numpy.float32
+            halves the memory of large fleets. The default is numpy.float64.
+        lazy : bool, optional
+            If True, the fleet is kept as a columnar table and EV objects are
+            created only when the vehicles place reservations or arrive. Only
+            these vehicles have trajectories in the working stores of the 
+            fleet. When the vehicles depart, their objects are released and 
+            their trajectories are compacted into the result stores of the 
+            fleet. The default is False.
+        vehicle_class : type, optional
+            Class of the EV objects. ExtendableElectricVehicle allows 
+            attaching user-defined attributes to the vehicles. The default is
+            ElectricVehicle.
 
         Returns
         -------
@@ -50,69 +76,315 @@ class EVFleet(object):
         """
 
         self.fleet_id = fleet_id
-        self.objects = {}
+        self.lazy = lazy
+        self.vehicle_class = vehicle_class
+
+        # Time steps are mapped to the row positions of the vehicles in the
+        # behavior table
         self.reserving_at = dict([(t, []) for t in sim_horizon])
         self.reserving_at[None] = []
         self.incoming_at = dict([(t, []) for t in sim_horizon])
         self.outgoing_at = dict([(t, []) for t in sim_horizon])
         self.outgoing_at[None] = []
 
+        # SOC/G2V/V2G trajectories of the EVs are kept in the time steps of
+        # their stays (see TrajectoryStore)
+        sim_horizon = list(sim_horizon)
+        start = sim_horizon[0] if len(sim_horizon) > 1 else None
+        step = sim_horizon[1] - sim_horizon[0] if len(sim_horizon) > 1 else None
+        self.soc_store = TrajectoryStore(start, step, dtype)
+        self.g2v_store = TrajectoryStore(start, step, dtype)
+        self.v2g_store = TrajectoryStore(start, step, dtype)
+        self.stay_first, self.stay_length = self._stay_windows(
+            behavior, start, step, len(sim_horizon) + 1
+        )
+        if not lazy:
+            for store in self.stores:
+                store.add_columns(self.stay_first, self.stay_length)
+
         ##################################################################################################
         # Define behavior
-        for _, i in behavior.iterrows():
-
-            # Initialization of an EV object
-            evID = i["ev_id"]
-            bcap = i["Battery Capacity (kWh)"]
-            p_max_ch = i["p_max_ch (kW)"]
-            p_max_ds = i["p_max_ds (kW)"]
-            ev = ElectricVehicle(evID, bcap, p_max_ch, p_max_ds)
-
-            # Assigning the scenario parameters
-            ev.t_res = i["Reservation Time"]
-            ev.t_arr_est = i["Estimated Arrival Time"]
-            ev.t_dep_est = i["Estimated Departure Time"]
-            ev.soc_arr_est = i["Estimated Arrival SOC"]
-            ev.soc_tar_at_t_dep_est = i["Target SOC @ Estimated Departure Time"]
-            ev.v2g_allow = i["V2G Allowance (kWh)"] * 3600
-            ev.t_arr_real = i["Real Arrival Time"]
-            ev.soc_arr_real = i["Real Arrival SOC"]
-            ev.t_dep_real = i["Real Departure Time"]
-            ev.cluster_target = i["Target Cluster"]
+        self.behavior = dict((c, behavior[c].tolist()) for c in behavior.columns)
+        self.row_of = dict((ev_id, n) for n, ev_id in enumerate(self.behavior["ev_id"]))
+        self.pow_soc_table = None
+
+        if lazy:
+            # Objects of the vehicles that are currently in the simulation
+            # and their columns in the working stores
+            self.resident = {}
+            self.column_of = {}
+            self.departed = []  # Rows to be released at the next departure query
+            self.admitted = [None] * len(behavior)
+            self.objects = FleetObjects(self)
+
+            # Trajectories of the released vehicles and their columns
+            self.soc_results = TrajectoryStore(start, step, dtype)
+            self.g2v_results = TrajectoryStore(start, step, dtype)
+            self.v2g_results = TrajectoryStore(start, step, dtype)
+            self.result_column_of = {}
+        else:
+            self.objects = {}
+            self.vehicles = []
+            for n in range(len(behavior)):
+                ev = self.create_vehicle(n)
+                ev.soc[ev.t_arr_real] = ev.soc_arr_real
+                self.objects[ev.vehicle_id] = ev
+                self.vehicles.append(ev)
+
+        # Vehicles are assigned to the time steps of their events in the
+        # order of the behavior table
+        res_buckets = self._group_by_time(behavior["Reservation Time"])
+        arr_buckets = self._group_by_time(behavior["Real Arrival Time"])
+        dep_buckets = self._group_by_time(behavior["Real Departure Time"])
+
+        for t, rows in res_buckets.items():
+            self.reserving_at.setdefault(t, []).extend(rows.tolist())
+        for t, rows in arr_buckets.items():
+            if t is not None:
+                self.incoming_at.setdefault(t, []).extend(rows.tolist())
+        for t, rows in dep_buckets.items():
+            self.outgoing_at.setdefault(t, []).extend(rows.tolist())
+        ##################################################################################################
+
+        ##################################################################################################
+        # Calculate statistics
+        # Number of EVs with arr<=t<dep: #(arr<=t) - #(max(arr,dep)<=t)
+        horizon = pd.DatetimeIndex(sim_horizon).asi8
+        arr = pd.to_datetime(behavior["Real Arrival Time"]).to_numpy()
+        dep = pd.to_datetime(behavior["Real Departure Time"]).to_numpy()
+        valid = ~(np.isnat(arr) | np.isnat(dep))
+        arr = arr[valid].astype("datetime64[ns]").astype(np.int64)
+        dep = dep[valid].astype("datetime64[ns]").astype(np.int64)
+        arrived = np.searchsorted(np.sort(arr), horizon, side="right")
+        departed = np.searchsorted(np.sort(np.maximum(arr, dep)), horizon, side="right")
+        self.presence_distribution = dict(
+            zip(sim_horizon, (arrived - departed).tolist())
+        )
+        ##################################################################################################
+
+    @property
+    def stores(self):
+        """
+        Working stores of the SOC, G2V and V2G trajectories.
+        """
+        return (self.soc_store, self.g2v_store, self.v2g_store)
+
+    @property
+    def result_stores(self):
+        """
+        Stores of the SOC, G2V and V2G trajectories of the released vehicles
+        (lazy mode).
+        """
+        return (self.soc_results, self.g2v_results, self.v2g_results)
+
+    @staticmethod
+    def _group_by_time(times):
+        """
+        This method groups the rows of the behavior table by the time of an 
+        event (e.g., arrival).
+
+        Parameters
+        ----------
+        times : pandas.Series
+            Event times of the vehicles.
+
+        Returns
+        -------
+        buckets : dict
+            Row positions (in table order) indexed by event times. Rows with 
+            missing times are indexed by None.
+
+        """
+
+        times = pd.Series(pd.to_datetime(times).to_numpy())
+        buckets = {}
+        missing = np.flatnonzero(times.isna().to_numpy())
+        if len(missing) > 0:
+            buckets[None] = missing
+        buckets.update(times.groupby(times, sort=False).indices)
+        return buckets
+
+    @staticmethod
+    def _stay_windows(behavior, start, step, n_rows):
+        """
+        This method locates the stays of the vehicles (from the real arrival
+        to the real departure) on the time grid of the trajectory stores.
+
+        Parameters
+        ----------
+        behavior : pandas.DataFrame
+            Behavior table of the fleet.
+        start : datetime.datetime
+            First time step of the simulation horizon.
+        step : datetime.timedelta
+            Time resolution of the simulation horizon.
+        n_rows : int
+            Number of rows of the grid (stays are clipped to it).
+
+        Returns
+        -------
+        first : numpy.ndarray
+            Grid rows of the arrivals.
+        length : numpy.ndarray
+            Number of rows of the stays (0 if the arrival is unknown or does
+            not fit the grid).
+
+        """
+
+        n_evs = len(behavior)
+        if start is None:
+            return np.zeros(n_evs, dtype=np.int64), np.zeros(n_evs, dtype=np.int64)
+
+        origin = pd.Timestamp(start).value
+        step_ns = pd.Timedelta(step).value
+        arr = pd.DatetimeIndex(pd.to_datetime(behavior["Real Arrival Time"]))
+        dep = pd.DatetimeIndex(pd.to_datetime(behavior["Real Departure Time"]))
+
+        first = (arr.asi8 - origin) // step_ns
+        last = np.where(dep.isna(), n_rows - 1, -(-(dep.asi8 - origin) // step_ns))
+        first = np.clip(first, 0, n_rows)
+        last = np.clip(last, -1, n_rows - 1)
+        length = np.maximum(last - first + 1, 0)
+        length[arr.isna() | ((arr.asi8 - origin) % step_ns != 0)] = 0
+        return first.astype(np.int64), length.astype(np.int64)
+
+    def create_vehicle(self, n):
+        """
+        This method creates the EV object of a particular row of the behavior
+        table. The trajectories of the object are bound to the stores of the 
+        fleet. In lazy mode, the objects of the released vehicles are bound 
+        to the result stores, and the objects of the other vehicles keep 
+        their trajectories in dictionaries until they are admitted to the 
+        simulation (see vehicle).
+
+        Parameters
+        ----------
+        n : int
+            Row position of the vehicle in the behavior table.
+
+        Returns
+        -------
+        ev : ElectricVehicle
+            The EV object.
+
+        """
+
+        data = self.behavior
+
+        # Initialization of an EV object
+        evID = data["ev_id"][n]
+        bcap = data["Battery Capacity (kWh)"][n]
+        p_max_ch = data["p_max_ch (kW)"][n]
+        p_max_ds = data["p_max_ds (kW)"][n]
+        ev = self.vehicle_class(evID, bcap, p_max_ch, p_max_ds)
+        if not self.lazy:
+            ev.bind_trajectory_store(n, *self.stores)
+        elif n in self.result_column_of:
+            ev.bind_trajectory_store(self.result_column_of[n], *self.result_stores)
+
+        # Assigning the scenario parameters
+        ev.t_res = data["Reservation Time"][n]
+        ev.t_arr_est = data["Estimated Arrival Time"][n]
+        ev.t_dep_est = data["Estimated Departure Time"][n]
+        ev.soc_arr_est = data["Estimated Arrival SOC"][n]
+        ev.soc_tar_at_t_dep_est = data["Target SOC @ Estimated Departure Time"][n]
+        ev.v2g_allow = data["V2G Allowance (kWh)"][n] * 3600
+        ev.t_arr_real = data["Real Arrival Time"][n]
+        ev.soc_arr_real = data["Real Arrival SOC"][n]
+        ev.t_dep_real = data["Real Departure Time"][n]
+        ev.cluster_target = data["Target Cluster"][n]
+
+        if self.pow_soc_table is not None:
+            ev.pow_soc_table = self.pow_soc_table.get(evID)
+
+        if self.lazy and n not in self.result_column_of and pd.notna(ev.t_arr_real):
             ev.soc[ev.t_arr_real] = ev.soc_arr_real
 
-            self.objects[evID] = ev
+        return ev
 
-            if pd.isna(ev.t_res):
-                self.reserving_at[None].append(ev)
-            else:
-                self.reserving_at[ev.t_res].append(ev)
+    def vehicle(self, n):
+        """
+        This method returns the EV object of a particular row of the behavior
+        table. In lazy mode, the object is created if the vehicle is not in
+        the simulation yet, and the trajectories of the vehicle are moved to
+        columns allocated for its stay in the working stores.
 
-            self.incoming_at[ev.t_arr_real].append(ev)
+        Parameters
+        ----------
+        n : int
+            Row position of the vehicle in the behavior table.
 
-            if pd.isna(ev.t_dep_real):
-                self.outgoing_at[None].append(ev)
-            else:
-                self.outgoing_at[ev.t_dep_real].append(ev)
-        ##################################################################################################
+        Returns
+        -------
+        ElectricVehicle
+            The EV object.
 
-        ##################################################################################################
-        # Calculate statistics
-        self.presence_distribution = {}
-        for t in sim_horizon:
-            self.presence_distribution[t] = len(
-                behavior[
-                    (behavior["Real Arrival Time"] <= t)
-                    & (behavior["Real Departure Time"] > t)
-                ]
-            )
-        ##################################################################################################
+        """
+
+        if not self.lazy:
+            return self.vehicles[n]
+
+        ev = self.resident.get(n)
+        if ev is None:
+            ev = self.create_vehicle(n)
+            if n not in self.result_column_of:
+                column = self._allocate_columns(n)
+                ev.bind_trajectory_store(column, *self.stores)
+                self.column_of[n] = column
+            self.resident[n] = ev
+        return ev
+
+    def _allocate_columns(self, n):
+        """
+        This method allocates the columns of a vehicle in the working stores
+        for the time steps of its stay (lazy mode).
+        """
+        first = int(self.stay_first[n])
+        length = int(self.stay_length[n])
+        for store in self.stores:
+            column = store.add_window(first, length)
+        return column
+
+    def release_departed_vehicles(self):
+        """
+        This method releases the objects of the vehicles that left the 
+        clusters in the previous departure query (lazy mode). Their 
+        trajectories are copied to the result stores (trimmed to the stored
+        values) and their columns in the working stores are released to be
+        reused by the next vehicles. Their admission status is kept in the
+        admitted list.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        for n in self.departed:
+            ev = self.resident.pop(n, None)
+            if ev is None:
+                continue
+            self.admitted[n] = getattr(ev, "admitted", None)
+
+            column = self.column_of.pop(n, None)
+            if column is not None:
+                for store, results in zip(self.stores, self.result_stores):
+                    result_column = results.append_copy(store, column)
+                    store.release(column)
+                self.result_column_of[n] = result_column
+
+                # References to the object that are kept outside the fleet
+                # read the trajectories from the result stores
+                ev.bind_trajectory_store(result_column, *self.result_stores, copy=False)
+        self.departed = []
 
     def enter_power_soc_table(self, table):
         """
         In practice, power that can be handled (withdrawn/injected) by EV 
         batteries change by SOC. This method is called to enter SOC dependency 
         data of the EVs in the scenario. SOC dependency is defined in a table.
+        The table of each EV is compiled once into a PowerSOCTable, which is
+        shared by the EVs that have identical SOC dependency data.
 
         Parameters
         ----------
@@ -129,8 +401,10 @@ class EVFleet(object):
         None.
 
         """
-        for ev_id, ev in self.objects.items():
-            ev.pow_soc_table = table.loc[ev_id].copy()
+        self.pow_soc_table = compile_power_soc_tables(table)
+        vehicles = self.resident.values() if self.lazy else self.vehicles
+        for ev in vehicles:
+            ev.pow_soc_table = self.pow_soc_table.get(ev.vehicle_id)
 
     def reserving_vehicles_at(self, ts):
         """
@@ -148,7 +422,7 @@ class EVFleet(object):
             The list of the objects that place reservation request at ts.
 
         """
-        return self.reserving_at[ts]
+        return [self.vehicle(n) for n in self.reserving_at[ts]]
 
     def incoming_vehicles_at(self, ts):
         """
@@ -166,7 +440,7 @@ class EVFleet(object):
             The list of the objects that arrive in clusters at ts.
 
         """
-        return self.incoming_at[ts]
+        return [self.vehicle(n) for n in self.incoming_at[ts]]
 
     def outgoing_vehicles_at(self, ts):
         """
@@ -184,7 +458,57 @@ class EVFleet(object):
             The list of the objects that leave clusters at ts.
 
         """
-        return self.outgoing_at[ts]
+        if self.lazy:
+            self.release_departed_vehicles()
+            self.departed = list(self.outgoing_at[ts])
+        return [self.vehicle(n) for n in self.outgoing_at[ts]]
+
+    def take_trajectories(self, index, rows):
+        """
+        This method reads the SOC, G2V and V2G trajectories of multiple 
+        vehicles at the given time stamps.
+
+        Parameters
+        ----------
+        index : pandas.DatetimeIndex
+            Queried time stamps.
+        rows : list of int
+            Row positions of the vehicles in the behavior table.
+
+        Returns
+        -------
+        list of numpy.ndarray
+            SOC, G2V and V2G values in arrays of shape (len(index), 
+            len(rows)). Values that are not stored are NaN.
+
+        """
+
+        if not self.lazy:
+            return [store.take(index, rows) for store in self.stores]
+
+        index = pd.DatetimeIndex(index)
+        values = [np.full((len(index), len(rows)), np.nan) for store in self.stores]
+
+        # Vehicles in the simulation, released vehicles and the others
+        resident = [k for k, n in enumerate(rows) if n in self.column_of]
+        released = [k for k, n in enumerate(rows) if n in self.result_column_of]
+        columns = [self.column_of[rows[k]] for k in resident]
+        result_columns = [self.result_column_of[rows[k]] for k in released]
+        for n in range(3):
+            values[n][:, resident] = self.stores[n].take(index, columns)
+            values[n][:, released] = self.result_stores[n].take(index, result_columns)
+
+        # Only the arrival SOCs of the other vehicles are known
+        lookup = dict((ts, i) for i, ts in enumerate(index))
+        arrival = self.behavior["Real Arrival Time"]
+        arrival_soc = self.behavior["Real Arrival SOC"]
+        for k, n in enumerate(rows):
+            if n not in self.column_of and n not in self.result_column_of:
+                i = lookup.get(arrival[n]) if pd.notna(arrival[n]) else None
+                if i is not None:
+                    values[0][i, k] = arrival_soc[n]
+
+        return values
 
     def export_results_to_excel(self, start, end, step, xlfile):
         """
@@ -210,23 +534,64 @@ class EVFleet(object):
 
         sim_horizon = pd.date_range(start=start, end=end, freq=step)
 
-        soc = pd.DataFrame(index=sim_horizon)
-        g2v = pd.DataFrame(index=sim_horizon)
-        v2g = pd.DataFrame(index=sim_horizon)
+        ev_ids = sorted(self.objects.keys())
+        soc, g2v, v2g = [
+            pd.DataFrame(values, index=sim_horizon, columns=ev_ids)
+            for values in self.take_trajectories(
+                sim_horizon, [self.row_of[ev_id] for ev_id in ev_ids]
+            )
+        ]
         status = pd.Series(dtype="float64")
 
         with pd.ExcelWriter(xlfile) as writer:
 
-            for ev_id in sorted(self.objects.keys()):
-
-                ev = self.objects[ev_id]
-
-                soc.loc[:, ev_id] = pd.Series(ev.soc, dtype="float64")
-                g2v.loc[:, ev_id] = pd.Series(ev.g2v, dtype="float64")
-                v2g.loc[:, ev_id] = pd.Series(ev.v2g, dtype="float64")
-                status[ev_id] = ev.admitted
+            for ev_id in ev_ids:
+                status[ev_id] = self.objects[ev_id].admitted
 
             soc.to_excel(writer, sheet_name="SOC Trajectory")
             g2v.to_excel(writer, sheet_name="G2V Charge")
             v2g.to_excel(writer, sheet_name="V2G Discharge")
             status.to_excel(writer, sheet_name="Admitted")
+
+
+class FleetObjects(Mapping):
+    """
+    Dictionary-like access to the EV objects of a lazy fleet by vehicle 
+    identifiers.
+
+    Objects of the vehicles in the simulation are returned as they are. 
+    Objects of the other vehicles are recreated from the behavior table and 
+    the result stores of the fleet. Recreated objects are not kept.
+    """
+
+    def __init__(self, fleet):
+        """
+        Mappings are defined by the fleet that they belong to.
+
+        Parameters
+        ----------
+        fleet : EVFleet
+            The lazy fleet.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.fleet = fleet
+
+    def __getitem__(self, ev_id):
+        fleet = self.fleet
+        n = fleet.row_of[ev_id]
+        ev = fleet.resident.get(n)
+        if ev is None:
+            ev = fleet.create_vehicle(n)
+            if fleet.admitted[n] is not None:
+                ev.admitted = fleet.admitted[n]
+        return ev
+
+    def __iter__(self):
+        return iter(self.fleet.row_of)
+
+    def __len__(self):
+        return len(self.fleet.row_of)
@@ -167,8 +167,8 @@ class MultiClusterSystem(object):
         clusterschedules = pd.DataFrame(index=time_index)
 
         for cc_id, cc in self.clusters.items():
-            cc_sch = cc.query_actual_schedules(ts, t_delta, horizon)
-            clusterschedules[cc_id] = (cc_sch.sum(axis=1)).copy()
+            cc_sch = cc.query_actual_schedule(ts, ts + horizon - t_delta, t_delta)
+            clusterschedules[cc_id] = cc_sch.copy()
 
         return clusterschedules
 
@@ -230,7 +230,7 @@ class MultiClusterSystem(object):
 
         return available_chargers
 
-    def uncontrolled_supply(self, ts, step):
+    def uncontrolled_supply(self, ts, step, n_steps=1):
         """
         This method is run to execute the uncontrolled charging behavior.
 
@@ -240,6 +240,10 @@ class MultiClusterSystem(object):
             Current time.
         step : datetime.timedelta
             Length of time step.
+        n_steps : int, optional
+            Number of consecutive time steps to be simulated starting from ts.
+            No EV is expected to connect or disconnect in this period. The 
+            default is 1.
 
         Returns
         -------
@@ -247,7 +251,7 @@ class MultiClusterSystem(object):
         """
 
         for cc_id, cc in self.clusters.items():
-            cc.uncontrolled_supply(ts, step)
+            cc.uncontrolled_supply(ts, step, n_steps)
 
     def export_results_to_excel(self, start, end, step, xlfile):
         """
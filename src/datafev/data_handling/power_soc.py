@@ -0,0 +1,223 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+
+
+class PowerSOCTable(object):
+    """
+    Compiled SOC dependency of the power capability of an EV battery.
+
+    The SOC ranges of the table are kept as sorted breakpoint and limit 
+    arrays so that the power limit at a particular SOC is found by a binary 
+    search instead of filtering a dataframe. Tables are immutable and shared 
+    by the EVs that have identical SOC dependency data.
+    """
+
+    __slots__ = ("soc_breaks", "p_limits", "_inner", "_limits")
+
+    def __init__(self, soc_lb, soc_ub, p_ub):
+        """
+        The SOC ranges are sorted by their lower bounds at initialization. 
+        The ranges are assumed to be contiguous, i.e., the upper bound of a 
+        range is the lower bound of the next one.
+
+        Parameters
+        ----------
+        soc_lb : list of float
+            Lower bounds of the SOC ranges.
+        soc_ub : list of float
+            Upper bounds of the SOC ranges.
+        p_ub : list of float
+            Upper bounds of the power capability in the SOC ranges (kW).
+
+        Returns
+        -------
+        None.
+
+        """
+
+        order = np.argsort(np.asarray(soc_lb, dtype=float), kind="stable")
+        soc_lb = np.asarray(soc_lb, dtype=float)[order]
+        soc_ub = np.asarray(soc_ub, dtype=float)[order]
+
+        # Breakpoints of the SOC ranges: lower bound of the first range and
+        # upper bounds of all ranges
+        self.soc_breaks = np.concatenate((soc_lb[:1], soc_ub))
+        self.p_limits = np.asarray(p_ub, dtype=float)[order]
+        self.soc_breaks.flags.writeable = False
+        self.p_limits.flags.writeable = False
+
+        # Plain lists are faster than arrays for scalar look-ups
+        self._inner = self.soc_breaks[1:-1].tolist()
+        self._limits = self.p_limits.tolist()
+
+    @classmethod
+    def from_frame(cls, table):
+        """
+        This method compiles the SOC dependency table of a single EV.
+
+        Parameters
+        ----------
+        table : pandas.DataFrame
+            Table with a row per SOC range and the columns 'SOC_LB', 'SOC_UB' 
+            and 'P_UB'.
+
+        Returns
+        -------
+        PowerSOCTable
+            Compiled table.
+
+        """
+
+        return cls(
+            table["SOC_LB"].tolist(), table["SOC_UB"].tolist(), table["P_UB"].tolist()
+        )
+
+    def key(self):
+        """
+        This method returns a hashable representation of the table, which is
+        used to share identical tables between EVs.
+        """
+
+        return (tuple(self.soc_breaks.tolist()), tuple(self._limits))
+
+    def p_max(self, soc):
+        """
+        This method returns the maximum power that the EV battery can accept
+        at the given SOC(s). SOCs below (above) the table are given the limit
+        of the first (last) SOC range.
+
+        Parameters
+        ----------
+        soc : float or numpy.ndarray
+            SOC(s) of the EV battery.
+
+        Returns
+        -------
+        float or numpy.ndarray
+            Power limit(s) (kW).
+
+        """
+
+        if np.ndim(soc) == 0:
+            return self._limits[bisect_right(self._inner, soc)]
+        return self.p_limits[np.searchsorted(self.soc_breaks[1:-1], soc, side="right")]
+
+    def __len__(self):
+        return len(self._limits)
+
+    def __repr__(self):
+        return "PowerSOCTable(soc_breaks={}, p_limits={})".format(
+            self.soc_breaks.tolist(), self._limits
+        )
+
+
+def to_power_soc_table(table):
+    """
+    This function converts the SOC dependency table of a single EV to a 
+    compiled table.
+
+    Parameters
+    ----------
+    table : PowerSOCTable, pandas.DataFrame, dict or None
+        A compiled table, a dataframe with columns 'SOC_LB', 'SOC_UB' and 
+        'P_UB', a dictionary of SOC ranges with the same keys or None (no 
+        SOC dependency).
+
+    Returns
+    -------
+    PowerSOCTable or None
+        Compiled table.
+
+    """
+
+    if table is None or isinstance(table, PowerSOCTable):
+        return table
+    if isinstance(table, pd.DataFrame):
+        return PowerSOCTable.from_frame(table)
+    return PowerSOCTable(
+        [table[r]["SOC_LB"] for r in table.keys()],
+        [table[r]["SOC_UB"] for r in table.keys()],
+        [table[r]["P_UB"] for r in table.keys()],
+    )
+
+
+def compile_power_soc_tables(table):
+    """
+    This function compiles the SOC dependency data of multiple EVs. EVs with 
+    identical data share the same compiled table.
+
+    Parameters
+    ----------
+    table : pandas.DataFrame
+        Table with a (EV identifier, SOC range) multi-index and the columns 
+        'SOC_LB', 'SOC_UB' and 'P_UB'.
+
+    Returns
+    -------
+    dict of PowerSOCTable
+        Compiled tables of the EVs.
+
+    """
+
+    compiled = {}
+    shared = {}
+    for ev_id, ev_table in table.groupby(level=0, sort=False):
+        candidate = PowerSOCTable.from_frame(ev_table)
+        compiled[ev_id] = shared.setdefault(candidate.key(), candidate)
+    return compiled
+
+
+def p_max_array(tables, soc):
+    """
+    This function returns the maximum powers that the batteries of multiple 
+    EVs can accept at their SOCs. EVs sharing the same compiled table are
+    evaluated together.
+
+    Parameters
+    ----------
+    tables : list of PowerSOCTable
+        Compiled tables of the EVs (None if there is no SOC dependency).
+    soc : numpy.ndarray
+        SOCs of the EV batteries.
+
+    Returns
+    -------
+    numpy.ndarray
+        Power limits (kW). EVs without SOC dependency have infinite limits.
+
+    """
+
+    soc = np.asarray(soc, dtype=float)
+    p_max = np.full(len(soc), np.inf)
+
+    groups = {}
+    for n, table in enumerate(tables):
+        if table is not None:
+            groups.setdefault(id(table), (table, []))[1].append(n)
+
+    for table, rows in groups.values():
+        p_max[rows] = table.p_max(soc[rows])
+
+    return p_max
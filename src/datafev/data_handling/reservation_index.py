@@ -0,0 +1,142 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+from bisect import bisect_right
+
+
+class ReservationIndex(object):
+    """
+    Sorted interval index of the active reservations of a charging unit.
+
+    Reservations are kept sorted by their start times together with the 
+    running maximum of their end times. This allows answering whether the 
+    charging unit is free in a queried period with a single binary search.
+    """
+
+    def __init__(self):
+        """
+        The index is empty at initialization.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        self.starts = []  # Start times of reservations in ascending order
+        self.untils = []  # End times of reservations (same order as starts)
+        self.ids = []  # Reservation identifiers (same order as starts)
+        self.max_until = []  # Running maximum of untils
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, reservation_id, res_from, res_until):
+        """
+        This method adds a reservation to the index.
+
+        Parameters
+        ----------
+        reservation_id : int
+            Identifier of the reservation.
+        res_from : datetime.datetime
+            Start of the reservation period.
+        res_until : datetime.datetime
+            End of the reservation period.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        pos = bisect_right(self.starts, res_from)
+        self.starts.insert(pos, res_from)
+        self.untils.insert(pos, res_until)
+        self.ids.insert(pos, reservation_id)
+        self.max_until.insert(pos, res_until)
+        self._update_max_until(pos)
+
+    def remove(self, reservation_id):
+        """
+        This method removes a reservation from the index. Identifiers that are
+        not in the index are ignored.
+
+        Parameters
+        ----------
+        reservation_id : int
+            Identifier of the reservation.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        if reservation_id not in self.ids:
+            return
+        pos = self.ids.index(reservation_id)
+        del self.starts[pos]
+        del self.untils[pos]
+        del self.ids[pos]
+        del self.max_until[pos]
+        self._update_max_until(pos)
+
+    def is_free(self, start, end, step):
+        """
+        This method checks whether the charging unit is free in the queried 
+        period. A reservation occupies the time steps from its start until 
+        one step before its end. The queried period includes both its start 
+        and its end.
+
+        Parameters
+        ----------
+        start : datetime.datetime
+            Start of the queried period.
+        end : datetime.datetime
+            End of the queried period.
+        step : datetime.timedelta
+            Time resolution in the queried period.
+
+        Returns
+        -------
+        bool
+            True if none of the reservations overlaps with the queried period.
+
+        """
+
+        # Reservations starting after the queried period do not overlap
+        n = bisect_right(self.starts, end)
+        if n == 0:
+            return True
+        return self.max_until[n - 1] - step < start
+
+    def _update_max_until(self, pos):
+        """
+        This method recomputes the running maximum of the end times from the 
+        given position onwards.
+        """
+
+        running = self.max_until[pos - 1] if pos > 0 else None
+        for k in range(pos, len(self.untils)):
+            if running is None or self.untils[k] > running:
+                running = self.untils[k]
+            self.max_until[k] = running
@@ -0,0 +1,993 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from collections.abc import MutableMapping
+import numpy as np
+import pandas as pd
+
+
+def interval_occupation(period, starts, ends, columns, n_columns):
+    """
+    This function counts the intervals (e.g., connections of EVs) that cover
+    the time steps of a period. The intervals include both of their ends. 
+    Intervals without an end last until the end of the period.
+
+    Parameters
+    ----------
+    period : pandas.DatetimeIndex
+        Sorted time steps of the period.
+    starts : list of datetime.datetime
+        Start times of the intervals.
+    ends : list of datetime.datetime
+        End times of the intervals (NaT/NaN/None if not ended).
+    columns : list of int
+        Column of the result that each interval is counted in.
+    n_columns : int
+        Number of columns in the result.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (len(period), n_columns) with the number of intervals
+        covering each time step.
+
+    """
+
+    steps = pd.DatetimeIndex(period).asi8
+    starts = pd.DatetimeIndex(pd.to_datetime(pd.Series(starts, dtype=object)))
+    ends = pd.DatetimeIndex(pd.to_datetime(pd.Series(ends, dtype=object)))
+    columns = np.asarray(columns, dtype=int)
+
+    first = np.searchsorted(steps, starts.asi8, side="left")
+    last = np.searchsorted(steps, ends.asi8, side="right")
+    last[ends.isna()] = len(steps)
+    valid = ~starts.isna() & (first < last)
+
+    # Difference array: +1 at the first and -1 after the last covered step
+    diff = np.zeros((len(steps) + 1, n_columns))
+    np.add.at(diff, (first[valid], columns[valid]), 1)
+    np.add.at(diff, (last[valid], columns[valid]), -1)
+    return np.cumsum(diff, axis=0)[: len(steps)]
+
+
+class GridStore(object):
+    """
+    Base class of the stores of series that are sampled on a regular time
+    grid.
+
+    The values on the grid are kept in NumPy arrays whose layout is defined
+    by the subclasses. Values that do not have a place in the arrays (e.g.,
+    with time stamps that do not fit the grid) are kept in dictionaries.
+    Missing values are NaN. Every series has a version number that is
+    incremented with each write so that the pandas.Series built from it can
+    be reused until it changes.
+    """
+
+    def __init__(self, start=None, step=None):
+        """
+        The store can be anchored to a time grid at initialization or later.
+
+        Parameters
+        ----------
+        start : datetime.datetime, optional
+            Time stamp of the first row of the grid. The default is None.
+        step : datetime.timedelta, optional
+            Time resolution of the grid. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        self.start = None
+        self.step = None
+        self.outside = {}  # Values without a place in the arrays: column -> {ts: value}
+        self._series_cache = {}
+
+        if start is not None and step is not None:
+            self.anchor(start, step)
+
+    def anchor(self, start, step):
+        """
+        This method defines the time grid of the store.
+
+        Parameters
+        ----------
+        start : datetime.datetime
+            Time stamp of the first row of the grid.
+        step : datetime.timedelta
+            Time resolution of the grid.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.start = start
+        self.step = step
+
+    def offset(self, ts):
+        """
+        This method converts a time stamp to the row of the grid.
+
+        Parameters
+        ----------
+        ts : datetime.datetime
+            Time stamp.
+
+        Returns
+        -------
+        int or None
+            Step offset of ts from the start of the grid. None if ts does
+            not fit the grid.
+
+        """
+        if self.start is None or ts is None or ts != ts:
+            return None
+        n, rest = divmod(ts - self.start, self.step)
+        if rest:
+            return None
+        return int(n)
+
+    def _assign(self, values):
+        """
+        This method replaces the array of the values and its flat view.
+        """
+        self.values = values
+        self._cells = values.reshape(-1)
+
+    def _allocate(self, row, n_rows):
+        """
+        This method prepares n_rows consecutive grid rows starting from row
+        for writing and returns the (possibly moved) first of them.
+        """
+        return row
+
+    def _locate(self, rows, columns):
+        """
+        This method returns the positions of grid rows of series in the flat
+        view of the values and whether the arrays have a place for them.
+        """
+        raise NotImplementedError
+
+    def window(self, column):
+        """
+        This method returns the values of a series stored in the arrays.
+
+        Parameters
+        ----------
+        column : int
+            Column index of the series.
+
+        Returns
+        -------
+        first : int
+            Grid row of the first value.
+        numpy.ndarray
+            Values of the consecutive grid rows (not a copy).
+
+        """
+        raise NotImplementedError
+
+    def get(self, ts, column, default=np.nan):
+        """
+        This method reads a single value.
+
+        Parameters
+        ----------
+        ts : datetime.datetime
+            Time stamp of the value.
+        column : int
+            Column index of the series.
+        default : float, optional
+            Returned if there is no value stored for ts. The default is NaN.
+
+        Returns
+        -------
+        float
+            Stored value.
+
+        """
+        row = self.offset(ts)
+        if row is not None:
+            position, inside = self._locate(row, column)
+            if inside:
+                value = self._cells[position]
+                return default if value != value else value
+        return self.outside.get(column, {}).get(ts, default)
+
+    def set(self, ts, column, value):
+        """
+        This method writes a single value.
+
+        Parameters
+        ----------
+        ts : datetime.datetime
+            Time stamp of the value.
+        column : int
+            Column index of the series.
+        value : float
+            Value to be stored.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.versions[column] += 1
+        row = self.offset(ts)
+        if row is not None:
+            position, inside = self._locate(self._allocate(row, 1), column)
+            if inside:
+                self._cells[position] = value
+                return
+        self.outside.setdefault(column, {})[ts] = value
+
+    def delete(self, ts, column):
+        """
+        This method removes a single value.
+
+        Parameters
+        ----------
+        ts : datetime.datetime
+            Time stamp of the value.
+        column : int
+            Column index of the series.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.versions[column] += 1
+        self.outside.get(column, {}).pop(ts, None)
+        row = self.offset(ts)
+        if row is not None:
+            position, inside = self._locate(row, column)
+            if inside:
+                self._cells[position] = np.nan
+
+    def get_many(self, ts, columns):
+        """
+        This method reads the values of multiple series at a single time
+        stamp.
+
+        Parameters
+        ----------
+        ts : datetime.datetime
+            Time stamp of the values.
+        columns : numpy.ndarray
+            Column indices of the series.
+
+        Returns
+        -------
+        numpy.ndarray
+            Stored values. Values that are not stored are NaN.
+
+        """
+        columns = np.asarray(columns, dtype=np.int64)
+        result = np.full(len(columns), np.nan)
+        row = self.offset(ts)
+        if row is None:
+            inside = np.zeros(len(columns), dtype=bool)
+        else:
+            positions, inside = self._locate(row, columns)
+            inside = np.broadcast_to(inside, columns.shape)
+            if inside.all():
+                return self._cells[positions].astype(float)
+            result[inside] = self._cells[positions[inside]]
+        for n in np.flatnonzero(~inside).tolist():
+            result[n] = self.outside.get(int(columns[n]), {}).get(ts, np.nan)
+        return result
+
+    def set_many(self, ts, columns, values):
+        """
+        This method writes the values of multiple series at a single time
+        stamp.
+
+        Parameters
+        ----------
+        ts : datetime.datetime
+            Time stamp of the values.
+        columns : numpy.ndarray
+            Column indices of the series.
+        values : numpy.ndarray
+            Values to be stored.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.set_block(ts, columns, np.asarray(values)[None, :])
+
+    def set_block(self, ts, columns, values, step=None):
+        """
+        This method writes the values of multiple series at consecutive time
+        stamps starting from a particular time stamp.
+
+        Parameters
+        ----------
+        ts : datetime.datetime
+            Time stamp of the first row of values.
+        columns : numpy.ndarray
+            Column indices of the series.
+        values : numpy.ndarray
+            Values to be stored in shape (time stamps x columns).
+        step : datetime.timedelta, optional
+            Time between the consecutive rows of values. The default is None
+            (time resolution of the store).
+
+        Returns
+        -------
+        None.
+
+        """
+        columns = np.asarray(columns, dtype=np.int64)
+        values = np.asarray(values)
+        n_rows = len(values)
+        if n_rows == 0:
+            return
+        self.versions[columns] += 1
+        step = self.step if step is None else step
+        row = self.offset(ts)
+        if row is None or step != self.step:
+            for n in range(n_rows):
+                for k, column in enumerate(columns.tolist()):
+                    self.set(ts + n * step, column, values[n, k])
+            return
+
+        row = self._allocate(row, n_rows)
+        rows = (row + np.arange(n_rows))[:, None]
+        positions, inside = self._locate(rows, columns)
+        inside = np.broadcast_to(inside, positions.shape)
+        if inside.all():
+            self._cells[positions] = values
+            return
+        self._cells[positions[inside]] = values[inside]
+        for n, k in zip(*np.nonzero(~inside)):
+            column = int(columns[k])
+            self.outside.setdefault(column, {})[ts + int(n) * step] = values[n, k]
+
+    def keys(self, column):
+        """
+        This method returns the time stamps of the values stored in a series.
+
+        Parameters
+        ----------
+        column : int
+            Column index of the series.
+
+        Returns
+        -------
+        list of datetime.datetime
+            Sorted time stamps.
+
+        """
+        first, values = self.window(column)
+        keys = [
+            self.start + (first + int(n)) * self.step
+            for n in np.flatnonzero(~np.isnan(values))
+        ]
+        extra = self.outside.get(column)
+        if extra:
+            keys = sorted(keys + [ts for ts, v in extra.items() if v == v])
+        return keys
+
+    def count(self, column):
+        """
+        This method returns the number of values stored in a series.
+
+        Parameters
+        ----------
+        column : int
+            Column index of the series.
+
+        Returns
+        -------
+        int
+            Number of stored values.
+
+        """
+        first, values = self.window(column)
+        n = int(np.count_nonzero(~np.isnan(values)))
+        extra = self.outside.get(column)
+        if extra:
+            n += sum(1 for v in extra.values() if v == v)
+        return n
+
+    def take(self, index, columns):
+        """
+        This method reads the values of multiple series at the given time
+        stamps.
+
+        Parameters
+        ----------
+        index : pandas.DatetimeIndex
+            Queried time stamps.
+        columns : list of int
+            Column indices of the series.
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape (len(index), len(columns)). Values that are not
+            stored are NaN.
+
+        """
+
+        index = pd.DatetimeIndex(index)
+        columns = np.asarray(columns, dtype=np.int64)
+        result = np.full((len(index), len(columns)), np.nan)
+
+        if self.start is not None and len(columns) > 0:
+            step_ns = pd.Timedelta(self.step).value
+            delta_ns = index.asi8 - pd.Timestamp(self.start).value
+            rows = delta_ns // step_ns
+            positions, inside = self._locate(rows[:, None], columns[None, :])
+            inside = (delta_ns % step_ns == 0)[:, None] & inside
+            inside = np.broadcast_to(inside, positions.shape)
+            result[inside] = self._cells[positions[inside]]
+
+        if self.outside:
+            lookup = dict((ts, n) for n, ts in enumerate(index))
+            for k, column in enumerate(columns.tolist()):
+                for ts, value in self.outside.get(column, {}).items():
+                    if ts in lookup:
+                        result[lookup[ts], k] = value
+
+        return result
+
+    def series(self, column):
+        """
+        This method returns a stored series in the form of pandas.Series.
+        The series is built on demand and reused until the series is
+        written.
+
+        Parameters
+        ----------
+        column : int
+            Column index of the series.
+
+        Returns
+        -------
+        pandas.Series
+            Time indexed series containing only the stored values.
+
+        """
+
+        version = self.versions[column]
+        cached = self._series_cache.get(column)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        first, values = self.window(column)
+        values = values.astype(float)
+        mask = ~np.isnan(values)
+        if len(values) > 0:
+            index = pd.date_range(
+                start=self.start + first * self.step, periods=len(values), freq=self.step
+            )
+            ser = pd.Series(values[mask], index=index[mask], dtype=float)
+        else:
+            ser = pd.Series(dtype=float)
+
+        extra = self.outside.get(column)
+        if extra:
+            extra = pd.Series(extra, dtype=float).dropna()
+            if len(ser) == 0:
+                ser = extra.sort_index()
+            elif len(extra) > 0:
+                ser = pd.concat([ser, extra]).sort_index()
+
+        self._series_cache[column] = (version, ser)
+        return ser
+
+
+class TimeSeriesStore(GridStore):
+    """
+    Columnar storage for time series that are sampled on a regular time grid.
+
+    Values are kept in a NumPy array whose rows are the integer step offsets
+    from the start of the grid and whose columns are the stored series. The
+    array is preallocated and grows geometrically, so that writing the value
+    of a simulation step does not copy the history. Missing values are NaN.
+    """
+
+    def __init__(self, n_columns=1, start=None, step=None, n_steps=0, dtype=np.float64):
+        """
+        The store can be anchored to a time grid at initialization or later
+        with the first write.
+
+        Parameters
+        ----------
+        n_columns : int, optional
+            Number of stored series. The default is 1.
+        start : datetime.datetime, optional
+            Time stamp of the first row. The default is None.
+        step : datetime.timedelta, optional
+            Time resolution of the grid. The default is None.
+        n_steps : int, optional
+            Number of rows to preallocate. The default is 0.
+        dtype : numpy.dtype, optional
+            Data type of the stored values. The default is numpy.float64.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        super().__init__(start, step)
+        self._assign(np.full((n_steps, n_columns), np.nan, dtype=dtype))
+        self.n_columns = n_columns
+        self.n_rows = 0  # Number of rows up to the last written one
+        self.versions = np.zeros(n_columns, dtype=np.int64)
+
+    def add_column(self):
+        """
+        This method appends an empty series to the store.
+
+        Returns
+        -------
+        column : int
+            Column index of the new series.
+
+        """
+
+        column = self.n_columns
+        if column >= self.values.shape[1]:
+            capacity = max(column + 1, 2 * self.values.shape[1], 4)
+            values = np.full((self.values.shape[0], capacity), np.nan, self.values.dtype)
+            values[:, : self.n_columns] = self.values[:, : self.n_columns]
+            self._assign(values)
+            versions = np.zeros(capacity, dtype=np.int64)
+            versions[: self.n_columns] = self.versions[: self.n_columns]
+            self.versions = versions
+        self.n_columns += 1
+        return column
+
+    def accumulate(self, ts, column, values):
+        """
+        This method adds an array of values to the consecutive rows of a
+        series starting from a particular time stamp. Missing values are
+        treated as zero.
+
+        Parameters
+        ----------
+        ts : datetime.datetime
+            Time stamp of the first value. It must fit the grid.
+        column : int
+            Column index of the series.
+        values : numpy.ndarray
+            Values to be added.
+
+        Returns
+        -------
+        None.
+
+        """
+        if len(values) == 0:
+            return
+        first = self._allocate(self.offset(ts), len(values))
+        block = self.values[first : first + len(values), column]
+        self.values[first : first + len(values), column] = np.nan_to_num(block) + values
+        self.versions[column] += 1
+
+    def window(self, column):
+        """
+        This method returns the values of a series stored in the array.
+
+        Parameters
+        ----------
+        column : int
+            Column index of the series.
+
+        Returns
+        -------
+        first : int
+            Grid row of the first value (always 0).
+        numpy.ndarray
+            Values of the rows up to the last written one (not a copy).
+
+        """
+        return 0, self.values[: self.n_rows, column]
+
+    def _locate(self, rows, columns):
+        """
+        This method returns the positions of grid rows of series in the flat
+        view of the values and whether the rows have been written.
+        """
+        inside = (rows >= 0) & (rows < self.n_rows)
+        return rows * self.values.shape[1] + columns, inside
+
+    def _allocate(self, row, n_rows):
+        """
+        This method returns the first of n_rows consecutive rows that are
+        about to be written. The array is extended if the rows are outside
+        the allocated range.
+        """
+        if row < 0:
+            self._prepend(-row)
+            row = 0
+        last = row + n_rows
+        if last > self.values.shape[0]:
+            capacity = max(last, 2 * self.values.shape[0], 64)
+            values = np.full((capacity, self.values.shape[1]), np.nan, self.values.dtype)
+            values[: self.n_rows] = self.values[: self.n_rows]
+            self._assign(values)
+        if last > self.n_rows:
+            self.n_rows = last
+        return row
+
+    def _prepend(self, n):
+        """
+        This method moves the start of the grid n steps earlier.
+        """
+        values = np.full(
+            (self.values.shape[0] + n, self.values.shape[1]), np.nan, self.values.dtype
+        )
+        values[n : n + self.n_rows] = self.values[: self.n_rows]
+        self._assign(values)
+        self.n_rows += n
+        self.start = self.start - n * self.step
+
+
+class TrajectoryStore(GridStore):
+    """
+    Storage for series that are defined only in windows of a regular time
+    grid, e.g. the trajectories of EVs during their stays in the clusters.
+
+    The values of all series are kept in a single one-dimensional NumPy
+    array. Each series (column) occupies a segment of the array: the segment
+    starts at the offset of its window on the grid and covers the rows of
+    the window. The memory thus grows with the total length of the windows
+    instead of the number of series times the length of the grid. Values
+    outside the window of a series or with time stamps that do not fit the
+    grid are kept in dictionaries. Missing values are NaN.
+
+    Series can be released when they are not needed anymore. Their column
+    indices are reused by the series added later and their segments are
+    removed by compaction once they make up half of the array.
+    """
+
+    def __init__(self, start=None, step=None, dtype=np.float64):
+        """
+        The store can be anchored to a time grid at initialization or later.
+
+        Parameters
+        ----------
+        start : datetime.datetime, optional
+            Time stamp of the first row of the grid. The default is None.
+        step : datetime.timedelta, optional
+            Time resolution of the grid. The default is None.
+        dtype : numpy.dtype, optional
+            Data type of the stored values. The default is numpy.float64.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        super().__init__(start, step)
+        self._assign(np.empty(0, dtype=dtype))
+        self.size = 0  # Length of the allocated segments
+        self.n_columns = 0
+        self.first = np.zeros(0, dtype=np.int64)  # Grid row of window starts
+        self.length = np.zeros(0, dtype=np.int64)  # Number of rows in windows
+        self.position = np.zeros(0, dtype=np.int64)  # Segment starts in values
+        self.versions = np.zeros(0, dtype=np.int64)
+        self.released = 0  # Length of the segments of released series
+        self.free_columns = []  # Column indices of released series
+
+    def add_columns(self, first, length):
+        """
+        This method appends series with the given windows to the store.
+
+        Parameters
+        ----------
+        first : numpy.ndarray
+            Grid rows of the starts of the windows.
+        length : numpy.ndarray
+            Number of rows in the windows (0 if the values of a series are
+            kept only in dictionaries).
+
+        Returns
+        -------
+        numpy.ndarray
+            Column indices of the new series.
+
+        """
+
+        first = np.asarray(first, dtype=np.int64)
+        length = np.maximum(np.asarray(length, dtype=np.int64), 0)
+        n_new = len(first)
+        columns = np.arange(self.n_columns, self.n_columns + n_new)
+
+        size = self.size + int(length.sum())
+        self._reserve(size)
+
+        n_columns = self.n_columns + n_new
+        self._reserve_columns(n_columns)
+
+        self.first[columns] = first
+        self.length[columns] = length
+        self.position[columns] = self.size + np.cumsum(length) - length
+        self.size = size
+        self.n_columns = n_columns
+        return columns
+
+    def add_column(self, start=None, end=None):
+        """
+        This method appends a series whose window covers the grid rows from
+        start to end (both included). Without a window, the values of the
+        series are kept in a dictionary.
+
+        Parameters
+        ----------
+        start : datetime.datetime, optional
+            First time stamp of the window. The default is None.
+        end : datetime.datetime, optional
+            Last time stamp of the window. The default is None.
+
+        Returns
+        -------
+        column : int
+            Column index of the new series.
+
+        """
+        first = self.offset(start)
+        last = self.offset(end)
+        if first is None or last is None:
+            first, last = 0, -1
+        return self.add_window(first, last - first + 1)
+
+    def add_window(self, first, length):
+        """
+        This method appends a series whose window covers a number of grid
+        rows. The index of a released series is reused if there is one.
+
+        Parameters
+        ----------
+        first : int
+            Grid row of the start of the window.
+        length : int
+            Number of rows in the window.
+
+        Returns
+        -------
+        column : int
+            Column index of the new series.
+
+        """
+        length = max(length, 0)
+
+        if len(self.free_columns) > 0:
+            column = self.free_columns.pop()
+        else:
+            column = self.n_columns
+            self._reserve_columns(column + 1)
+            self.n_columns += 1
+
+        self._reserve(self.size + length)
+        self.first[column] = first
+        self.length[column] = length
+        self.position[column] = self.size
+        self.versions[column] += 1
+        self.size += length
+        return column
+
+    def append_copy(self, store, column):
+        """
+        This method appends a copy of a series of another store with the
+        same time grid. The window of the copy is trimmed to the values
+        stored in the window of the original.
+
+        Parameters
+        ----------
+        store : TrajectoryStore
+            The store containing the series.
+        column : int
+            Column index of the series in store.
+
+        Returns
+        -------
+        int
+            Column index of the copy.
+
+        """
+        first, values = store.window(column)
+        written = np.flatnonzero(~np.isnan(values))
+        lo, hi = (int(written[0]), int(written[-1]) + 1) if len(written) > 0 else (0, 0)
+
+        copy = self.add_window(first + lo, hi - lo)
+        position = self.position[copy]
+        self.values[position : position + hi - lo] = values[lo:hi]
+        if store.outside.get(column):
+            self.outside[copy] = dict(store.outside[column])
+        return copy
+
+    def release(self, column):
+        """
+        This method releases a series. Its values are removed and its column
+        index is reused by the next series added to the store.
+
+        Parameters
+        ----------
+        column : int
+            Column index of the series.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.released += int(self.length[column])
+        self.first[column] = 0
+        self.length[column] = 0
+        self.versions[column] += 1
+        self.outside.pop(column, None)
+        self._series_cache.pop(column, None)
+        self.free_columns.append(int(column))
+
+        if 2 * self.released > self.size:
+            self.compact()
+
+    def compact(self):
+        """
+        This method removes the segments of the released series from the
+        array.
+
+        Returns
+        -------
+        None.
+
+        """
+        live = np.flatnonzero(self.length > 0)
+        length = self.length[live]
+        position = np.cumsum(length) - length
+        size = int(length.sum())
+
+        values = np.full(2 * size, np.nan, dtype=self.values.dtype)
+        gather = np.repeat(self.position[live] - position, length) + np.arange(size)
+        values[:size] = self.values[gather]
+
+        self._assign(values)
+        self.position[live] = position
+        self.size = size
+        self.released = 0
+
+    def _reserve_columns(self, n_columns):
+        """
+        This method extends the arrays of the window parameters to hold at
+        least n_columns series.
+        """
+        if n_columns > len(self.first):
+            capacity = max(n_columns, 2 * len(self.first))
+            for name in ("first", "length", "position", "versions"):
+                array = np.zeros(capacity, dtype=np.int64)
+                array[: self.n_columns] = getattr(self, name)[: self.n_columns]
+                setattr(self, name, array)
+
+    def _reserve(self, size):
+        """
+        This method extends the array to hold at least size values.
+        """
+        if size > len(self.values):
+            capacity = max(size, 2 * len(self.values))
+            values = np.full(capacity, np.nan, dtype=self.values.dtype)
+            values[: self.size] = self.values[: self.size]
+            self._assign(values)
+
+    def _locate(self, rows, columns):
+        """
+        This method returns the positions of grid rows of series in the
+        values array and whether the rows are in the windows of the series.
+        """
+        delta = rows - self.first[columns]
+        inside = (delta >= 0) & (delta < self.length[columns])
+        return self.position[columns] + delta, inside
+
+    def window(self, column):
+        """
+        This method returns the values stored in the window of a series.
+
+        Parameters
+        ----------
+        column : int
+            Column index of the series.
+
+        Returns
+        -------
+        first : int
+            Grid row of the start of the window.
+        numpy.ndarray
+            Values in the window (not a copy).
+
+        """
+        position = self.position[column]
+        return int(self.first[column]), self.values[position : position + self.length[column]]
+
+
+class TimeSeriesView(MutableMapping):
+    """
+    Dictionary-like access to a single series of a TimeSeriesStore or a 
+    TrajectoryStore.
+
+    The view behaves like a dictionary with time stamp keys so that the code
+    written for dictionaries (e.g., ev.soc[ts]) works on the store.
+    """
+
+    def __init__(self, store, column):
+        """
+        Views are defined by the store and the column of the series.
+
+        Parameters
+        ----------
+        store : TimeSeriesStore or TrajectoryStore
+            The store containing the series.
+        column : int
+            Column index of the series.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.store = store
+        self.column = column
+
+    def __getitem__(self, ts):
+        value = self.store.get(ts, self.column)
+        if value != value:
+            raise KeyError(ts)
+        return value
+
+    def __setitem__(self, ts, value):
+        self.store.set(ts, self.column, value)
+
+    def __delitem__(self, ts):
+        if ts not in self:
+            raise KeyError(ts)
+        self.store.delete(ts, self.column)
+
+    def __contains__(self, ts):
+        value = self.store.get(ts, self.column)
+        return value == value
+
+    def __iter__(self):
+        return iter(self.store.keys(self.column))
+
+    def __len__(self):
+        return self.store.count(self.column)
+
+    def to_series(self):
+        """
+        This method returns the series in the form of pandas.Series.
+
+        Returns
+        -------
+        pandas.Series
+            Time indexed series containing only the stored values.
+
+        """
+        return self.store.series(self.column)
@@ -18,12 +18,59 @@
 # COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+import numpy as np
+from datafev.data_handling.power_soc import to_power_soc_table
+from datafev.data_handling.timeseries import TimeSeriesView
+
 
 class ElectricVehicle(object):
     """
     Simulation model of electric vehicles.
+
+    The attributes of the EV objects (including those that are assigned by 
+    the fleet and the routines) are declared in __slots__, so that the 
+    objects carry no instance dictionary. Use ExtendableElectricVehicle to 
+    attach further attributes.
     """
 
+    __slots__ = (
+        # Technical parameters
+        "type",
+        "vehicle_id",
+        "bCapacity",
+        "p_max_ch",
+        "p_max_ds",
+        "_pow_soc_table",
+        "minSoC",
+        "maxSoC",
+        # Trajectories
+        "soc",
+        "v2g",
+        "g2v",
+        "trajectory_index",
+        # Scenario parameters assigned by the fleet
+        "t_res",
+        "t_arr_est",
+        "t_dep_est",
+        "soc_arr_est",
+        "soc_tar_at_t_dep_est",
+        "v2g_allow",
+        "t_arr_real",
+        "soc_arr_real",
+        "t_dep_real",
+        "cluster_target",
+        # Status assigned by the routines
+        "admitted",
+        "reserved",
+        "reservation_id",
+        "reserved_cluster",
+        "reserved_charger",
+        "contract",
+        "connected_cu",
+        "connected_cc",
+        "cc_dataset_id",
+    )
+
     def __init__(
         self,
         carID,
@@ -52,10 +99,11 @@ class ElectricVehicle(object):
             Minimum SOC that EV battery is allowed to reduce to (0<=minsoc<=1).
         maxSoC : float
             Maximum SOC that EV battery is allowed to reach to (0<=maxsoc<=1).
-        pow_soc_table : dataframe
+        pow_soc_table : data_handling.power_soc.PowerSOCTable, optional
             The table that contains the power capability limits of EV batteries
             In practice, power that can be charged/discharged by EV batteries 
-            change.
+            change. Tables given as dataframes or dictionaries are compiled 
+            (see data_handling.power_soc.to_power_soc_table).
 
         Returns
         -------
@@ -76,6 +124,60 @@ class ElectricVehicle(object):
         self.soc = {}
         self.v2g = {}
         self.g2v = {}
+        self.trajectory_index = None
+
+    @property
+    def pow_soc_table(self):
+        """
+        Compiled SOC dependency of the power capability of the EV battery 
+        (None if there is no dependency). Assigned tables are compiled once 
+        so that the routines can look up the power limits directly.
+        """
+        return self._pow_soc_table
+
+    @pow_soc_table.setter
+    def pow_soc_table(self, table):
+        self._pow_soc_table = to_power_soc_table(table)
+
+    def bind_trajectory_store(self, index, soc_store, g2v_store, v2g_store, copy=True):
+        """
+        By default, the SOC, G2V and V2G trajectories of the EV are kept in 
+        dictionaries. This method moves them to the trajectory stores of a 
+        fleet so that the trajectories of all EVs are kept in single arrays.
+        The trajectories remain accessible as dictionary-like views.
+
+        Parameters
+        ----------
+        index : int
+            Column of the EV in the stores.
+        soc_store : TrajectoryStore or TimeSeriesStore
+            Store of SOC trajectories.
+        g2v_store : TrajectoryStore or TimeSeriesStore
+            Store of G2V charge powers.
+        v2g_store : TrajectoryStore or TimeSeriesStore
+            Store of V2G discharge powers.
+        copy : bool, optional
+            Whether the current trajectories are copied to the stores. False
+            if the stores already contain them. The default is True.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        soc = TimeSeriesView(soc_store, index)
+        g2v = TimeSeriesView(g2v_store, index)
+        v2g = TimeSeriesView(v2g_store, index)
+        if copy:
+            soc.update(self.soc)
+            g2v.update(self.g2v)
+            v2g.update(self.v2g)
+
+        self.trajectory_index = index
+        self.soc = soc
+        self.g2v = g2v
+        self.v2g = v2g
 
     def charge(self, ts, tdelta, p_in):
         """
@@ -102,3 +204,136 @@ class ElectricVehicle(object):
         self.soc[ts + tdelta] = self.soc[ts] + p_in * tdelta.seconds / self.bCapacity
         self.v2g[ts] = -p_in if p_in < 0 else 0
         self.g2v[ts] = p_in if p_in > 0 else 0
+
+
+class ExtendableElectricVehicle(ElectricVehicle):
+    """
+    Electric vehicle model with an instance dictionary so that user 
+    extensions can attach attributes that are not declared in 
+    ElectricVehicle.__slots__.
+    """
+
+
+def _store_groups(vehicles):
+    """
+    This function groups the EVs whose trajectories are kept in the same 
+    columnar stores. It returns the groups (lists of positions in vehicles)
+    and the positions of the EVs that are not bound to stores or override 
+    the 'charge' method.
+    """
+
+    groups = {}
+    others = []
+    for n, ev in enumerate(vehicles):
+        if (
+            type(ev).charge is ElectricVehicle.charge
+            and isinstance(ev.soc, TimeSeriesView)
+            and isinstance(ev.g2v, TimeSeriesView)
+            and isinstance(ev.v2g, TimeSeriesView)
+        ):
+            key = (id(ev.soc.store), id(ev.g2v.store), id(ev.v2g.store))
+            groups.setdefault(key, []).append(n)
+        else:
+            others.append(n)
+    return list(groups.values()), others
+
+
+def soc_of_vehicles(ts, vehicles):
+    """
+    This function reads the SOCs of multiple EVs at once. The SOCs of the EVs
+    bound to the same columnar store are read in a single array operation.
+
+    Parameters
+    ----------
+    ts : datetime
+        Current time.
+    vehicles : list of ElectricVehicle
+        EVs whose SOCs are read.
+
+    Returns
+    -------
+    soc : numpy.ndarray
+        SOCs of the EVs.
+
+    """
+
+    soc = np.zeros(len(vehicles))
+    groups, others = _store_groups(vehicles)
+
+    for rows in groups:
+        columns = np.array([vehicles[n].soc.column for n in rows])
+        soc[rows] = vehicles[rows[0]].soc.store.get_many(ts, columns)
+        if np.isnan(soc[rows]).any():
+            raise KeyError(ts)
+
+    for n in others:
+        soc[n] = vehicles[n].soc[ts]
+
+    return soc
+
+
+def charge_vehicles(ts, tdelta, vehicles, p_in):
+    """
+    This function enters the charging data of multiple EVs at once. It is
+    equivalent to calling the 'charge' method of each EV. The trajectories of
+    the EVs bound to the same columnar stores are updated in single array 
+    operations; the others are charged one by one.
+
+    Parameters
+    ----------
+    ts : datetime
+        Current time.
+    tdelta : timedelta
+        Length of time step.
+    vehicles : list of ElectricVehicle
+        EVs to be charged.
+    p_in : numpy.ndarray
+        Charge powers of the EVs (p_in>0 charging, p_in<0 discharging). A
+        two-dimensional array (EVs x time steps) charges the EVs during 
+        consecutive time steps starting from ts.
+
+    Returns
+    -------
+    None.
+
+    """
+
+    p_in = np.asarray(p_in, dtype=float)
+    if p_in.ndim == 1:
+        p_in = p_in[:, None]
+    n_steps = p_in.shape[1]
+
+    # EVs are grouped by the stores that keep their trajectories
+    groups, others = _store_groups(vehicles)
+
+    for n in others:
+        for k in range(n_steps):
+            vehicles[n].charge(ts + k * tdelta, tdelta, p_in[n, k])
+
+    for rows in groups:
+        evs = [vehicles[n] for n in rows]
+        p = p_in[rows].T  # Time steps x EVs
+        soc_store = evs[0].soc.store
+        columns = np.array([ev.soc.column for ev in evs])
+        bcap = np.array([ev.bCapacity for ev in evs], dtype=float)
+
+        soc = soc_store.get_many(ts, columns)
+        if np.isnan(soc).any():
+            raise KeyError(ts)
+
+        # SOCs are accumulated step by step as in the 'charge' method
+        soc = np.cumsum(np.vstack((soc, p * tdelta.seconds / bcap)), axis=0)
+
+        soc_store.set_block(ts + tdelta, columns, soc[1:], tdelta)
+        evs[0].v2g.store.set_block(
+            ts,
+            np.array([ev.v2g.column for ev in evs]),
+            np.where(p < 0, -p, 0.0),
+            tdelta,
+        )
+        evs[0].g2v.store.set_block(
+            ts,
+            np.array([ev.g2v.column for ev in evs]),
+            np.where(p > 0, p, 0.0),
+            tdelta,
+        )
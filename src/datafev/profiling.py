@@ -0,0 +1,330 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Instrumentation of the routines and algorithms of datafev.
+
+The instrumented functions report the execution times of their phases
+(e.g., model building, solving and result extraction), the sizes of the 
+optimization models and the solver statuses into a registry. Profiling is 
+disabled by default, in which case the instrumentation calls do nothing.
+
+Example
+-------
+>>> from datafev import profiling
+>>> profiling.enable()
+>>> ...  # run the simulation
+>>> profiling.to_frame()  # one row per instrumented call
+>>> profiling.to_json("trace.json")  # viewable in chrome://tracing
+"""
+
+import json
+import os
+import threading
+from time import perf_counter
+import pandas as pd
+
+_enabled = False
+_records = []  # Records of the finished calls
+_origin = perf_counter()  # Reference of the time stamps in the records
+
+
+class Timer(object):
+    """
+    Timer of a single call of an instrumented function. 
+    
+    The phases of the call are measured as laps: each lap covers the time 
+    since the previous lap (or the start of the call). The record is added to
+    the registry when the timer is stopped.
+    """
+
+    def __init__(self, name):
+        """
+        Timers are started at initialization.
+
+        Parameters
+        ----------
+        name : str
+            Name of the instrumented function.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.name = name
+        self.info = {}
+        self.phases = []  # (phase name, start, duration)
+        self.start = perf_counter()
+        self._last = self.start
+
+    def lap(self, phase, model=None, result=None, **info):
+        """
+        This method ends a phase of the call.
+
+        Parameters
+        ----------
+        phase : str
+            Name of the phase (e.g., 'build', 'solve', 'extract').
+        model : pyomo model, optional
+            If given, the number of variables and constraints of the model are
+            recorded. The default is None.
+        result : pyomo SolverResults, optional
+            If given, the solver status and termination condition are 
+            recorded. The default is None.
+        **info :
+            Further information to be recorded.
+
+        Returns
+        -------
+        None.
+
+        """
+        now = perf_counter()
+        self.phases.append((phase, self._last, now - self._last))
+        self._last = now
+        if model is not None:
+            self.info.update(model_size(model))
+        if result is not None:
+            self.info.update(solver_status(result))
+        self.info.update(info)
+
+    def stop(self, **info):
+        """
+        This method ends the call and adds its record to the registry.
+
+        Parameters
+        ----------
+        **info :
+            Further information to be recorded.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.info.update(info)
+        _records.append(
+            {
+                "name": self.name,
+                "start": self.start - _origin,
+                "duration": perf_counter() - self.start,
+                "phases": self.phases,
+                "info": self.info,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            }
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.stop()
+        else:
+            self.stop(error=exc_type.__name__)
+        return False
+
+
+class _NullTimer(object):
+    """
+    Timer returned when profiling is disabled. Its methods do nothing.
+    """
+
+    def lap(self, phase, model=None, result=None, **info):
+        pass
+
+    def stop(self, **info):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_null_timer = _NullTimer()
+
+
+def start(name):
+    """
+    This function starts timing a call of an instrumented function. It can be
+    used as a context manager as well.
+
+    Parameters
+    ----------
+    name : str
+        Name of the instrumented function.
+
+    Returns
+    -------
+    Timer
+        The timer of the call (a timer doing nothing if profiling is 
+        disabled).
+
+    """
+    if _enabled:
+        return Timer(name)
+    return _null_timer
+
+
+def enable():
+    """
+    This function enables profiling.
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """
+    This function disables profiling. The records are kept.
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    """
+    This function returns True if profiling is enabled.
+    """
+    return _enabled
+
+
+def reset():
+    """
+    This function deletes the records.
+    """
+    del _records[:]
+
+
+def records():
+    """
+    This function returns the records of the instrumented calls.
+
+    Returns
+    -------
+    list of dict
+        Records with the name of the function, the start and duration of the
+        call (s), the phases as (name, start, duration) tuples and further
+        information (e.g., model size and solver status).
+
+    """
+    return list(_records)
+
+
+def model_size(model):
+    """
+    This function returns the number of active variables and constraints of a
+    pyomo model.
+    """
+    from pyomo.core import Constraint, Var
+
+    return {
+        "variables": sum(1 for _ in model.component_data_objects(Var)),
+        "constraints": sum(
+            1 for _ in model.component_data_objects(Constraint, active=True)
+        ),
+    }
+
+
+def solver_status(result):
+    """
+    This function returns the solver status and termination condition in a
+    pyomo SolverResults object.
+    """
+    return {
+        "status": str(result.solver.status),
+        "termination": str(result.solver.termination_condition),
+    }
+
+
+def to_frame():
+    """
+    This function summarizes the records in a table.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per instrumented call with the start and duration (s) of the
+        call, the duration (s) of each phase and the further information.
+
+    """
+    rows = []
+    for record in _records:
+        row = {
+            "Function": record["name"],
+            "Start (s)": record["start"],
+            "Duration (s)": record["duration"],
+        }
+        for phase, _, duration in record["phases"]:
+            key = phase.capitalize() + " (s)"
+            row[key] = row.get(key, 0.0) + duration
+        row.update(record["info"])
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def to_json(path=None):
+    """
+    This function exports the records in the trace event format, which can be
+    displayed by chrome://tracing or Perfetto.
+
+    Parameters
+    ----------
+    path : str, optional
+        The name of the file to write the trace to. The default is None.
+
+    Returns
+    -------
+    str
+        The trace in JSON format.
+
+    """
+    events = []
+    for record in _records:
+        base = {"ph": "X", "pid": record["pid"], "tid": record["tid"]}
+        events.append(
+            dict(
+                base,
+                name=record["name"],
+                ts=record["start"] * 1e6,
+                dur=record["duration"] * 1e6,
+                args=dict((k, str(v)) for k, v in record["info"].items()),
+            )
+        )
+        for phase, begin, duration in record["phases"]:
+            events.append(
+                dict(
+                    base,
+                    name=record["name"] + "." + phase,
+                    ts=(begin - _origin) * 1e6,
+                    dur=duration * 1e6,
+                )
+            )
+
+    trace = json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(trace)
+    return trace
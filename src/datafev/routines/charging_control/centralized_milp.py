@@ -21,9 +21,19 @@
 
 import pandas as pd
 from datafev.algorithms.multi_cluster.rescheduling_milp import reschedule
-
-
-def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
+from datafev.algorithms.cluster.rescheduling_milp import shift_incumbent
+
+
+def charging_routine(
+    ts,
+    t_delta,
+    horizon,
+    system,
+    solver,
+    penalty_parameters,
+    incumbents=None,
+    relaxation=False,
+):
     """
     This routine is executed periodically during operation of charger clusters.
 
@@ -46,6 +56,14 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
         Optimization solver.
     penalty_parameters : dict
         Cost parameters for capacity violation/devations.
+    incumbents : dict, optional
+        Shifted solutions of the previous call (key: system id). If given, they
+        are used as MIP starts and replaced with the shifted solutions of this
+        call. The default is None.
+    relaxation : bool, optional
+        Whether the LP relaxation of the rescheduling problem should be solved
+        and rounded instead of the MILP (see
+        algorithms.cluster.rescheduling_milp.solve). The default is False.
 
     Returns
     -------
@@ -131,39 +149,37 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
             rho_eps[cc_id] = penalty_parameters["rho_eps"][cc_id]
 
             # Loop through the chargers
-            for cu_id, cu in cluster.chargers.items():
+            for cu_id, cu in cluster.query_connected_chargers(ts).items():
 
                 ev = cu.connected_ev
 
-                if ev != None:
-
-                    # There is an EV connected in this charger
-                    ev_id = ev.vehicle_id
-
-                    # with a schedule of
-                    sch_inst = cu.active_schedule_instance
-                    cu_sch = cu.schedule_soc[sch_inst]
-                    if cu_sch.index.max() < schedule_horizon.min():
-                        cu_sch[schedule_horizon.min()] = cu_sch[cu_sch.index.max()]
-                    cu_sch = cu_sch.reindex(schedule_horizon)
-                    cu_sch = cu_sch.fillna(method="ffill")
-
-                    # parameters defining the charging demand/urgency
-                    bcap[ev_id] = ev.bCapacity
-                    deptime[ev_id] = (ev.t_dep_est - ts) / t_delta
-                    inisoc[ev_id] = ev.soc[ts]
-                    minsoc[ev_id] = ev.minSoC
-                    maxsoc[ev_id] = ev.maxSoC
-                    tarsoc[ev_id] = cu_sch[ts + horizon]
-                    ch_eff[ev_id] = cu.eff
-                    ds_eff[ev_id] = cu.eff
-
-                    # maximum power that can be withdrawn/injected by the connected EV
-                    pmax_pos[ev_id] = min(ev.p_max_ch, cu.p_max_ch)
-                    pmax_neg[ev_id] = min(ev.p_max_ds, cu.p_max_ds)
-
-                    # Parameter indicating the EVs' positions in the multi-cluster system
-                    location[ev_id] = (cc_id, cu_id)
+                # There is an EV connected in this charger
+                ev_id = ev.vehicle_id
+
+                # with a schedule of
+                sch_inst = cu.active_schedule_instance
+                cu_sch = cu.schedule_soc[sch_inst]
+                if cu_sch.index.max() < schedule_horizon.min():
+                    cu_sch[schedule_horizon.min()] = cu_sch[cu_sch.index.max()]
+                cu_sch = cu_sch.reindex(schedule_horizon)
+                cu_sch = cu_sch.fillna(method="ffill")
+
+                # parameters defining the charging demand/urgency
+                bcap[ev_id] = ev.bCapacity
+                deptime[ev_id] = (ev.t_dep_est - ts) / t_delta
+                inisoc[ev_id] = ev.soc[ts]
+                minsoc[ev_id] = ev.minSoC
+                maxsoc[ev_id] = ev.maxSoC
+                tarsoc[ev_id] = cu_sch[ts + horizon]
+                ch_eff[ev_id] = cu.eff
+                ds_eff[ev_id] = cu.eff
+
+                # maximum power that can be withdrawn/injected by the connected EV
+                pmax_pos[ev_id] = min(ev.p_max_ch, cu.p_max_ch)
+                pmax_neg[ev_id] = min(ev.p_max_ds, cu.p_max_ds)
+
+                # Parameter indicating the EVs' positions in the multi-cluster system
+                location[ev_id] = (cc_id, cu_id)
 
     ################################################################################################
 
@@ -173,6 +189,8 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
 
         ################################################################################################
         # Step 2: Solving (MILP-based) rescheduling problem to centrally decide how the chargers will operate now
+        # The shifted solution of the previous step (if any) is the starting point of the solver
+        incumbent = None if incumbents is None else incumbents.get(system.id)
         p_schedule, s_schedule = reschedule(
             solver,
             opt_step,
@@ -196,15 +214,21 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
             cluster_violationlimits,
             rho_y,
             rho_eps,
+            incumbent=incumbent,
+            relaxation=relaxation,
         )
+        if incumbents is not None:
+            incumbents[system.id] = shift_incumbent(p_schedule, s_schedule)
         ################################################################################################
 
         ################################################################################################
         # Step 3: Charging
         for cc_id in system.clusters.keys():
-            for cu_id in system.clusters[cc_id].chargers.keys():
-                cu = system.clusters[cc_id].chargers[cu_id]
-                if cu.connected_ev != None:
-                    ev_id = cu.connected_ev.vehicle_id
-                    cu.supply(ts, t_delta, p_schedule[ev_id][0])
+            for cu_id, cu in system.clusters[cc_id].query_connected_chargers(ts).items():
+                ev_id = cu.connected_ev.vehicle_id
+                cu.supply(ts, t_delta, p_schedule[ev_id][0])
         ################################################################################################
+
+    elif incumbents is not None:
+        # No connected EVs, the solution of the previous step is obsolete
+        incumbents.pop(system.id, None)
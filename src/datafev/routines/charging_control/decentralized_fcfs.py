@@ -18,7 +18,10 @@
 # COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-import pandas as pd
+import numpy as np
+from datafev.algorithms.cluster.prioritization_fcfs import firstcomefirstserve
+from datafev.data_handling.power_soc import p_max_array
+from datafev.data_handling.vehicle import soc_of_vehicles
 
 
 def charging_routine(ts, t_delta, system):
@@ -56,98 +59,40 @@ def charging_routine(ts, t_delta, system):
 
             ################################################################################################
             # Step 1: Identification of charging demand
-            p_ch = {}  # Will contain the charge powers requested by each EV
-            eff = {}  # Will contain the power conversion efficiencies during
-            contime = (
-                {}
-            )  # Will contain the connection time of EVs (from their arrial until now)
-
-            # Loop through the chargers
-            for cu_id, cu in cluster.chargers.items():
-
-                ev = cu.connected_ev
-
-                if ev != None:
-
-                    # There is an EV connected in this charger
-                    ev_id = ev.vehicle_id
-                    ev_soc = ev.soc[ts]
-                    ev_tarsoc = ev.soc_tar_at_t_dep_est
-                    ev_bcap = ev.bCapacity
-
-                    if ev_soc >= ev_tarsoc:
-
-                        # The EV connected here has already reached its target SOC
-                        p_ch[ev_id] = 0.0
-
-                    else:
-
-                        # The EV connected here wants to keep charging
-                        # Calculation of the amount of energy that can be supplied to the EV
-                        lim_ev_batcap = (
-                            1 - ev_soc
-                        ) * ev_bcap  # Limit due to the battery capacity of EV
-                        lim_ch_pow = (
-                            cu.p_max_ch * step
-                        )  # Limit due to the charger power capability
-
-                        if ev.pow_soc_table != None:
-
-                            # The EV battery has a specific charger power-SOC dependency limiting the power transfer
-                            table = ev.pow_soc_table
-                            soc_range = (
-                                table[
-                                    (table["SOC_LB"] <= ev_soc)
-                                    & (ev_soc < table["SOC_UB"])
-                                ]
-                            ).index[0]
-                            p_max = table.loc[soc_range, "P_UB"]
-                            lim_ev_socdep = (
-                                p_max * step
-                            )  # Limit due to the SOC dependency of charge power
-                            e_max = min(lim_ev_batcap, lim_ch_pow, lim_ev_socdep)
-
-                        else:
-
-                            # The power transfer is only limited by the charger's power and battery capacity
-                            e_max = min(lim_ev_batcap, lim_ch_pow)
-
-                        p_ch[ev_id] = (
-                            e_max / step
-                        )  # Average charge power during the simulation step
-
-                    eff[ev_id] = cu.eff  # Charging efficiency
-                    contime[ev_id] = (
-                        ts - ev.t_arr_real
-                    ).seconds  # how long EV has been connected to the charger (seconds)
+            connected = cluster.query_connected_chargers(ts).values()
+            evs = [cu.connected_ev for cu in connected]
+
+            soc = soc_of_vehicles(ts, evs)  # Current SOCs of EVs
+            tarsoc = np.array(
+                [ev.soc_tar_at_t_dep_est for ev in evs]
+            )  # Target SOCs of EVs (for estimated departure time)
+            bcap = np.array([ev.bCapacity for ev in evs])  # Battery capacities
+            p_cu = np.array([cu.p_max_ch for cu in connected])  # Charger ratings
+            eff = np.array([cu.eff for cu in connected])  # Charging efficiencies
+            contime = np.array(
+                [(ts - ev.t_arr_real).seconds for ev in evs]
+            )  # how long EVs have been connected to the chargers (seconds)
+
+            # Calculation of the amount of energy that can be supplied to the EVs
+            lim_ev_batcap = (1 - soc) * bcap  # Limit due to the battery capacity of EV
+            lim_ch_pow = p_cu * step  # Limit due to the charger power capability
+            lim_ev_socdep = (
+                p_max_array([ev.pow_soc_table for ev in evs], soc) * step
+            )  # Limit due to the SOC dependency of charge power
+            e_max = np.minimum(np.minimum(lim_ev_batcap, lim_ch_pow), lim_ev_socdep)
+
+            # Average charge powers requested during the simulation step
+            # (EVs that have already reached their target SOCs do not request power)
+            p_ch = np.where(soc >= tarsoc, 0.0, e_max / step)
             ################################################################################################
 
             ################################################################################################
             # Step 2: Power distribution based on first-come-first-serve algorithm
             upperlimit = cluster.upper_limit[ts]  # Cluster level constraint
-            p_charge = {}  # Will contain the charge power consumed by the EVs
-
-            vehicles_sorted = (pd.Series(contime).sort_values(ascending=False)).index
-            free_margin = upperlimit
-            for ev in vehicles_sorted:
-
-                p_max_to_cu = p_ch[ev] / eff[ev]
-
-                if p_max_to_cu <= free_margin:
-                    p_to_ev = p_max_to_cu * eff[ev]
-                else:
-                    p_to_ev = free_margin * eff[ev]
-
-                free_margin -= p_to_ev / eff[ev]
-
-                p_charge[ev] = p_to_ev
+            p_charge = firstcomefirstserve(p_ch, eff, contime, upperlimit)
             ################################################################################################
 
             ################################################################################################
             # Step 3: Charging
-            for cu_id in system.clusters[cc_id].chargers.keys():
-                cu = system.clusters[cc_id].chargers[cu_id]
-                if cu.connected_ev != None:
-                    ev_id = cu.connected_ev.vehicle_id
-                    cu.supply(ts, t_delta, p_charge[ev_id])
+            cluster.supply_batch(ts, t_delta, p_charge)
             ################################################################################################
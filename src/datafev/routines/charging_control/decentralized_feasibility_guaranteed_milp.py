@@ -20,11 +20,30 @@
 
 
 import pandas as pd
-from datafev.algorithms.cluster.rescheduling_milp import reschedule
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from datafev.algorithms.cluster.rescheduling_milp import (
+    reschedule,
+    Rescheduler,
+    get_solver,
+    shift_incumbent,
+)
 from datafev.algorithms.cluster.potentialEstimationG2V_milp import calculate_G2V_potential
 from datafev.algorithms.cluster.potentialEstimationV2G_milp import calculate_V2G_potential
 
-def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
+def charging_routine(
+    ts,
+    t_delta,
+    horizon,
+    system,
+    solver,
+    penalty_parameters,
+    reschedulers=None,
+    incumbents=None,
+    relaxation=False,
+    executor=None,
+    reschedule_function=None,
+):
     """
     This routine is executed periodically during operation of charger clusters.
 
@@ -46,10 +65,38 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
         Optimization horizon of rescheduling.
     system : data_handling.multi_cluster
         Multi-cluster system object.
-    solver : pyomo SolverFactory object
-        Optimization solver.
+    solver : pyomo SolverFactory object or str
+        Optimization solver or solver name (e.g. "appsi_highs").
     penalty_parameters : dict
         Cost parameters for capacity violation / devations.
+    reschedulers : dict, optional
+        Rescheduler objects of the clusters (key: cluster id). If given, the
+        rescheduling models are built once and reused in the following calls;
+        missing entries are created. The default is None, in which case the
+        model is constructed from scratch in every call.
+    incumbents : dict, optional
+        Shifted solutions of the previous call (key: cluster id). If given, they
+        are used as MIP starts and replaced with the shifted solutions of this
+        call. The default is None.
+    relaxation : bool, optional
+        Whether the LP relaxations of the rescheduling problems should be
+        solved and rounded instead of the MILPs (see
+        algorithms.cluster.rescheduling_milp.solve). The default is False.
+    executor : concurrent.futures.Executor, optional
+        If given, the problems of the clusters are solved concurrently by
+        the executor. Pyomo is not thread-safe, therefore a process-based
+        executor (e.g. concurrent.futures.ProcessPoolExecutor) is required
+        and the solver must be given by name; each worker process builds 
+        its own solver (see algorithms.cluster.rescheduling_milp.get_solver).
+        The results are applied in the order of the clusters. Cannot be 
+        combined with reschedulers. The default is None.
+    reschedule_function : callable, optional
+        Function that solves the rescheduling problem of a cluster with the
+        signature of algorithms.cluster.rescheduling_milp.reschedule, e.g.
+        algorithms.cluster.rescheduling_heuristic.reschedule. The limits
+        are still adjusted with the V2G/G2V potentials calculated by the
+        solver. Cannot be combined with reschedulers. The default is None,
+        in which case the MILP is solved.
 
     Returns
     -------
@@ -57,11 +104,25 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
 
     """
 
+    if reschedule_function is None:
+        reschedule_function = reschedule
+    elif reschedulers is not None:
+        raise ValueError("Reusable models are only available for the MILP")
+
+    if executor is not None:
+        if reschedulers is not None:
+            raise ValueError("Reusable models cannot be solved by an executor")
+        if isinstance(executor, ThreadPoolExecutor):
+            raise ValueError("Pyomo models cannot be solved in threads")
+        if not isinstance(solver, str):
+            raise ValueError("The solver must be given by name with an executor")
+
     schedule_horizon = pd.date_range(start=ts, end=ts + horizon, freq=t_delta)
     opt_horizon = list(range(len(schedule_horizon)))
     opt_step = t_delta.seconds
 
     # Loop through the clusters
+    problems = {}
     for cc_id in system.clusters.keys():
 
         cluster = system.clusters[cc_id]
@@ -98,256 +159,371 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
             maxsoc = {}  # Will contain minimum SOCs allowed by EVs
 
             # Loop through the chargers
-            for cu_id, cu in cluster.chargers.items():
+            for cu_id, cu in cluster.query_connected_chargers(ts).items():
 
                 ev = cu.connected_ev
 
-                if ev != None:
-
-                    # There is an EV connected in this charger
-                    ev_id = ev.vehicle_id
-
-                    # with a schedule of
-                    sch_inst = cu.active_schedule_instance
-                    cu_sch = cu.schedule_soc[sch_inst]
-                    if cu_sch.index.max() < schedule_horizon.min():
-                        cu_sch[schedule_horizon.min()] = cu_sch[cu_sch.index.max()]
-                    cu_sch = cu_sch.reindex(schedule_horizon)
-                    cu_sch = cu_sch.fillna(method="ffill")
-
-                    # parameters defining the charging demand/urgency
-                    bcap[ev_id] = ev.bCapacity
-                    deptime[ev_id] = (ev.t_dep_est - ts) / t_delta
-                    inisoc[ev_id] = ev.soc[ts]
-                    minsoc[ev_id] = ev.minSoC
-                    maxsoc[ev_id] = ev.maxSoC
-                    tarsoc[ev_id] = cu_sch[ts + horizon]
-                    ch_eff[ev_id] = cu.eff
-                    ds_eff[ev_id] = cu.eff
-
-                    # maximum power that can be withdrawn/injected by the connected EV
-                    pmax_pos[ev_id] = min(ev.p_max_ch, cu.p_max_ch)
-                    pmax_neg[ev_id] = min(ev.p_max_ds, cu.p_max_ds)
-
+                # There is an EV connected in this charger
+                ev_id = ev.vehicle_id
+
+                # with a schedule of
+                sch_inst = cu.active_schedule_instance
+                cu_sch = cu.schedule_soc[sch_inst]
+                if cu_sch.index.max() < schedule_horizon.min():
+                    cu_sch[schedule_horizon.min()] = cu_sch[cu_sch.index.max()]
+                cu_sch = cu_sch.reindex(schedule_horizon)
+                cu_sch = cu_sch.fillna(method="ffill")
+
+                # parameters defining the charging demand/urgency
+                bcap[ev_id] = ev.bCapacity
+                deptime[ev_id] = (ev.t_dep_est - ts) / t_delta
+                inisoc[ev_id] = ev.soc[ts]
+                minsoc[ev_id] = ev.minSoC
+                maxsoc[ev_id] = ev.maxSoC
+                tarsoc[ev_id] = cu_sch[ts + horizon]
+                ch_eff[ev_id] = cu.eff
+                ds_eff[ev_id] = cu.eff
+
+                # maximum power that can be withdrawn/injected by the connected EV
+                pmax_pos[ev_id] = min(ev.p_max_ch, cu.p_max_ch)
+                pmax_neg[ev_id] = min(ev.p_max_ds, cu.p_max_ds)
+
+            problems[cc_id] = (
+                solver,
+                opt_step,
+                opt_horizon,
+                upperlimit,
+                lowerlimit,
+                tolerance,
+                bcap,
+                inisoc,
+                tarsoc,
+                minsoc,
+                maxsoc,
+                ch_eff,
+                ds_eff,
+                pmax_pos,
+                pmax_neg,
+                deptime,
+                rho_y,
+                rho_eps,
+            )
             ################################################################################################
+
+        elif incumbents is not None:
+            # No connected EVs, the solution of the previous step is obsolete
+            incumbents.pop(cc_id, None)
+
+    ################################################################################################
+    # Step 2: Solving the rescheduling problems of the clusters
+    # The shifted solution of the previous step (if any) is the starting point of the solver
+    schedules = {}
+    if executor is None:
+        for cc_id, problem in problems.items():
+            incumbent = None if incumbents is None else incumbents.get(cc_id)
+            if reschedulers is None:
+                rescheduler = None
+            else:
+                if cc_id not in reschedulers:
+                    n_slots = len(system.clusters[cc_id].chargers)
+                    reschedulers[cc_id] = Rescheduler(
+                        get_solver(solver), n_slots, relaxation=relaxation
+                    )
+                rescheduler = reschedulers[cc_id]
+            schedules[cc_id] = _reschedule_cluster(
+                *problem,
+                incumbent=incumbent,
+                rescheduler=rescheduler,
+                relaxation=relaxation,
+                reschedule_function=reschedule_function,
+            )
+    else:
+        # The clusters are independent, so their problems are solved concurrently
+        futures = {}
+        for cc_id, problem in problems.items():
+            incumbent = None if incumbents is None else incumbents.get(cc_id)
+            futures[cc_id] = executor.submit(
+                _reschedule_cluster,
+                *problem,
+                incumbent=incumbent,
+                relaxation=relaxation,
+                reschedule_function=reschedule_function,
+            )
+        for cc_id, future in futures.items():
+            schedules[cc_id] = future.result()
+    ################################################################################################
+
+    ################################################################################################
+    # Step 3: Charging
+    for cc_id, (p_schedule, s_schedule) in schedules.items():
+        if incumbents is not None:
+            incumbents[cc_id] = shift_incumbent(p_schedule, s_schedule)
+        for cu_id, cu in system.clusters[cc_id].query_connected_chargers(ts).items():
+            ev_id = cu.connected_ev.vehicle_id
+            cu.supply(ts, t_delta, p_schedule[ev_id][0])
+    ################################################################################################
+
+
+def _reschedule_cluster(
+    solver,
+    opt_step,
+    opt_horizon,
+    upperlimit,
+    lowerlimit,
+    tolerance,
+    bcap,
+    inisoc,
+    tarsoc,
+    minsoc,
+    maxsoc,
+    ch_eff,
+    ds_eff,
+    pmax_pos,
+    pmax_neg,
+    deptime,
+    rho_y,
+    rho_eps,
+    incumbent=None,
+    rescheduler=None,
+    relaxation=False,
+    reschedule_function=reschedule,
+):
+    """
+    This function solves the rescheduling problem of a single cluster. The
+    upper (lower) limit is first adjusted to the V2G (G2V) potential of the
+    connected EVs if it cannot be met.
+
+    Parameters are the same as in algorithms.cluster.rescheduling_milp.reschedule
+    except that the solver can be given by name, a Rescheduler object can
+    be given to reuse its model and the problem can be solved by another
+    reschedule_function with the same signature.
+
+    Returns
+    -------
+    p_schedule : dict
+        Power schedule.
+    s_schedule : dict
+        SOC schedule.
+
+    """
+
+    # Solvers given by name are built once in each (worker) process
+    solver = get_solver(solver)
+
+    # Rescheduling function of the cluster (with or without a reusable model)
+    if rescheduler is None:
+        cluster_reschedule = partial(
+            reschedule_function, solver, relaxation=relaxation
+        )
+    else:
+        cluster_reschedule = rescheduler.reschedule
+
+    upperlimit_was_infeasible=False
+    lowerlimit_was_infeasible=False
+    
+    
+    ################################################################################################
+    #If there is a minimum V2G injection constraint
+    if any(v < 0 for v in upperlimit.values()):
+
+    
+        # Step 2.1: Solving (MILP-based) V2G estimation problem to calculate the minimum net consumption of cluster  
+        p_ref_min, s_ref_min,c_ref_min= calculate_V2G_potential(
+            solver,
+            opt_step,
+            opt_horizon,
+            bcap,
+            inisoc,
+            tarsoc,
+            minsoc,
+            maxsoc,
+            ch_eff,
+            ds_eff,
+            pmax_pos,
+            pmax_neg,
+            deptime,
+        )
+        
+        upperlimit_adjusted={}
+        for t in sorted(c_ref_min.keys()):
+            upperlimit_adjusted[t]=max(c_ref_min[t],upperlimit[t])
             
-            ################################################################################################
-            ################################################################################################
+        if upperlimit_adjusted!=upperlimit:
             
-            upperlimit_was_infeasible=False
-            lowerlimit_was_infeasible=False
+            upperlimit_was_infeasible=True
+        
+        else:
             
+            upperlimit_was_infeasible=False
             
-            ################################################################################################
-            #If there is a minimum V2G injection constraint
-            if any(v < 0 for v in upperlimit.values()):
+    else:
+        
+        upperlimit_was_infeasible=False
+    ################################################################################################   
+        
+    
+    ################################################################################################
+    #If there is a minimum G2V consumption constraint
+    if any(v > 0 for v in lowerlimit.values()):       
+        
+           
+        # Step 2.2: Solving (MILP-based) G2V estimation problem to calculate the maximum net consumption of cluster         
+        p_ref_max, s_ref_max,c_ref_max= calculate_G2V_potential(
+            solver,
+            opt_step,
+            opt_horizon,
+            bcap,
+            inisoc,
+            tarsoc,
+            minsoc,
+            maxsoc,
+            ch_eff,
+            ds_eff,
+            pmax_pos,
+            pmax_neg,
+            deptime,
+        )
         
+        lowerlimit_adjusted={}
+        for t in sorted(c_ref_max.keys()):
+            lowerlimit_adjusted[t]=min(c_ref_max[t],lowerlimit[t])
             
-                # Step 2.1: Solving (MILP-based) V2G estimation problem to calculate the minimum net consumption of cluster  
-                p_ref_min, s_ref_min,c_ref_min= calculate_V2G_potential(
-                    solver,
-                    opt_step,
-                    opt_horizon,
-                    bcap,
-                    inisoc,
-                    tarsoc,
-                    minsoc,
-                    maxsoc,
-                    ch_eff,
-                    ds_eff,
-                    pmax_pos,
-                    pmax_neg,
-                    deptime,
-                )
-                
-                upperlimit_adjusted={}
-                for t in sorted(c_ref_min.keys()):
-                    upperlimit_adjusted[t]=max(c_ref_min[t],upperlimit[t])
-                    
-                if upperlimit_adjusted!=upperlimit:
-                    
-                    upperlimit_was_infeasible=True
-                
-                else:
-                    
-                    upperlimit_was_infeasible=False
-                    
-            else:
-                
-                upperlimit_was_infeasible=False
-            ################################################################################################   
-                
             
-            ################################################################################################
-            #If there is a minimum G2V consumption constraint
-            if any(v > 0 for v in lowerlimit.values()):       
-                
-                   
-                # Step 2.2: Solving (MILP-based) G2V estimation problem to calculate the maximum net consumption of cluster         
-                p_ref_max, s_ref_max,c_ref_max= calculate_G2V_potential(
-                    solver,
-                    opt_step,
-                    opt_horizon,
-                    bcap,
-                    inisoc,
-                    tarsoc,
-                    minsoc,
-                    maxsoc,
-                    ch_eff,
-                    ds_eff,
-                    pmax_pos,
-                    pmax_neg,
-                    deptime,
-                )
-                
-                lowerlimit_adjusted={}
-                for t in sorted(c_ref_max.keys()):
-                    lowerlimit_adjusted[t]=min(c_ref_max[t],lowerlimit[t])
-                    
-                    
-                if lowerlimit_adjusted!=lowerlimit:
-                    
-                    lowerlimit_was_infeasible=True
-                
-                else:
-                    
-                    lowerlimit_was_infeasible=False
-                
-            else:
-                
-                lowerlimit_was_infeasible=False    
-            ################################################################################################
+        if lowerlimit_adjusted!=lowerlimit:
             
-            ################################################################################################
-            ################################################################################################
+            lowerlimit_was_infeasible=True
+        
+        else:
             
+            lowerlimit_was_infeasible=False
+        
+    else:
+        
+        lowerlimit_was_infeasible=False    
+    ################################################################################################
+    
+    ################################################################################################
+    ################################################################################################
+    
 
-            ################################################################################################
-            # Step 3: Solving (MILP-based) rescheduling problem to optimize the power distribution in cluster 
-            #if V2G potential is sufficient
-            #if G2V potential is sufficient
-            #Otherwise consider the V2G maximizing schedules
-            
-            if lowerlimit_was_infeasible and upperlimit_was_infeasible:
-                
-                if all(lowerlimit_adjusted[t] <= upperlimit_adjusted[t] for t in upperlimit_adjusted):
-                
-
-                    p_schedule, s_schedule = reschedule(
-                        solver,
-                        opt_step,
-                        opt_horizon,
-                        upperlimit_adjusted,
-                        lowerlimit_adjusted,
-                        tolerance,
-                        bcap,
-                        inisoc,
-                        tarsoc,
-                        minsoc,
-                        maxsoc,
-                        ch_eff,
-                        ds_eff,
-                        pmax_pos,
-                        pmax_neg,
-                        deptime,
-                        rho_y,
-                        rho_eps,
-                    )
-                    
-                else:
-                    
-                    raise ValueError('Some elements of adjusted lower limit are larger or equal to those of adjusted upper limit')
-                    
-            elif upperlimit_was_infeasible:
-                 
-                if upperlimit_adjusted==c_ref_min:
-                    
-                    p_schedule=p_ref_min
-                    
-                else:
-                    
-                    p_schedule, s_schedule = reschedule(
-                        solver,
-                        opt_step,
-                        opt_horizon,
-                        upperlimit_adjusted,
-                        lowerlimit,
-                        tolerance,
-                        bcap,
-                        inisoc,
-                        tarsoc,
-                        minsoc,
-                        maxsoc,
-                        ch_eff,
-                        ds_eff,
-                        pmax_pos,
-                        pmax_neg,
-                        deptime,
-                        rho_y,
-                        rho_eps,
-                    )
-                    
-                    
-            elif lowerlimit_was_infeasible:
-                 
-                if lowerlimit_adjusted==c_ref_max:
-                    
-                    p_schedule=p_ref_max
-                    
-                else:
-                    
-                    p_schedule, s_schedule = reschedule(
-                        solver,
-                        opt_step,
-                        opt_horizon,
-                        upperlimit,
-                        lowerlimit_adjusted,
-                        tolerance,
-                        bcap,
-                        inisoc,
-                        tarsoc,
-                        minsoc,
-                        maxsoc,
-                        ch_eff,
-                        ds_eff,
-                        pmax_pos,
-                        pmax_neg,
-                        deptime,
-                        rho_y,
-                        rho_eps,
-                    ) 
-                    
-            else:
-                              
-                p_schedule, s_schedule = reschedule(
-                    solver,
-                    opt_step,
-                    opt_horizon,
-                    upperlimit,
-                    lowerlimit,
-                    tolerance,
-                    bcap,
-                    inisoc,
-                    tarsoc,
-                    minsoc,
-                    maxsoc,
-                    ch_eff,
-                    ds_eff,
-                    pmax_pos,
-                    pmax_neg,
-                    deptime,
-                    rho_y,
-                    rho_eps,
-                )                          
-                    
-                
-            ################################################################################################
+    ################################################################################################
+    # Step 3: Solving (MILP-based) rescheduling problem to optimize the power distribution in cluster 
+    #if V2G potential is sufficient
+    #if G2V potential is sufficient
+    #Otherwise consider the V2G maximizing schedules
 
-            ################################################################################################
-            # Step 3: Charging
-            for cu_id in system.clusters[cc_id].chargers.keys():
-                cu = system.clusters[cc_id].chargers[cu_id]
-                if cu.connected_ev != None:
-                    ev_id = cu.connected_ev.vehicle_id
-                    cu.supply(ts, t_delta, p_schedule[ev_id][0])
-            ################################################################################################
+    if lowerlimit_was_infeasible and upperlimit_was_infeasible:
+        
+        if all(lowerlimit_adjusted[t] <= upperlimit_adjusted[t] for t in upperlimit_adjusted):
+        
+
+            p_schedule, s_schedule = cluster_reschedule(
+                opt_step,
+                opt_horizon,
+                upperlimit_adjusted,
+                lowerlimit_adjusted,
+                tolerance,
+                bcap,
+                inisoc,
+                tarsoc,
+                minsoc,
+                maxsoc,
+                ch_eff,
+                ds_eff,
+                pmax_pos,
+                pmax_neg,
+                deptime,
+                rho_y,
+                rho_eps,
+                incumbent=incumbent,
+            )
+            
+        else:
+            
+            raise ValueError('Some elements of adjusted lower limit are larger or equal to those of adjusted upper limit')
+            
+    elif upperlimit_was_infeasible:
+         
+        if upperlimit_adjusted==c_ref_min:
+            
+            p_schedule=p_ref_min
+            s_schedule=s_ref_min
+            
+        else:
+            
+            p_schedule, s_schedule = cluster_reschedule(
+                opt_step,
+                opt_horizon,
+                upperlimit_adjusted,
+                lowerlimit,
+                tolerance,
+                bcap,
+                inisoc,
+                tarsoc,
+                minsoc,
+                maxsoc,
+                ch_eff,
+                ds_eff,
+                pmax_pos,
+                pmax_neg,
+                deptime,
+                rho_y,
+                rho_eps,
+                incumbent=incumbent,
+            )
+            
+            
+    elif lowerlimit_was_infeasible:
+         
+        if lowerlimit_adjusted==c_ref_max:
+            
+            p_schedule=p_ref_max
+            s_schedule=s_ref_max
+            
+        else:
+            
+            p_schedule, s_schedule = cluster_reschedule(
+                opt_step,
+                opt_horizon,
+                upperlimit,
+                lowerlimit_adjusted,
+                tolerance,
+                bcap,
+                inisoc,
+                tarsoc,
+                minsoc,
+                maxsoc,
+                ch_eff,
+                ds_eff,
+                pmax_pos,
+                pmax_neg,
+                deptime,
+                rho_y,
+                rho_eps,
+                incumbent=incumbent,
+            ) 
+            
+    else:
+                      
+        p_schedule, s_schedule = cluster_reschedule(
+            opt_step,
+            opt_horizon,
+            upperlimit,
+            lowerlimit,
+            tolerance,
+            bcap,
+            inisoc,
+            tarsoc,
+            minsoc,
+            maxsoc,
+            ch_eff,
+            ds_eff,
+            pmax_pos,
+            pmax_neg,
+            deptime,
+            rho_y,
+            rho_eps,
+            incumbent=incumbent,
+        )
+
+    return p_schedule, s_schedule
@@ -20,10 +20,28 @@
 
 
 import pandas as pd
-from datafev.algorithms.cluster.rescheduling_milp import reschedule
-
-
-def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
+from concurrent.futures import ThreadPoolExecutor
+from datafev.algorithms.cluster.rescheduling_milp import (
+    reschedule,
+    Rescheduler,
+    get_solver,
+    shift_incumbent,
+)
+
+
+def charging_routine(
+    ts,
+    t_delta,
+    horizon,
+    system,
+    solver,
+    penalty_parameters,
+    reschedulers=None,
+    incumbents=None,
+    relaxation=False,
+    executor=None,
+    reschedule_function=None,
+):
     """
     This routine is executed periodically during operation of charger clusters.
 
@@ -41,10 +59,37 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
         Optimization horizon of rescheduling.
     system : data_handling.multi_cluster
         Multi-cluster system object.
-    solver : pyomo SolverFactory object
-        Optimization solver.
+    solver : pyomo SolverFactory object or str
+        Optimization solver or solver name (e.g. "appsi_highs").
     penalty_parameters : dict
         Cost parameters for capacity violation / devations.
+    reschedulers : dict, optional
+        Rescheduler objects of the clusters (key: cluster id). If given, the
+        rescheduling models are built once and reused in the following calls;
+        missing entries are created. The default is None, in which case the
+        model is constructed from scratch in every call.
+    incumbents : dict, optional
+        Shifted solutions of the previous call (key: cluster id). If given, they
+        are used as MIP starts and replaced with the shifted solutions of this
+        call. The default is None.
+    relaxation : bool, optional
+        Whether the LP relaxations of the rescheduling problems should be
+        solved and rounded instead of the MILPs (see
+        algorithms.cluster.rescheduling_milp.solve). The default is False.
+    executor : concurrent.futures.Executor, optional
+        If given, the problems of the clusters are solved concurrently by
+        the executor. Pyomo is not thread-safe, therefore a process-based
+        executor (e.g. concurrent.futures.ProcessPoolExecutor) is required
+        and the solver must be given by name; each worker process builds 
+        its own solver (see algorithms.cluster.rescheduling_milp.get_solver).
+        The results are applied in the order of the clusters. Cannot be 
+        combined with reschedulers. The default is None.
+    reschedule_function : callable, optional
+        Function that solves the rescheduling problem of a cluster with the
+        signature of algorithms.cluster.rescheduling_milp.reschedule, e.g.
+        algorithms.cluster.rescheduling_heuristic.reschedule. Cannot be
+        combined with reschedulers. The default is None, in which case the
+        MILP is solved.
 
     Returns
     -------
@@ -52,11 +97,25 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
 
     """
 
+    if reschedule_function is None:
+        reschedule_function = reschedule
+    elif reschedulers is not None:
+        raise ValueError("Reusable models are only available for the MILP")
+
+    if executor is not None:
+        if reschedulers is not None:
+            raise ValueError("Reusable models cannot be solved by an executor")
+        if isinstance(executor, ThreadPoolExecutor):
+            raise ValueError("Pyomo models cannot be solved in threads")
+        if not isinstance(solver, str):
+            raise ValueError("The solver must be given by name with an executor")
+
     schedule_horizon = pd.date_range(start=ts, end=ts + horizon, freq=t_delta)
     opt_horizon = list(range(len(schedule_horizon)))
     opt_step = t_delta.seconds
 
     # Loop through the clusters
+    problems = {}
     for cc_id in system.clusters.keys():
 
         cluster = system.clusters[cc_id]
@@ -105,43 +164,36 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
             maxsoc = {}  # Will contain minimum SOCs allowed by EVs
 
             # Loop through the chargers
-            for cu_id, cu in cluster.chargers.items():
+            for cu_id, cu in cluster.query_connected_chargers(ts).items():
 
                 ev = cu.connected_ev
 
-                if ev != None:
-
-                    # There is an EV connected in this charger
-                    ev_id = ev.vehicle_id
-
-                    # with a schedule of
-                    sch_inst = cu.active_schedule_instance
-                    cu_sch = cu.schedule_soc[sch_inst]
-                    if cu_sch.index.max() < schedule_horizon.min():
-                        cu_sch[schedule_horizon.min()] = cu_sch[cu_sch.index.max()]
-                    cu_sch = cu_sch.reindex(schedule_horizon)
-                    cu_sch = cu_sch.fillna(method="ffill")
-
-                    # parameters defining the charging demand/urgency
-                    bcap[ev_id] = ev.bCapacity
-                    deptime[ev_id] = (ev.t_dep_est - ts) / t_delta
-                    inisoc[ev_id] = ev.soc[ts]
-                    minsoc[ev_id] = ev.minSoC
-                    maxsoc[ev_id] = ev.maxSoC
-                    tarsoc[ev_id] = cu_sch[ts + horizon]
-                    ch_eff[ev_id] = cu.eff
-                    ds_eff[ev_id] = cu.eff
-
-                    # maximum power that can be withdrawn/injected by the connected EV
-                    pmax_pos[ev_id] = min(ev.p_max_ch, cu.p_max_ch)
-                    pmax_neg[ev_id] = min(ev.p_max_ds, cu.p_max_ds)
-
-            ################################################################################################
-
-            ################################################################################################
-            # Step 2: Solving (MILP-based) rescheduling problem to optimize the power distribution in cluster
-            p_schedule, s_schedule = reschedule(
-                solver,
+                # There is an EV connected in this charger
+                ev_id = ev.vehicle_id
+
+                # with a schedule of
+                sch_inst = cu.active_schedule_instance
+                cu_sch = cu.schedule_soc[sch_inst]
+                if cu_sch.index.max() < schedule_horizon.min():
+                    cu_sch[schedule_horizon.min()] = cu_sch[cu_sch.index.max()]
+                cu_sch = cu_sch.reindex(schedule_horizon)
+                cu_sch = cu_sch.fillna(method="ffill")
+
+                # parameters defining the charging demand/urgency
+                bcap[ev_id] = ev.bCapacity
+                deptime[ev_id] = (ev.t_dep_est - ts) / t_delta
+                inisoc[ev_id] = ev.soc[ts]
+                minsoc[ev_id] = ev.minSoC
+                maxsoc[ev_id] = ev.maxSoC
+                tarsoc[ev_id] = cu_sch[ts + horizon]
+                ch_eff[ev_id] = cu.eff
+                ds_eff[ev_id] = cu.eff
+
+                # maximum power that can be withdrawn/injected by the connected EV
+                pmax_pos[ev_id] = min(ev.p_max_ch, cu.p_max_ch)
+                pmax_neg[ev_id] = min(ev.p_max_ds, cu.p_max_ds)
+
+            problems[cc_id] = (
                 opt_step,
                 opt_horizon,
                 upperlimit,
@@ -162,11 +214,68 @@ def charging_routine(ts, t_delta, horizon, system, solver, penalty_parameters):
             )
             ################################################################################################
 
-            ################################################################################################
-            # Step 3: Charging
-            for cu_id in system.clusters[cc_id].chargers.keys():
-                cu = system.clusters[cc_id].chargers[cu_id]
-                if cu.connected_ev != None:
-                    ev_id = cu.connected_ev.vehicle_id
-                    cu.supply(ts, t_delta, p_schedule[ev_id][0])
-            ################################################################################################
+        elif incumbents is not None:
+            # No connected EVs, the solution of the previous step is obsolete
+            incumbents.pop(cc_id, None)
+
+    ################################################################################################
+    # Step 2: Solving (MILP-based) rescheduling problems to optimize the power distribution in clusters
+    # The shifted solution of the previous step (if any) is the starting point of the solver
+    schedules = {}
+    if executor is None:
+        for cc_id, problem in problems.items():
+            incumbent = None if incumbents is None else incumbents.get(cc_id)
+            if reschedulers is None:
+                schedules[cc_id] = reschedule_function(
+                    get_solver(solver),
+                    *problem,
+                    incumbent=incumbent,
+                    relaxation=relaxation,
+                )
+            else:
+                if cc_id not in reschedulers:
+                    n_slots = len(system.clusters[cc_id].chargers)
+                    reschedulers[cc_id] = Rescheduler(
+                        get_solver(solver), n_slots, relaxation=relaxation
+                    )
+                schedules[cc_id] = reschedulers[cc_id].reschedule(
+                    *problem, incumbent=incumbent
+                )
+    else:
+        # The clusters are independent, so their problems are solved concurrently
+        futures = {}
+        for cc_id, problem in problems.items():
+            incumbent = None if incumbents is None else incumbents.get(cc_id)
+            futures[cc_id] = executor.submit(
+                _reschedule_in_worker,
+                solver,
+                *problem,
+                incumbent=incumbent,
+                relaxation=relaxation,
+                reschedule_function=reschedule_function,
+            )
+        for cc_id, future in futures.items():
+            schedules[cc_id] = future.result()
+    ################################################################################################
+
+    ################################################################################################
+    # Step 3: Charging
+    for cc_id, (p_schedule, s_schedule) in schedules.items():
+        if incumbents is not None:
+            incumbents[cc_id] = shift_incumbent(p_schedule, s_schedule)
+        for cu_id, cu in system.clusters[cc_id].query_connected_chargers(ts).items():
+            ev_id = cu.connected_ev.vehicle_id
+            cu.supply(ts, t_delta, p_schedule[ev_id][0])
+    ################################################################################################
+
+
+def _reschedule_in_worker(
+    solver, *problem, incumbent=None, relaxation=False, reschedule_function=reschedule
+):
+    """
+    This function solves the rescheduling problem of a cluster in a worker
+    process of an executor with the solver of the process.
+    """
+    return reschedule_function(
+        get_solver(solver), *problem, incumbent=incumbent, relaxation=relaxation
+    )
@@ -98,7 +98,7 @@ def arrival_routine(ts, tdelta, fleet):
                     )
 
                     # Old reservation will be removed
-                    reserved_charger.unreserve(ts, old_reservation_id)
+                    reserved_cluster.unreserve(ts, old_reservation_id)
 
                     ev.admitted = True
 
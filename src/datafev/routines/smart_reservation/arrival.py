@@ -68,7 +68,6 @@ def arrival_routine(ts, tdelta, fleet):
 
                 # The reserved charger is occupied by another EV
                 old_reservation_id = ev.reservation_id
-                old_reservation = reserved_cluster.re_dataset.loc[old_reservation_id]
 
                 # Look for another available charger with same characteristics (identical)
                 available_cus = reserved_cluster.query_availability(
@@ -98,10 +97,18 @@ def arrival_routine(ts, tdelta, fleet):
                     ]
 
                     # The conditions of old reservations will be aimed in the new reservation
-                    old_reservation_time = old_reservation["Reserved At"]
-                    old_reservation_scheduled_g2v = old_reservation["Scheduled G2V"]
-                    old_reservation_scheduled_v2g = old_reservation["Scheduled V2G"]
-                    old_reservation_price = old_reservation["Price"]
+                    old_reservation_time = reserved_cluster.re_log.get(
+                        old_reservation_id, "Reserved At"
+                    )
+                    old_reservation_scheduled_g2v = reserved_cluster.re_log.get(
+                        old_reservation_id, "Scheduled G2V"
+                    )
+                    old_reservation_scheduled_v2g = reserved_cluster.re_log.get(
+                        old_reservation_id, "Scheduled V2G"
+                    )
+                    old_reservation_price = reserved_cluster.re_log.get(
+                        old_reservation_id, "Price"
+                    )
                     old_reservation_p_schedule = reserved_charger.schedule_pow[
                         old_reservation_time
                     ]
@@ -115,15 +122,19 @@ def arrival_routine(ts, tdelta, fleet):
                     )
 
                     # Add the smart reservation details
-                    reserved_cluster.re_dataset.loc[
-                        ev.reservation_id, "Scheduled G2V"
-                    ] = old_reservation_scheduled_g2v
-                    reserved_cluster.re_dataset.loc[
-                        ev.reservation_id, "Scheduled V2G"
-                    ] = old_reservation_scheduled_v2g
-                    reserved_cluster.re_dataset.loc[
-                        ev.reservation_id, "Price V2G"
-                    ] = old_reservation_price
+                    reserved_cluster.re_log.set(
+                        ev.reservation_id, "Scheduled G2V", old_reservation_scheduled_g2v
+                    )
+                    reserved_cluster.re_log.set(
+                        ev.reservation_id, "Scheduled V2G", old_reservation_scheduled_v2g
+                    )
+                    reserved_cluster.re_log.set(
+                        ev.reservation_id, "Price", old_reservation_price
+                    )
+                    # Deprecated: the price was written to "Price V2G" before
+                    reserved_cluster.re_log.set(
+                        ev.reservation_id, "Price V2G", old_reservation_price
+                    )
 
                     # Enter the data of the EV to the connection dataset of the cluster
                     new_reserved_charger.connect(ts, ev)
@@ -137,7 +148,7 @@ def arrival_routine(ts, tdelta, fleet):
                     )
 
                     # Old reservation will be removed
-                    reserved_charger.unreserve(ts, old_reservation_id)
+                    reserved_cluster.unreserve(ts, old_reservation_id)
 
                     ev.admitted = True
 
@@ -20,7 +20,8 @@
 
 
 import pandas as pd
-from datafev.algorithms.cluster.pricing_rule import idp
+import numpy as np
+from datafev.algorithms.cluster.pricing_rule import idp_array
 from datafev.algorithms.vehicle.routing_milp import smart_routing
 
 
@@ -72,6 +73,9 @@ def reservation_routine(
 
     reserving_vehicles = fleet.reserving_vehicles_at(ts)
 
+    # Price signals of the clusters (see cluster_price_signals)
+    price_signals = {}
+
     for ev in reserving_vehicles:
         
         #print(ev.vehicle_id)
@@ -133,14 +137,24 @@ def reservation_routine(
             v2g_dps = {}
             arrtime_min = ev.t_arr_est + candidate_chargers["arrtime"].min() * tdelta
             deptime_max = ev.t_arr_est + candidate_chargers["deptime"].max() * tdelta
+
+            # The offers of the chargers in a cluster share the same price signal
+            cc_signals = cluster_price_signals(
+                system,
+                [system.clusters[cc_id] for cc_id in candidate_chargers["cluster"].unique()],
+                arrtime_min,
+                deptime_max,
+                tdelta,
+                f_discount,
+                f_markup,
+                arbitrage_coeff,
+                price_signals,
+            )
+
             for cu_id in candidate_chargers.index:
 
                 cc_id = candidate_chargers.loc[cu_id, "cluster"]
-                cc = system.clusters[cc_id]
-                cc_power_ub = dict(enumerate(cc.upper_limit[arrtime_min:deptime_max].values))
-                cc_power_lb = dict(enumerate(cc.lower_limit[arrtime_min:deptime_max].values))
-                cc_schedule = dict(enumerate((cc.query_actual_schedule(arrtime_min, deptime_max, tdelta)).values))
-                tou_tariff = dict(enumerate((system.tou_price.loc[arrtime_min:deptime_max]).values))
+                cc_power_ub, cc_schedule, dlp, dlp_v2g = cc_signals[cc_id]
                            
                 # Step 2.2.1: Estimate the clusters' margins for additional charging load
                 delta_soc=0.0
@@ -154,17 +168,9 @@ def reservation_routine(
                                                             candidate_chargers.loc[cu_id,"arrsoc"]+delta_soc)
 
                 
-                #Step 2.2.2 Execute dynamic pricing algorithm
-                dlp = idp(
-                    cc_schedule,
-                    cc_power_ub,
-                    cc_power_lb,
-                    tou_tariff,
-                    f_discount,
-                    f_markup,
-                )
+                #Step 2.2.2 Dynamic prices offered by the cluster
                 g2v_dps[cu_id] = dlp
-                v2g_dps[cu_id] = dict([(k, dlp[k] * (1 - arbitrage_coeff)) for k in sorted(dlp.keys())])
+                v2g_dps[cu_id] = dlp_v2g
                 
              
             ############################################################################
@@ -258,4 +264,94 @@ def reservation_routine(
         ############################################################################
         ############################################################################
         ############################################################################
-        # End reservation protcol
\ No newline at end of file
+        # End reservation protcol
+
+
+def cluster_price_signals(
+    system, clusters, start, end, tdelta, f_discount, f_markup, arbitrage_coeff, cache
+):
+    """
+    This function retrieves the power limits and the actual schedules of 
+    clusters in a period and executes the dynamic pricing algorithm for the 
+    period. The price signals of the clusters are calculated in one call of 
+    idp_array.
+    
+    The results are memoized in a cache for each cluster. They are reused 
+    as long as the period is the same and the schedules and reservations of 
+    the cluster have not changed (i.e., the schedule version of the cluster
+    is unchanged).
+
+    Parameters
+    ----------
+    system : data_handling.multi_cluster
+        Multi-cluster system object.
+    clusters : list of data_handling.cluster
+        Charger cluster objects.
+    start : datetime
+        Start of the period.
+    end : datetime
+        End of the period.
+    tdelta : timedelta
+        Resolution of scheduling.
+    f_discount : float
+        Discount factor in dynamic pricing.
+    f_markup : float
+        Markup factor in dynamic pricing.
+    arbitrage_coeff : float
+        Arbitrage coefficient to distinguish G2V/V2G prices.
+    cache : dict
+        Memoized price signals (key: cluster id).
+
+    Returns
+    -------
+    signals : dict
+        Price signals of the clusters. Keys are the cluster ids, values are
+        tuples of
+            - upper limit of the power consumption of the cluster (kW),
+            - actual schedule of the cluster (kW),
+            - dynamic G2V price,
+            - dynamic V2G price
+        given as dicts with time step keys.
+
+    """
+
+    signals = {}
+
+    # Inputs of the clusters whose price signals are not memoized, grouped
+    # by the number of time steps so that they can be stacked
+    inputs = {}
+    for cc in clusters:
+        key = (start, end, tdelta, cc.schedule_version)
+        if cc.id in cache and cache[cc.id][0] == key:
+            signals[cc.id] = cache[cc.id][1]
+        else:
+            ub = cc.upper_limit[start:end].values
+            lb = cc.lower_limit[start:end].values
+            sc = cc.query_actual_schedule(start, end, tdelta).values
+            inputs.setdefault(len(ub), []).append((cc, key, ub, lb, sc))
+
+    tou_tariff = system.tou_price.loc[start:end].values
+
+    for group in inputs.values():
+        n_cc = len(group)
+        dlp = idp_array(
+            np.vstack([sc for (cc, key, ub, lb, sc) in group]),
+            np.vstack([ub for (cc, key, ub, lb, sc) in group]),
+            np.vstack([lb for (cc, key, ub, lb, sc) in group]),
+            np.tile(tou_tariff, (n_cc, 1)),
+            f_discount,
+            f_markup,
+        )
+        dlp_v2g = dlp * (1 - arbitrage_coeff)
+
+        for n, (cc, key, ub, lb, sc) in enumerate(group):
+            signal = (
+                dict(enumerate(ub)),
+                dict(enumerate(sc)),
+                dict(enumerate(dlp[n].tolist())),
+                dict(enumerate(dlp_v2g[n].tolist())),
+            )
+            cache[cc.id] = (key, signal)
+            signals[cc.id] = signal
+
+    return signals
@@ -0,0 +1,464 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+from bisect import bisect_right
+from time import perf_counter
+import pickle
+import random
+import numpy as np
+import pandas as pd
+from datafev import profiling
+
+
+def event_steps(sim_horizon, fleet):
+    """
+    This function identifies the time steps at which the EVs of a fleet
+    place reservation requests, arrive in or leave the charger clusters.
+
+    Parameters
+    ----------
+    sim_horizon : list
+        Time steps in the simulation horizon.
+    fleet : data_handling.fleet.EVFleet
+        EV fleet object.
+
+    Returns
+    -------
+    list of int
+        Sorted positions of the event instants in sim_horizon.
+
+    """
+
+    return [
+        n
+        for n, ts in enumerate(sim_horizon)
+        if len(fleet.reserving_at.get(ts, ())) > 0
+        or len(fleet.incoming_at.get(ts, ())) > 0
+        or len(fleet.outgoing_at.get(ts, ())) > 0
+    ]
+
+
+def simulate_event_driven(
+    sim_horizon, sim_step, system, fleet, routines, charging=None
+):
+    """
+    This function runs the dynamic simulation of a multi-cluster system by 
+    jumping between the event and control instants instead of visiting every
+    time step of the simulation horizon.
+
+    The routines (e.g., departure, reservation and arrival routines) are 
+    executed only at the time steps where the fleet has events. The charging
+    routine is executed at the event instants and at the time steps with 
+    connected EVs. Time steps without events and without connected EVs are 
+    skipped since none of the routines changes the system in these steps. If
+    no charging routine is given, the EVs are charged uncontrolled and the 
+    intervals between consecutive events are simulated in closed form.
+
+    Parameters
+    ----------
+    sim_horizon : list
+        Time steps in the simulation horizon.
+    sim_step : datetime.timedelta
+        Time resolution of the simulation.
+    system : data_handling.multi_cluster.MultiClusterSystem
+        Multi-cluster system object.
+    fleet : data_handling.fleet.EVFleet
+        EV fleet object.
+    routines : list
+        Routines that handle the fleet events. Each routine is called with 
+        the current time as the only argument (bind the other arguments with
+        functools.partial) in the given order.
+    charging : callable, optional
+        Charging routine called with the current time as the only argument.
+        The default is None (uncontrolled charging).
+
+    Returns
+    -------
+    int
+        Number of time steps at which the routines were executed.
+
+    """
+
+    stages = [
+        Stage(getattr(routine, "__name__", "routine"), routine, events_only=True)
+        for routine in routines
+    ]
+    if charging is not None:
+        stages.append(Stage("charging", charging))
+    else:
+        stages.append(
+            Stage("charging", system.uncontrolled_supply, sim_step, multi_step=True)
+        )
+
+    simulation = Simulation(system, fleet, sim_horizon, sim_step, stages)
+    return simulation.run(event_driven=True)
+
+
+class Stage(object):
+    """
+    A routine that is executed at the time steps of a simulation. 
+    
+    The routine is called with the current time followed by the positional 
+    and keyword arguments given at initialization, e.g., 
+    Stage("arrival", arrival_routine, sim_step, fleet, system) calls 
+    arrival_routine(ts, sim_step, fleet, system).
+    """
+
+    def __init__(
+        self, name, routine, *args, events_only=False, multi_step=False, **kwargs
+    ):
+        """
+        Stages are initialized by the routine and its arguments.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage (used in the timing records).
+        routine : callable
+            The routine executed in the stage.
+        *args : 
+            Positional arguments of the routine following the current time.
+        events_only : bool, optional
+            If True, the stage only handles fleet events (e.g., arrivals) and
+            is skipped at the time steps without events in event-driven 
+            simulations. The default is False.
+        multi_step : bool, optional
+            If True, the routine accepts an 'n_steps' keyword argument and 
+            simulates that many consecutive time steps without events at 
+            once. The default is False.
+        **kwargs : 
+            Keyword arguments of the routine.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.name = name
+        self.routine = routine
+        self.args = args
+        self.kwargs = kwargs
+        self.events_only = events_only
+        self.multi_step = multi_step
+
+    def __call__(self, ts, n_steps=1):
+        if self.multi_step:
+            return self.routine(ts, *self.args, n_steps=n_steps, **self.kwargs)
+        return self.routine(ts, *self.args, **self.kwargs)
+
+
+class Simulation(object):
+    """
+    Dynamic simulation of a multi-cluster system serving an EV fleet. 
+    
+    The simulation executes a pipeline of stages (e.g., departure, 
+    reservation, arrival and charging routines) at the time steps of the 
+    simulation horizon. The execution times of the stages are recorded and 
+    passed to the registered hooks. The simulation can be checkpointed to a 
+    file and resumed, and the results can be flushed in batches of time steps.
+    """
+
+    def __init__(self, system, fleet, sim_horizon, sim_step, stages=()):
+        """
+        Simulation objects are initialized by the simulated objects, the 
+        time steps and the pipeline of stages.
+
+        Parameters
+        ----------
+        system : data_handling.multi_cluster.MultiClusterSystem
+            Multi-cluster system object.
+        fleet : data_handling.fleet.EVFleet
+            EV fleet object.
+        sim_horizon : list
+            Time steps in the simulation horizon.
+        sim_step : datetime.timedelta
+            Time resolution of the simulation.
+        stages : list of Stage, optional
+            Stages executed at every time step in the given order. The 
+            default is an empty pipeline.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        self.system = system
+        self.fleet = fleet
+        self.sim_horizon = list(sim_horizon)
+        self.sim_step = sim_step
+        self.stages = list(stages)
+        self.hooks = []
+        self.timings = {}  # Number of calls and total execution time of stages
+        self.position = 0  # Position of the next time step to be simulated
+        self.flushed = 0  # Position of the first time step not flushed yet
+
+    def __getstate__(self):
+        # Hooks are not saved in checkpoints
+        state = self.__dict__.copy()
+        state["hooks"] = []
+        return state
+
+    def add_stage(self, name, routine, *args, **kwargs):
+        """
+        This method appends a stage to the pipeline. The arguments are those
+        of Stage.
+
+        Returns
+        -------
+        Stage
+            The added stage.
+
+        """
+        stage = Stage(name, routine, *args, **kwargs)
+        self.stages.append(stage)
+        return stage
+
+    def add_hook(self, hook):
+        """
+        This method registers a hook that is called after the execution of 
+        every stage as hook(stage_name, ts, elapsed) where elapsed is the 
+        execution time of the stage in seconds.
+
+        Parameters
+        ----------
+        hook : callable
+            The hook.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.hooks.append(hook)
+
+    def run(
+        self,
+        event_driven=False,
+        checkpoint_every=None,
+        checkpoint_path=None,
+        flush_every=None,
+        flush=None,
+    ):
+        """
+        This method runs the simulation from the next time step to be 
+        simulated until the end of the simulation horizon.
+
+        In event-driven mode, the stages marked as events_only are executed 
+        only at the time steps with fleet events, and the time steps without
+        events and connected EVs are skipped. If all the other stages are
+        multi-step, the intervals between consecutive events are simulated 
+        at once.
+
+        Parameters
+        ----------
+        event_driven : bool, optional
+            If True, the simulation jumps between event and control instants.
+            The default is False.
+        checkpoint_every : int, optional
+            Number of time steps between checkpoints. The default is None 
+            (no checkpoints).
+        checkpoint_path : str, optional
+            File that the checkpoints are saved to. The default is None.
+        flush_every : int, optional
+            Number of time steps between result flushes. The default is None
+            (no flushes).
+        flush : callable, optional
+            Called as flush(start, end) with the period whose results have
+            not been flushed yet (start included, end excluded). The flushed
+            position is saved in the checkpoints, so a resumed simulation 
+            continues with the period following the last flush before the
+            checkpoint. The default is None.
+
+        Returns
+        -------
+        int
+            Number of time steps at which the stages were executed.
+
+        """
+
+        if checkpoint_every and checkpoint_path is None:
+            raise ValueError("checkpoint_path must be given with checkpoint_every")
+
+        horizon = self.sim_horizon
+        n_steps = len(horizon)
+        controls = [stage for stage in self.stages if not stage.events_only]
+        fast_forward = event_driven and all(stage.multi_step for stage in controls)
+
+        events = event_steps(horizon, self.fleet) if event_driven else []
+        event_set = set(events)
+
+        n = self.position
+        n_visited = 0
+
+        while n < n_steps:
+
+            ts = horizon[n]
+
+            if event_driven:
+
+                at_event = n in event_set
+
+                # Position of the next event instant
+                k = bisect_right(events, n)
+                until = events[k] if k < len(events) else n_steps
+
+                if not at_event and not self._occupied(ts):
+                    # Nothing happens until the next event
+                    n = until
+                    continue
+
+                advance = until - n if fast_forward else 1
+
+            else:
+                at_event = True
+                advance = 1
+
+            for stage in self.stages:
+                if at_event or not stage.events_only:
+                    self._execute(stage, ts, advance)
+
+            n_visited += 1
+            previous, n = n, n + advance
+            self.position = n
+
+            # Flushes precede checkpoints so that they are recorded in them
+            if flush is not None and flush_every:
+                if n // flush_every > previous // flush_every:
+                    flush(horizon[self.flushed], self._time_at(n))
+                    self.flushed = n
+
+            if checkpoint_every:
+                if n // checkpoint_every > previous // checkpoint_every:
+                    self.save_checkpoint(checkpoint_path)
+
+        self.position = n_steps
+        if flush is not None and self.flushed < n_steps:
+            flush(horizon[self.flushed], self._time_at(n_steps))
+            self.flushed = n_steps
+
+        return n_visited
+
+    def _time_at(self, n):
+        """
+        This method returns the time of the n-th step of the horizon (also
+        beyond the last step).
+        """
+        if n < len(self.sim_horizon):
+            return self.sim_horizon[n]
+        return self.sim_horizon[-1] + (n - len(self.sim_horizon) + 1) * self.sim_step
+
+    def _occupied(self, ts):
+        """
+        This method checks if any cluster of the system has connected EVs.
+        """
+        return any(
+            cc.query_actual_occupation(ts) > 0 for cc in self.system.clusters.values()
+        )
+
+    def _execute(self, stage, ts, n_steps):
+        """
+        This method executes a stage and records its execution time.
+        """
+        prof = profiling.start("Simulation." + stage.name)
+        start = perf_counter()
+        stage(ts, n_steps)
+        elapsed = perf_counter() - start
+        prof.stop(time=ts, steps=n_steps)
+
+        record = self.timings.setdefault(stage.name, [0, 0.0])
+        record[0] += 1
+        record[1] += elapsed
+
+        for hook in self.hooks:
+            hook(stage.name, ts, elapsed)
+
+    def timing_table(self):
+        """
+        This method summarizes the execution times of the stages.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Number of calls, total and mean execution time (s) of each stage.
+
+        """
+        table = pd.DataFrame(
+            [
+                {"Stage": name, "Calls": calls, "Total (s)": total}
+                for name, (calls, total) in self.timings.items()
+            ],
+            columns=["Stage", "Calls", "Total (s)"],
+        ).set_index("Stage")
+        table["Mean (s)"] = table["Total (s)"] / table["Calls"]
+        return table
+
+    def save_checkpoint(self, path):
+        """
+        This method saves the simulation (including the system, the fleet and
+        the stages) to a file so that it can be resumed later. The routines 
+        and their arguments must be picklable (e.g., module-level functions).
+        The states of the global random number generators are saved as well
+        since some routines make random choices.
+
+        Parameters
+        ----------
+        path : str
+            The name of the checkpoint file.
+
+        Returns
+        -------
+        None.
+
+        """
+        checkpoint = {
+            "simulation": self,
+            "numpy_random_state": np.random.get_state(),
+            "random_state": random.getstate(),
+        }
+        with open(path, "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load_checkpoint(path):
+        """
+        This method loads a simulation saved by save_checkpoint and restores
+        the states of the global random number generators. Calling run on the
+        loaded simulation continues from the time step following the 
+        checkpoint as in an uninterrupted run. Hooks have to be registered 
+        again.
+
+        Parameters
+        ----------
+        path : str
+            The name of the checkpoint file.
+
+        Returns
+        -------
+        Simulation
+            The loaded simulation.
+
+        """
+        with open(path, "rb") as f:
+            checkpoint = pickle.load(f)
+        np.random.set_state(checkpoint["numpy_random_state"])
+        random.setstate(checkpoint["random_state"])
+        return checkpoint["simulation"]
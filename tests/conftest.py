@@ -0,0 +1,167 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from pyomo.environ import SolverFactory
+
+# The tests run against the source tree if datafev is not installed
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+)
+
+from datafev import profiling
+from datafev.data_handling.cluster import ChargerCluster
+from datafev.data_handling.multi_cluster import MultiClusterSystem
+
+START = datetime(2022, 1, 8, 7)
+STEP = timedelta(minutes=5)
+
+
+@pytest.fixture
+def solver():
+    """
+    HiGHS through the appsi interface (pip install highspy).
+    """
+    solver = SolverFactory("appsi_highs")
+    if not solver.available(exception_flag=False):
+        pytest.skip("appsi_highs is not available")
+    return solver
+
+
+@pytest.fixture(autouse=True)
+def profiling_disabled():
+    """
+    The tests run with the default profiling state (disabled).
+    """
+    profiling.disable()
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def cluster_problem(
+    n_evs=4,
+    n_steps=6,
+    opt_step=300,
+    p_max=11.0,
+    bcap=55 * 3600,
+    upper=22.0,
+    lower=0.0,
+    tolerance=0.0,
+    seed=0,
+):
+    """
+    This function returns the keyword arguments of a cluster rescheduling
+    problem with random initial and target SOCs.
+    """
+    rng = np.random.RandomState(seed)
+    ev_ids = ["EV%d" % (n + 1) for n in range(n_evs)]
+    inisoc = dict(zip(ev_ids, rng.uniform(0.3, 0.6, n_evs)))
+    return dict(
+        opt_step=opt_step,
+        opt_horizon=list(range(n_steps + 1)),
+        upperlimit=dict(enumerate(np.full(n_steps, upper))),
+        lowerlimit=dict(enumerate(np.full(n_steps, lower))),
+        tolerance=tolerance,
+        bcap=dict.fromkeys(ev_ids, bcap),
+        inisoc=inisoc,
+        tarsoc={v: inisoc[v] + rng.uniform(0.0, 0.1) for v in ev_ids},
+        minsoc=dict.fromkeys(ev_ids, 0.2),
+        maxsoc=dict.fromkeys(ev_ids, 1.0),
+        ch_eff=dict.fromkeys(ev_ids, 1.0),
+        ds_eff=dict.fromkeys(ev_ids, 1.0),
+        pmax_pos=dict.fromkeys(ev_ids, p_max),
+        pmax_neg=dict.fromkeys(ev_ids, p_max),
+        deptime=dict(zip(ev_ids, rng.randint(n_steps // 2, n_steps + 2, n_evs))),
+        rho_y=1,
+        rho_eps=1,
+    )
+
+
+def build_system(n_clusters=1, n_chargers=4, n_steps=144, p_max=11.0, load_factor=0.6):
+    """
+    This function returns a multi-cluster system of identical clusters with
+    constant consumption limits and a time-of-use price.
+    """
+    end = START + n_steps * STEP
+    hours = pd.date_range(START, end, freq="H")
+    system = MultiClusterSystem("test")
+
+    for c in range(n_clusters):
+        topology = pd.DataFrame(
+            {
+                "cu_id": ["CC%d_%02d" % (c + 1, n + 1) for n in range(n_chargers)],
+                "cu_p_ch_max (kW)": p_max,
+                "cu_p_ds_max (kW)": p_max,
+                "cu_eff": 1.0,
+            }
+        )
+        cluster = ChargerCluster("cluster%d" % (c + 1), topology)
+        limit = load_factor * n_chargers * p_max
+        capacity = pd.DataFrame(
+            {"TimeStep": hours, "LB (kW)": -limit, "UB (kW)": limit}
+        )
+        cluster.enter_power_limits(START, end, STEP, capacity)
+        system.add_cc(cluster)
+
+    limit = load_factor * n_clusters * n_chargers * p_max
+    capacity = pd.DataFrame({"TimeStep": hours, "LB": -limit, "UB": limit})
+    system.enter_power_limits(START, end, STEP, capacity)
+    price = pd.Series([0.4 if t.hour >= 17 else 0.3 for t in hours], index=hours)
+    system.enter_tou_price(price, STEP)
+    return system
+
+
+def fleet_behavior(clusters, n_evs, n_steps=144, seed=0):
+    """
+    This function returns the behavior table of a fleet whose EVs stay in the
+    clusters for random periods within n_steps.
+    """
+    rng = np.random.RandomState(seed)
+    arrival = START + rng.randint(1, n_steps // 2, n_evs) * STEP
+    departure = arrival + rng.randint(6, n_steps // 3, n_evs) * STEP
+    soc = rng.uniform(0.2, 0.6, n_evs)
+    return pd.DataFrame(
+        {
+            "ev_id": ["EV%03d" % n for n in range(n_evs)],
+            "Battery Capacity (kWh)": rng.choice([40.0, 55.0, 80.0], n_evs),
+            "p_max_ch (kW)": rng.choice([7.0, 11.0, 22.0], n_evs),
+            "p_max_ds (kW)": 11.0,
+            "Reservation Time": arrival - STEP,
+            "Estimated Arrival Time": arrival,
+            "Estimated Departure Time": departure,
+            "Estimated Arrival SOC": soc,
+            "Target SOC @ Estimated Departure Time": soc + 0.3,
+            "V2G Allowance (kWh)": 10.0,
+            "Real Arrival Time": arrival,
+            "Real Arrival SOC": soc,
+            "Real Departure Time": departure,
+            "Target Cluster": [clusters[n % len(clusters)] for n in range(n_evs)],
+        }
+    )
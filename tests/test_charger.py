@@ -0,0 +1,45 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+from datetime import datetime, timedelta
+
+from datafev.data_handling.charger import ChargingUnit
+from datafev.data_handling.vehicle import ElectricVehicle
+
+T0 = datetime(2022, 1, 8, 7)
+STEP = timedelta(minutes=5)
+
+
+def test_power_records_write_back():
+    cu = ChargingUnit("CU1", 11, 11, 0.9)
+    ev = ElectricVehicle("EV1", 55)
+    ev.soc[T0] = 0.5
+    cu.connect(T0, ev)
+    cu.supply(T0, STEP, 9.0)
+
+    cu.supplied_power[T0 + STEP] = 4.5
+    cu.consumed_power[T0 + STEP] = 5.0
+
+    assert cu.supplied_power[T0] == 9.0
+    assert cu.consumed_power[T0] == 10.0
+    assert cu.supplied_power.to_series().to_dict() == {T0: 9.0, T0 + STEP: 4.5}
+    assert dict(cu.consumed_power) == {T0: 10.0, T0 + STEP: 5.0}
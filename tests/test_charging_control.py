@@ -0,0 +1,157 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import START, STEP, build_system, cluster_problem, fleet_behavior
+from datafev.algorithms.cluster import rescheduling_heuristic
+from datafev.algorithms.cluster.rescheduling_milp import reschedule
+from datafev.data_handling.fleet import EVFleet
+from datafev.routines.charging_control import (
+    centralized_milp,
+    decentralized_feasibility_guaranteed_milp,
+    decentralized_milp,
+)
+from datafev.routines.departure import departure_routine
+from datafev.routines.smart_reservation.arrival import arrival_routine
+from datafev.routines.smart_reservation.reservation import reservation_routine
+
+
+def milp_control(routine, solver, n_steps=16, **kwargs):
+    """
+    This function simulates smart reservations with a MILP-based charging
+    control routine and returns the system.
+    """
+    system = build_system(n_clusters=2, n_chargers=3)
+    clusters = list(system.clusters)
+    horizon = [START + n * STEP for n in range(144)]
+    fleet = EVFleet("fleet", fleet_behavior(clusters, 8, 2 * n_steps), horizon)
+    forecast = {
+        "soc_dec": dict.fromkeys(clusters, 0),
+        "arr_del": dict.fromkeys(clusters, timedelta(0)),
+        "dep_del": dict.fromkeys(clusters, timedelta(0)),
+    }
+    penalties = {"rho_y": dict.fromkeys(clusters, 1), "rho_eps": dict.fromkeys(clusters, 1)}
+    for ts in horizon[:n_steps]:
+        departure_routine(ts, fleet)
+        reservation_routine(ts, STEP, system, fleet, solver, forecast)
+        arrival_routine(ts, STEP, fleet)
+        routine.charging_routine(
+            ts, STEP, timedelta(minutes=15), system, solver, penalties, **kwargs
+        )
+    return system
+
+
+def test_clusters_solved_in_processes(solver):
+    problems = [tuple(cluster_problem(seed=seed).values()) for seed in range(3)]
+    expected = [reschedule(solver, *problem) for problem in problems]
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(
+                decentralized_milp._reschedule_in_worker, "appsi_highs", *problem
+            )
+            for problem in problems
+        ]
+        futures += [
+            executor.submit(
+                decentralized_feasibility_guaranteed_milp._reschedule_cluster,
+                "appsi_highs",
+                *problem,
+            )
+            for problem in problems
+        ]
+        results = [future.result() for future in futures]
+
+    for (p_schedule, s_schedule), (p_expected, s_expected) in zip(
+        results, expected + expected
+    ):
+        for v in p_expected:
+            assert p_schedule[v] == pytest.approx(p_expected[v], abs=1e-6)
+            assert s_schedule[v] == pytest.approx(s_expected[v], abs=1e-6)
+
+
+@pytest.mark.parametrize(
+    "routine", [decentralized_milp, decentralized_feasibility_guaranteed_milp]
+)
+def test_executor_requires_process_pool_and_solver_name(solver, routine):
+    args = (datetime(2022, 1, 1), timedelta(minutes=5), timedelta(hours=1), None)
+    penalties = {"rho_y": {}, "rho_eps": {}}
+    with ThreadPoolExecutor() as executor:
+        with pytest.raises(ValueError):
+            routine.charging_routine(
+                *args, "appsi_highs", penalties, executor=executor
+            )
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(ValueError):
+            routine.charging_routine(*args, solver, penalties, executor=executor)
+
+
+@pytest.mark.parametrize(
+    "routine",
+    [centralized_milp, decentralized_milp, decentralized_feasibility_guaranteed_milp],
+)
+def test_relaxation_passed_to_rescheduling(solver, monkeypatch, routine):
+    original = routine.reschedule
+    relaxations = []
+
+    def recording(*args, **kwargs):
+        relaxations.append(kwargs.get("relaxation"))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(routine, "reschedule", recording)
+    milp_control(routine, solver, relaxation=True)
+    assert len(relaxations) > 0
+    assert all(relaxations)
+
+
+@pytest.mark.parametrize(
+    "routine", [decentralized_milp, decentralized_feasibility_guaranteed_milp]
+)
+def test_relaxation_passed_to_reschedulers(solver, routine):
+    reschedulers = {}
+    milp_control(routine, solver, reschedulers=reschedulers, relaxation=True)
+    assert len(reschedulers) == 2
+    assert all(r.relaxation for r in reschedulers.values())
+
+
+@pytest.mark.parametrize(
+    "routine", [decentralized_milp, decentralized_feasibility_guaranteed_milp]
+)
+def test_heuristic_selected_by_reschedule_function(solver, routine):
+    evs = []
+
+    def heuristic(solver, *problem, **kwargs):
+        evs.extend(problem[5])  # bcap
+        return rescheduling_heuristic.reschedule(solver, *problem, **kwargs)
+
+    milp_control(routine, solver, reschedule_function=heuristic)
+    assert len(evs) > 0
+
+    args = (datetime(2022, 1, 1), timedelta(minutes=5), timedelta(hours=1), None)
+    penalties = {"rho_y": {}, "rho_eps": {}}
+    with pytest.raises(ValueError):
+        routine.charging_routine(
+            *args, solver, penalties, reschedulers={}, reschedule_function=heuristic
+        )
@@ -0,0 +1,165 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import START, STEP
+from datafev.data_handling.cluster import ChargerCluster
+from datafev.data_handling.vehicle import ElectricVehicle
+
+
+def random_schedule(rng, ts):
+    """
+    This function returns a random power schedule that starts on the 5-minute
+    grid or, in one of three cases, two minutes after it.
+    """
+    start = ts + rng.randint(0, 6) * STEP
+    if rng.rand() < 1 / 3:
+        start += pd.Timedelta(minutes=2)
+    index = pd.date_range(start, periods=rng.randint(1, 12), freq=STEP)
+    p_ref = pd.Series(rng.uniform(-11, 11, len(index)), index=index)
+    return p_ref, pd.Series(0.5, index=index)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_aggregate_schedule_matches_charger_schedules(seed):
+    rng = np.random.RandomState(seed)
+    topology = pd.DataFrame(
+        {
+            "cu_id": ["CU1", "CU2", "CU3", "CU4"],
+            "cu_p_ch_max (kW)": 11.0,
+            "cu_p_ds_max (kW)": 11.0,
+            "cu_eff": [1.0, 0.95, 0.9, 0.85],
+        }
+    )
+    cluster = ChargerCluster("cluster1", topology)
+    chargers = list(cluster.chargers.values())
+    reservations = []
+    regular = set()
+
+    for n in range(40):
+        ts = START + n * STEP
+        cu = chargers[rng.randint(len(chargers))]
+        action = rng.choice(["reserve", "unreserve", "connect", "disconnect", "schedule"])
+
+        if action == "reserve":
+            ev = ElectricVehicle("EV%03d" % n, 55.0)
+            ev.t_dep_est = ts + rng.randint(2, 20) * STEP
+            p_ref, s_ref = random_schedule(rng, ts)
+            contract = {
+                "Resolution": STEP.seconds,
+                "Schedule": True,
+                "P Schedule": p_ref.to_dict(),
+                "S Schedule": s_ref.to_dict(),
+                "Payment": False,
+            }
+            cluster.reserve(ts, ts, ev.t_dep_est, ev, cu, contract)
+            reservations.append(ev.reservation_id)
+        elif action == "unreserve" and reservations:
+            cluster.unreserve(ts, reservations.pop(rng.randint(len(reservations))))
+        elif action == "connect" and cu.connected_ev is None and cu.schedule_pow:
+            ev = getattr(cu, "reserved_ev", None)
+            if ev is None or getattr(ev, "connected_cu", None) is not None:
+                ev = ElectricVehicle("EV%03d" % n, 55.0)
+                ev.t_dep_est = ts + rng.randint(2, 20) * STEP
+            cu.connect(ts, ev)
+        elif action == "disconnect" and cu.connected_ev is not None:
+            cu.disconnect(ts)
+        elif action == "schedule":
+            cu.set_schedule(ts, *random_schedule(rng, ts))
+
+        for k in range(2):
+            start = START + rng.randint(0, n + 20) * STEP
+            end = start + rng.randint(0, 30) * STEP
+            for c in cluster.schedule_contributions.values():
+                regular.add(c["regular"])
+            np.testing.assert_allclose(
+                cluster.query_actual_schedule(start, end, STEP).values,
+                cluster._compute_actual_schedule(start, end, STEP).values.astype(float),
+                atol=1e-9,
+            )
+
+    assert regular == {True, False}
+
+
+def mask_availability(reservations, cu_ids, start, end):
+    """
+    This function identifies the available chargers with time step masks: a
+    reservation occupies the steps from its start until one step before its
+    end.
+    """
+    period = pd.date_range(start, end, freq=STEP)
+    available = []
+    for cu_id in cu_ids:
+        mask = np.ones(len(period), dtype=bool)
+        for (res_cu, res_from, res_until) in reservations.values():
+            if res_cu == cu_id:
+                mask[(period >= res_from) & (period <= res_until - STEP)] = False
+        if mask.all():
+            available.append(cu_id)
+    return available
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_availability_matches_reservation_masks(seed):
+    rng = np.random.RandomState(seed)
+    topology = pd.DataFrame(
+        {
+            "cu_id": ["CU1", "CU2", "CU3", "CU4"],
+            "cu_p_ch_max (kW)": 11.0,
+            "cu_p_ds_max (kW)": 11.0,
+            "cu_eff": 1.0,
+        }
+    )
+    cluster = ChargerCluster("cluster1", topology)
+    reservations = {}
+    untils = [START]
+
+    for n in range(60):
+        if reservations and rng.rand() < 0.3:
+            reservation_id = list(reservations)[rng.randint(len(reservations))]
+            cluster.unreserve(START, reservation_id)
+            del reservations[reservation_id]
+        else:
+            # CU4 is never reserved, reservations may touch the earlier ones
+            cu_id = "CU%d" % rng.randint(1, 4)
+            if rng.rand() < 0.3:
+                res_from = untils[rng.randint(len(untils))]
+            else:
+                res_from = START + rng.randint(0, 60) * STEP
+            res_until = res_from + rng.randint(1, 12) * STEP
+            ev = ElectricVehicle("EV%03d" % n, 55.0)
+            cluster.reserve(START, res_from, res_until, ev, cluster.chargers[cu_id])
+            reservations[ev.reservation_id] = (cu_id, res_from, res_until)
+            untils.append(res_until)
+
+        for k in range(5):
+            if rng.rand() < 0.3:
+                start = untils[rng.randint(len(untils))]
+            else:
+                start = START + rng.randint(0, 70) * STEP
+            end = start + rng.randint(0, 10) * STEP
+            assert list(cluster.query_availability(start, end, STEP).index) == (
+                mask_availability(reservations, cluster.chargers, start, end)
+            )
@@ -0,0 +1,50 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+import pandas as pd
+import pytest
+
+from datafev.data_handling.event_log import EventLog
+
+
+def test_tables_are_read_only():
+    log = EventLog(["EV ID", "Price"])
+    log.append({"EV ID": "EV1", "Price": 1.0})
+    table = log.to_frame()
+
+    for assign in (
+        lambda: table.loc.__setitem__((1, "Price"), 2.0),
+        lambda: table.iloc.__setitem__((0, 1), 2.0),
+        lambda: table.at.__setitem__((1, "Price"), 2.0),
+        lambda: table.iat.__setitem__((0, 1), 2.0),
+        lambda: table.__setitem__("Price", 2.0),
+    ):
+        with pytest.raises(TypeError):
+            assign()
+    assert table.loc[1, "Price"] == 1.0
+
+    copy = table.copy()
+    copy.loc[1, "Price"] = 2.0
+    assert type(copy) is pd.DataFrame
+
+    log.set(1, "Price", 3.0)
+    assert log.to_frame().loc[1, "Price"] == 3.0
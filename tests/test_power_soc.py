@@ -0,0 +1,103 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import START, STEP, build_system, fleet_behavior
+from datafev.data_handling.fleet import EVFleet
+from datafev.data_handling.power_soc import PowerSOCTable, p_max_array
+from datafev.data_handling.vehicle import ElectricVehicle
+from datafev.routines.arrival import arrival_routine
+from datafev.routines.charging_control import decentralized_fcfs, decentralized_llf
+
+TABLE = pd.DataFrame(
+    {"SOC_LB": [0.0, 0.5], "SOC_UB": [0.5, 1.0], "P_UB": [5.0, 3.0]}
+)
+
+
+def connected_system():
+    """
+    This function returns a system whose EVs are connected at START+STEP and
+    have a dataframe as SOC dependency table.
+    """
+    horizon = pd.date_range(START, START + 72 * STEP, freq=STEP)
+    system = build_system(n_chargers=4, n_steps=72, p_max=22.0, load_factor=1.0)
+    behavior = fleet_behavior(["cluster1"], 4, n_steps=72)
+    behavior["Reservation Time"] = START
+    for column in ["Estimated Arrival Time", "Real Arrival Time"]:
+        behavior[column] = START + STEP
+    for column in ["Estimated Departure Time", "Real Departure Time"]:
+        behavior[column] = START + 60 * STEP
+    for column in ["Estimated Arrival SOC", "Real Arrival SOC"]:
+        behavior[column] = [0.2, 0.4, 0.6, 0.8]
+    behavior["Target SOC @ Estimated Departure Time"] = 1.0
+
+    fleet = EVFleet("fleet", behavior, horizon)
+    for ev in fleet.objects.values():
+        ev.pow_soc_table = TABLE
+    arrival_routine(START + STEP, STEP, fleet, system)
+    return system, fleet
+
+
+def assert_table_limits(fleet, ts):
+    for ev in fleet.objects.values():
+        expected = 5.0 if ev.soc[ts] < 0.5 else 3.0
+        assert np.isclose(ev.g2v[ts], expected)
+
+
+@pytest.mark.parametrize(
+    "table", [TABLE, TABLE.T.to_dict(), PowerSOCTable([0, 0.5], [0.5, 1], [5, 3])]
+)
+def test_table_compiled_on_vehicle(table):
+    ev = ElectricVehicle("EV", 55.0, pow_soc_table=table)
+    assert isinstance(ev.pow_soc_table, PowerSOCTable)
+    assert ev.pow_soc_table.p_max(0.7) == 3.0
+    assert ElectricVehicle("EV", 55.0).pow_soc_table is None
+
+
+def test_cluster_uncontrolled_supply():
+    system, fleet = connected_system()
+    evs = sorted(fleet.objects.values(), key=lambda ev: ev.soc[START + STEP])
+    np.testing.assert_allclose(
+        p_max_array(
+            [ev.pow_soc_table for ev in evs], [ev.soc[START + STEP] for ev in evs]
+        ),
+        [5.0, 5.0, 3.0, 3.0],
+    )
+    system.clusters["cluster1"].uncontrolled_supply(START + STEP, STEP)
+    assert_table_limits(fleet, START + STEP)
+
+
+def test_charger_uncontrolled_supply():
+    system, fleet = connected_system()
+    for cu in system.clusters["cluster1"].chargers.values():
+        cu.uncontrolled_supply(START + STEP, STEP)
+    assert_table_limits(fleet, START + STEP)
+
+
+@pytest.mark.parametrize("routine", [decentralized_fcfs, decentralized_llf])
+def test_charging_routines(routine):
+    system, fleet = connected_system()
+    routine.charging_routine(START + STEP, STEP, system)
+    assert_table_limits(fleet, START + STEP)
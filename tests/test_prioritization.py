@@ -0,0 +1,69 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import numpy as np
+import pytest
+
+from datafev.algorithms.cluster.prioritization_fcfs import firstcomefirstserve
+from datafev.algorithms.cluster.prioritization_llf import leastlaxityfirst_array
+
+
+def sequential(p_re, efficiency, order, upperlimit):
+    """
+    This function allocates the margin of the cluster to the EVs one by one
+    in the given order.
+    """
+    p_charge = np.zeros(len(p_re))
+    free_margin = upperlimit
+    for ev in order:
+        p_max_to_cu = p_re[ev] / efficiency[ev]
+        if p_max_to_cu <= free_margin:
+            p_to_ev = p_max_to_cu * efficiency[ev]
+        else:
+            p_to_ev = free_margin * efficiency[ev]
+        free_margin -= p_to_ev / efficiency[ev]
+        p_charge[ev] = p_to_ev
+    return p_charge
+
+
+@pytest.mark.parametrize("upperlimit", [-15.0, 0.0, 15.0, 100.0])
+def test_allocation_matches_sequential_rule(upperlimit):
+    rng = np.random.RandomState(0)
+    p_re = rng.uniform(0, 11, 6)
+    efficiency = rng.uniform(0.85, 1.0, 6)
+
+    contime = rng.permutation(6) * 300.0
+    np.testing.assert_allclose(
+        firstcomefirstserve(p_re, efficiency, contime, upperlimit),
+        sequential(p_re, efficiency, np.argsort(-contime), upperlimit),
+    )
+
+    inisoc = rng.uniform(0.2, 0.5, 6)
+    tarsoc = inisoc + rng.uniform(0.1, 0.4, 6)
+    bcap = np.full(6, 55 * 3600.0)
+    leadtime = rng.uniform(3600, 7200, 6)
+    laxity = 1 - (tarsoc - inisoc) * bcap / 11.0 / leadtime
+    np.testing.assert_allclose(
+        leastlaxityfirst_array(
+            inisoc, tarsoc, bcap, efficiency, np.full(6, 11.0), p_re, leadtime, upperlimit
+        ),
+        sequential(p_re, efficiency, np.argsort(laxity), upperlimit),
+    )
@@ -0,0 +1,93 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import numpy as np
+import pytest
+
+from conftest import cluster_problem
+from datafev.algorithms.cluster import rescheduling_heuristic, rescheduling_milp
+
+
+def evaluate(problem, p_schedule, s_schedule):
+    """
+    This function returns the objective value and the violation of the
+    limits of a rescheduling solution.
+    """
+    ev_ids = list(problem["bcap"])
+    steps = problem["opt_horizon"][:-1]
+    p = np.array([[p_schedule[v][t] for t in steps] for v in ev_ids])
+    s = np.array([[s_schedule[v][t] for t in problem["opt_horizon"]] for v in ev_ids])
+    p_up = np.array([problem["upperlimit"][t] for t in steps])
+    p_low = np.array([problem["lowerlimit"][t] for t in steps])
+    E, s_tar, eff_ch, eff_ds = (
+        np.array([problem[k][v] for v in ev_ids])
+        for k in ("bcap", "tarsoc", "ch_eff", "ds_eff")
+    )
+    obj = rescheduling_heuristic.objective(
+        p, s, p_up, p_low, E, s_tar, eff_ch, eff_ds, problem["rho_y"], problem["rho_eps"]
+    )
+    return obj, rescheduling_heuristic.violation(p, p_up, p_low, eff_ch, eff_ds)
+
+
+@pytest.mark.parametrize(
+    "upper, lower", [(-10.0, -40.0), (30.0, 20.0), (22.0, 0.0), (5.0, -5.0)]
+)
+@pytest.mark.parametrize("seed", range(5))
+def test_heuristic_keeps_tolerance(solver, upper, lower, seed):
+    problem = cluster_problem(upper=upper, lower=lower, tolerance=1.0, seed=seed)
+    try:
+        milp = evaluate(problem, *rescheduling_milp.reschedule(solver, **problem))
+    except RuntimeError:
+        pytest.skip("the limits cannot be kept by the MILP either")
+
+    obj, eps = evaluate(
+        problem, *rescheduling_heuristic.reschedule(solver, **problem)
+    )
+    assert eps <= problem["tolerance"] + 1e-6
+    assert obj >= milp[0] - 1e-6
+
+
+def test_heuristic_discharges_beyond_targets(solver):
+    # All EVs want to charge but the cluster must export at least 10 kW
+    problem = cluster_problem(upper=-10.0, lower=-40.0, tolerance=1.0)
+    p_schedule, s_schedule = rescheduling_heuristic.reschedule(None, **problem)
+    p_cc = np.sum([list(p.values()) for p in p_schedule.values()], axis=0)
+    assert np.all(p_cc <= -10.0 + 1e-6)
+
+    milp = evaluate(problem, *rescheduling_milp.reschedule(solver, **problem))
+    assert evaluate(problem, p_schedule, s_schedule)[0] == pytest.approx(milp[0])
+
+
+def test_heuristic_falls_back_to_milp(solver):
+    # Charging towards the target first leaves no headroom for the later
+    # lower limit
+    problem = cluster_problem(n_evs=1)
+    problem.update(
+        inisoc={"EV1": 0.9}, tarsoc={"EV1": 0.95}, maxsoc={"EV1": 0.95}, deptime={"EV1": 10}
+    )
+    problem["lowerlimit"] = dict(enumerate([0.0, 0.0, 0.0, 11.0, 11.0, 11.0]))
+
+    with pytest.raises(RuntimeError):
+        rescheduling_heuristic.reschedule(None, **problem)
+
+    p_schedule, s_schedule = rescheduling_heuristic.reschedule(solver, **problem)
+    assert evaluate(problem, p_schedule, s_schedule)[1] <= 1e-6
+    assert p_schedule["EV1"][5] == pytest.approx(11.0)
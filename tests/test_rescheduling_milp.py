@@ -0,0 +1,172 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+import pytest
+from pyomo.environ import SolverFactory, value
+from pyomo.opt import TerminationCondition
+
+from conftest import cluster_problem
+from datafev import profiling
+from datafev.algorithms.cluster.rescheduling_milp import (
+    Rescheduler,
+    fixed_decisions,
+    load_incumbent,
+    reschedule,
+    shift_incumbent,
+    solve,
+)
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_rescheduler_profiling(solver, enabled):
+    if enabled:
+        profiling.enable()
+    problem = cluster_problem(n_evs=2, n_steps=4)
+    rescheduler = Rescheduler(solver, n_slots=2)
+
+    rescheduler.reschedule(**problem)
+    rescheduler.reschedule(**problem)
+
+    records = profiling.records()
+    if enabled:
+        assert [r["info"]["rebuilt"] for r in records] == [True, False]
+    else:
+        assert records == []
+
+
+def test_rescheduler_rejects_classic_persistent_solvers():
+    with pytest.raises(ValueError, match="persistent"):
+        Rescheduler(SolverFactory("gurobi_persistent"))
+
+
+def test_partial_incumbent_clears_stale_values(solver):
+    problem = cluster_problem(n_evs=3, n_steps=4)
+    rescheduler = Rescheduler(solver, n_slots=3)
+    incumbent = shift_incumbent(*rescheduler.reschedule(**problem))
+
+    # EV3 leaves and a new vehicle takes its slot
+    problem = cluster_problem(n_evs=3, n_steps=4, seed=1)
+    ev_ids = ["EV1", "EV2", "EV4"]
+    for key, value in problem.items():
+        if isinstance(value, dict) and "EV3" in value:
+            value["EV4"] = value.pop("EV3")
+    model = rescheduler.model
+    load_incumbent(model, incumbent, dict(enumerate(ev_ids)))
+
+    assert all(model.p_ev[2, t].value is None for t in model.T)
+    assert all(model.s[2, t].value is None for t in model.Tp)
+    assert model.eps.value is None
+    assert model.p_ev[0, 0].value == incumbent[0]["EV1"][0]
+
+    p_schedule, s_schedule = rescheduler.reschedule(**problem, incumbent=incumbent)
+    assert all(p is not None for p in p_schedule["EV4"].values())
+
+
+class NotLoading:
+    """
+    Solver that leaves the variable values as they are, like interfaces that
+    only warn about failed solves.
+    """
+
+    def __init__(self, solver):
+        self.solver = solver
+
+    def solve(self, model, **kwargs):
+        return self.solver.solve(model, load_solutions=False, **kwargs)
+
+
+def test_infeasible_problem_raises(solver):
+    # The cluster must export more than the EVs can discharge
+    problem = cluster_problem(n_evs=2, n_steps=4, upper=-30.0, lower=-40.0)
+    with pytest.raises(RuntimeError, match="could not be solved"):
+        reschedule(NotLoading(solver), **problem)
+    with pytest.raises(RuntimeError, match="could not be solved"):
+        Rescheduler(NotLoading(solver)).reschedule(**problem)
+
+
+def one_way_problem():
+    # EV1 is at its minimum SOC, EV2 at its maximum SOC and EV3 leaves early
+    problem = cluster_problem(n_evs=4, n_steps=6, upper=5.0, lower=-5.0, tolerance=10)
+    problem["inisoc"].update(EV1=0.2, EV2=1.0)
+    problem["deptime"].update(EV3=2)
+    problem["ch_eff"] = dict.fromkeys(problem["bcap"], 0.9)
+    problem["ds_eff"] = dict.fromkeys(problem["bcap"], 0.9)
+    return problem
+
+
+def test_fixed_decisions():
+    problem = one_way_problem()
+    args = [problem[k] for k in ("opt_step", "opt_horizon", "bcap", "inisoc")]
+    args += [problem[k] for k in ("minsoc", "maxsoc", "pmax_pos", "pmax_neg")]
+    decisions = fixed_decisions(*args, problem["deptime"])
+
+    assert decisions[("EV1", 0)] == 1
+    assert decisions[("EV2", 0)] == 0
+    assert all(decisions[("EV3", t)] == 1 for t in range(2, 6))
+    assert ("EV1", 1) not in decisions
+    assert ("EV4", 0) not in decisions
+
+
+@pytest.mark.parametrize("relaxation", [False, True])
+def test_fixed_decisions_keep_optimum(solver, relaxation):
+    problem = one_way_problem()
+    rescheduler = Rescheduler(solver, relaxation=relaxation)
+    rescheduler.reschedule(**problem)
+    model = rescheduler.model
+    assert any(x.fixed for x in model.x_ev.values())
+    reduced = value(model.obj)
+
+    for x in model.x_ev.values():
+        x.unfix()
+    solve(solver, model)
+
+    assert reduced == pytest.approx(value(model.obj), abs=1e-6)
+
+
+class FailingRounding:
+    """
+    Solver that reports the solve of the rounded relaxation (second call) as
+    infeasible.
+    """
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.calls = 0
+
+    def solve(self, model, **kwargs):
+        self.calls += 1
+        result = self.solver.solve(model, **kwargs)
+        if self.calls == 2:
+            result.solver.termination_condition = TerminationCondition.infeasible
+        return result
+
+
+def test_relaxation_falls_back_to_milp(solver):
+    problem = one_way_problem()
+    p_milp, s_milp = reschedule(solver, **problem)
+
+    failing = FailingRounding(solver)
+    p_relaxed, s_relaxed = reschedule(failing, **problem, relaxation=True)
+
+    assert failing.calls == 3
+    for v in p_milp:
+        assert s_relaxed[v][6] == pytest.approx(s_milp[v][6], abs=1e-6)
@@ -0,0 +1,107 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+import numpy as np
+import pandas as pd
+
+from conftest import START, STEP, build_system
+from datafev.algorithms.cluster.pricing_rule import idp
+from datafev.data_handling.vehicle import ElectricVehicle
+from datafev.routines.smart_reservation.reservation import cluster_price_signals
+
+
+def reserve_and_connect(cluster, cu_id, ts, power):
+    """
+    This function reserves a charger with a constant schedule and connects
+    the reserving EV.
+    """
+    ev = ElectricVehicle("EV_" + cu_id, 55.0)
+    ev.t_dep_est = ts + 24 * STEP
+    schedule = {ts + n * STEP: power for n in range(24)}
+    contract = {
+        "Resolution": STEP.seconds,
+        "Schedule": True,
+        "P Schedule": schedule,
+        "S Schedule": dict.fromkeys(schedule, 0.5),
+        "Payment": False,
+    }
+    cu = cluster.chargers[cu_id]
+    cluster.reserve(ts, ts, ev.t_dep_est, ev, cu, contract)
+    cu.connect(ts, ev)
+
+
+def baseline_signals(system, cc, start, end):
+    """
+    This function calculates the price signals of a cluster with idp.
+    """
+    ub = cc.upper_limit[start:end].values
+    lb = cc.lower_limit[start:end].values
+    sc = cc._compute_actual_schedule(start, end, STEP).values.astype(float)
+    tou = system.tou_price.loc[start:end].values
+    g2v = idp(
+        dict(enumerate(sc)),
+        dict(enumerate(ub)),
+        dict(enumerate(lb)),
+        dict(enumerate(tou)),
+        0.2,
+        0.3,
+    )
+    return ub, sc, g2v
+
+
+def test_price_signals_memoized_per_cluster():
+    system = build_system(n_clusters=2, n_chargers=4)
+    clusters = list(system.clusters.values())
+    reserve_and_connect(system.clusters["cluster2"], "CC2_01", START, 11.0)
+    start, end = START + 2 * STEP, START + 20 * STEP
+    cache = {}
+
+    def signals():
+        result = cluster_price_signals(
+            system, clusters, start, end, STEP, 0.2, 0.3, 0.1, cache
+        )
+        for cc in clusters:
+            ub, sc, g2v = baseline_signals(system, cc, start, end)
+            signal = result[cc.id]
+            np.testing.assert_allclose(list(signal[0].values()), ub)
+            np.testing.assert_allclose(list(signal[1].values()), sc)
+            np.testing.assert_allclose(list(signal[2].values()), list(g2v.values()))
+            np.testing.assert_allclose(
+                list(signal[3].values()), 0.9 * np.array(list(g2v.values()))
+            )
+        return result
+
+    first = signals()
+    again = signals()
+    assert all(again[cc.id] is first[cc.id] for cc in clusters)
+
+    for cu_id in ["CC1_01", "CC1_02", "CC1_03"]:
+        reserve_and_connect(system.clusters["cluster1"], cu_id, START + STEP, 11.0)
+    second = signals()
+    assert second["cluster2"] is first["cluster2"]
+    assert second["cluster1"] is not first["cluster1"]
+    assert max(second["cluster1"][2].values()) > max(first["cluster1"][2].values())
+
+    # A different period is not served from the cache
+    end = START + 30 * STEP
+    third = signals()
+    assert all(third[cc.id] is not second[cc.id] for cc in clusters)
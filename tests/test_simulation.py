@@ -0,0 +1,116 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import START, STEP, build_system, fleet_behavior
+from datafev.data_handling.fleet import EVFleet
+from datafev.routines.arrival import arrival_routine
+from datafev.routines.charging_control import decentralized_fcfs
+from datafev.routines.departure import departure_routine
+from datafev.simulation import Simulation, simulate_event_driven
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_at(ts, stop):
+    if ts == stop.get("at"):
+        raise Interrupted
+
+
+@pytest.mark.parametrize("checkpoint_every, flush_every", [(4, 10), (8, 4), (3, 3)])
+def test_resumed_flushes_cover_horizon(tmp_path, checkpoint_every, flush_every):
+    horizon = [START + n * STEP for n in range(20)]
+    stop = {"at": horizon[9]}
+    simulation = Simulation(None, None, horizon, STEP)
+    simulation.add_stage("interrupt", interrupt_at, stop)
+
+    periods = []
+    flush = lambda start, end: periods.append((start, end))
+    path = str(tmp_path / "checkpoint.pkl")
+    with pytest.raises(Interrupted):
+        simulation.run(
+            checkpoint_every=checkpoint_every,
+            checkpoint_path=path,
+            flush_every=flush_every,
+            flush=flush,
+        )
+
+    resumed = Simulation.load_checkpoint(path)
+    resumed.stages[0].args[0]["at"] = None
+    resumed.run(flush_every=flush_every, flush=flush)
+
+    assert periods[0][0] == START
+    assert all(a[1] == b[0] for a, b in zip(periods, periods[1:]))
+    assert periods[-1][1] == START + 20 * STEP
+
+
+def run_scenario(n_chargers, control, event_driven):
+    """
+    This function simulates a cluster whose chargers are requested by twice
+    as many EVs without reservations.
+    """
+    horizon = [START + n * STEP for n in range(144)]
+    system = build_system(n_chargers=n_chargers)
+    fleet = EVFleet("fleet", fleet_behavior(["cluster1"], 2 * n_chargers), horizon)
+    charging = None
+    if control == "fcfs":
+        charging = partial(decentralized_fcfs.charging_routine, t_delta=STEP, system=system)
+
+    np.random.seed(0)
+    if event_driven:
+        routines = [
+            partial(departure_routine, fleet=fleet),
+            partial(arrival_routine, tdelta=STEP, fleet=fleet, system=system),
+        ]
+        simulate_event_driven(horizon, STEP, system, fleet, routines, charging)
+    else:
+        for ts in horizon:
+            departure_routine(ts, fleet)
+            arrival_routine(ts, STEP, fleet, system)
+            if charging is None:
+                system.uncontrolled_supply(ts, STEP)
+            else:
+                charging(ts)
+
+    cluster = system.clusters["cluster1"]
+    profile = cluster.analyze_consumption_profile(START, horizon[-1], STEP)
+    socs = {ev_id: ev.soc.to_series() for ev_id, ev in fleet.objects.items()}
+    return profile, socs
+
+
+@pytest.mark.parametrize("control", ["uncontrolled", "fcfs"])
+@pytest.mark.parametrize("n_chargers", [10, 40])
+def test_event_driven_matches_step_by_step(n_chargers, control):
+    profile, socs = run_scenario(n_chargers, control, event_driven=True)
+    expected_profile, expected_socs = run_scenario(n_chargers, control, False)
+
+    assert expected_profile.values.sum() > 0
+    pd.testing.assert_frame_equal(profile, expected_profile, rtol=1e-9)
+    assert socs.keys() == expected_socs.keys()
+    for ev_id, soc in socs.items():
+        pd.testing.assert_series_equal(soc, expected_socs[ev_id], rtol=1e-9)
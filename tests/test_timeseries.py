@@ -0,0 +1,205 @@
+# The datafev framework
+
+# Copyright (C) 2022,
+# Institute for Automation of Complex Power Systems (ACS),
+# E.ON Energy Research Center (E.ON ERC),
+# RWTH Aachen University
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from datafev.data_handling.fleet import EVFleet
+from datafev.data_handling.timeseries import (
+    TimeSeriesStore,
+    TimeSeriesView,
+    TrajectoryStore,
+)
+
+T0 = datetime(2022, 1, 8, 7)
+STEP = timedelta(minutes=5)
+
+
+def test_trajectory_store_windows():
+    store = TrajectoryStore(T0, STEP)
+    c0 = store.add_column(T0 + 2 * STEP, T0 + 4 * STEP)
+    c1 = store.add_column(T0, T0 + STEP)
+    c2 = store.add_column()
+    assert store.size == 5
+
+    reference = {c0: {}, c1: {}, c2: {}}
+    writes = [
+        (T0 + 2 * STEP, c0, 0.5),
+        (T0 + 4 * STEP, c0, 0.6),
+        (T0 + 6 * STEP, c0, 0.7),  # Outside the window
+        (T0 + STEP, c1, 0.1),
+        (T0 + STEP / 2, c1, 0.2),  # Off the grid
+        (T0 + 3 * STEP, c2, 0.3),  # No window
+    ]
+    for ts, column, value in writes:
+        store.set(ts, column, value)
+        reference[column][ts] = value
+
+    columns = np.array([c0, c1])
+    block = np.array([[0.8, 0.9], [0.85, 0.95]])
+    store.set_block(T0 + STEP, columns, block)
+    for n in range(2):
+        for k, column in enumerate(columns):
+            reference[column][T0 + (n + 1) * STEP] = block[n, k]
+
+    for column, values in reference.items():
+        view = TimeSeriesView(store, column)
+        assert dict(view) == values
+        assert len(view) == len(values)
+        assert store.series(column).to_dict() == dict(sorted(values.items()))
+
+    index = pd.date_range(T0, T0 + 6 * STEP, freq=STEP)
+    expected = [[reference[c].get(ts, np.nan) for c in (c0, c1, c2)] for ts in index]
+    np.testing.assert_array_equal(store.take(index, [c0, c1, c2]), expected)
+    np.testing.assert_array_equal(
+        store.get_many(T0 + 6 * STEP, [c0, c1, c2]), [0.7, np.nan, np.nan]
+    )
+
+    del TimeSeriesView(store, c0)[T0 + 6 * STEP]
+    assert T0 + 6 * STEP not in TimeSeriesView(store, c0)
+
+
+def test_view_length_without_series():
+    store = TrajectoryStore(T0, STEP)
+    column = store.add_column(T0, T0 + 10 * STEP)
+    view = TimeSeriesView(store, column)
+    for n in range(5):
+        view[T0 + n * STEP] = 0.1 * n
+        assert len(view) == n + 1
+        assert list(view) == [T0 + k * STEP for k in range(n + 1)]
+    assert store._series_cache == {}
+
+
+def test_fleet_stores_stays():
+    horizon = pd.date_range(T0, periods=100, freq=STEP)
+    arrival = horizon[[0, 10, 50]]
+    departure = horizon[[5, 30, 99]]
+    behavior = pd.DataFrame(
+        {
+            "ev_id": ["EV1", "EV2", "EV3"],
+            "Battery Capacity (kWh)": 55.0,
+            "p_max_ch (kW)": 11.0,
+            "p_max_ds (kW)": 11.0,
+            "Reservation Time": arrival,
+            "Estimated Arrival Time": arrival,
+            "Estimated Departure Time": departure,
+            "Estimated Arrival SOC": 0.4,
+            "Target SOC @ Estimated Departure Time": 0.8,
+            "V2G Allowance (kWh)": 10.0,
+            "Real Arrival Time": arrival,
+            "Real Arrival SOC": 0.4,
+            "Real Departure Time": departure,
+            "Target Cluster": "cluster1",
+        }
+    )
+    fleet = EVFleet("fleet", behavior, horizon)
+
+    assert fleet.soc_store.size == 6 + 21 + 50
+    ev = fleet.objects["EV2"]
+    for ts in horizon[10:30]:
+        ev.charge(ts, STEP, 11.0)
+    assert len(ev.soc) == 21
+    assert len(ev.g2v) == 20
+    assert np.isclose(ev.soc[horizon[30]], 0.4 + 20 * 11 * 300 / (55 * 3600))
+    assert fleet.soc_store.outside == {}
+
+
+def run_fleet(behavior, horizon, lazy):
+    fleet = EVFleet("fleet", behavior, horizon, lazy=lazy)
+    peak = 0
+    for ts in horizon[:-1]:
+        fleet.outgoing_vehicles_at(ts)
+        fleet.incoming_vehicles_at(ts)
+        for n in fleet.resident if lazy else range(len(behavior)):
+            ev = fleet.vehicle(n)
+            if ev.t_arr_real <= ts < ev.t_dep_real:
+                ev.charge(ts, STEP, 11.0)
+        peak = max(peak, fleet.soc_store.size)
+    return fleet, peak
+
+
+def test_lazy_fleet_recycles_columns():
+    horizon = pd.date_range(T0, periods=200, freq=STEP)
+    arrival = horizon[np.arange(0, 180, 10)]
+    departure = horizon[np.arange(0, 180, 10) + 15]
+    behavior = pd.DataFrame(
+        {
+            "ev_id": ["EV%d" % n for n in range(len(arrival))],
+            "Battery Capacity (kWh)": 55.0,
+            "p_max_ch (kW)": 11.0,
+            "p_max_ds (kW)": 11.0,
+            "Reservation Time": arrival,
+            "Estimated Arrival Time": arrival,
+            "Estimated Departure Time": departure,
+            "Estimated Arrival SOC": 0.2,
+            "Target SOC @ Estimated Departure Time": 0.8,
+            "V2G Allowance (kWh)": 10.0,
+            "Real Arrival Time": arrival,
+            "Real Arrival SOC": 0.2,
+            "Real Departure Time": departure,
+            "Target Cluster": "cluster1",
+        }
+    )
+
+    eager, _ = run_fleet(behavior, horizon, lazy=False)
+    lazy, peak = run_fleet(behavior, horizon, lazy=True)
+
+    # At most two vehicles are parked at the same time
+    assert peak <= 4 * 16
+    assert lazy.soc_store.n_columns <= 4
+
+    rows = list(range(len(behavior)))
+    for a, b in zip(
+        eager.take_trajectories(horizon, rows), lazy.take_trajectories(horizon, rows)
+    ):
+        np.testing.assert_array_equal(a, b)
+
+    # The objects of departed vehicles read from the result stores
+    ev = lazy.objects["EV0"]
+    assert ev.soc[horizon[15]] == eager.objects["EV0"].soc[horizon[15]]
+    assert len(ev.g2v) == 15
+
+
+def test_series_cache_per_column():
+    for store in (TimeSeriesStore(n_columns=2), TrajectoryStore(T0, STEP)):
+        if isinstance(store, TrajectoryStore):
+            store.add_column(T0, T0 + 10 * STEP)
+            store.add_column(T0, T0 + 10 * STEP)
+        else:
+            store.anchor(T0 + 2 * STEP, STEP)
+        store.set(T0 + STEP, 0, 0.1)
+        store.set(T0 + STEP / 2, 1, 0.2)
+        first = store.series(0)
+        other = store.series(1)
+
+        # Writing a series does not invalidate the others
+        store.set(T0 + 3 * STEP, 1, 0.3)
+        assert store.series(0) is first
+        assert store.series(1) is not other
+        assert store.series(1).to_dict() == {T0 + STEP / 2: 0.2, T0 + 3 * STEP: 0.3}
+
+        store.set_many(T0 + 4 * STEP, [0], [0.4])
+        assert store.series(0).to_dict() == {T0 + STEP: 0.1, T0 + 4 * STEP: 0.4}
+        store.delete(T0 + STEP, 0)
+        assert store.series(0).to_dict() == {T0 + 4 * STEP: 0.4}